@@ -0,0 +1,87 @@
+'''
+bench_daymask
+=============
+
+Benchmark of a TMY3 model chain (pvl_perez, pvl_calcparams_desoto,
+pvl_singlediode) on all rows against the same chain on the daytime rows
+packed by DayMask and scattered back, with the cost of the mask itself. The
+hourly TMY3 data is also interpolated to one-minute rows.
+
+The largest differences between the two are reported for pvl_perez and
+for the Pmp of pvl_singlediode, over the daytime rows.
+
+Run from the repository root:
+
+    $ python benchmarks/bench_daymask.py
+
+'''
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
+
+from pvlib import tmy
+from pvlib import pvl_tools
+from pvlib import pvl_spa
+from pvlib import pvl_extraradiation
+from pvlib import pvl_perez
+from pvlib import pvl_calcparams_desoto
+from pvlib import pvl_singlediode
+from pvlib import DayMask
+
+#Canadian_Solar_CS5P_220P
+MODULE={'A_c':1.639,'A_ref':2.3674,'Adjust':2.3,'Alpha_sc':0.0025,'Beta_oc':-0.19659,
+        'Gamma_r':-0.43,'I_l_ref':5.056,'I_mp_ref':4.73,'I_o_ref':1.006e-10,'I_sc_ref':5.05,
+        'N_s':96,'R_s':1.004,'R_sh_ref':837.51,'Source':'Multi-c-Si','T_noct':51.4,
+        'V_mp_ref':46.6,'V_oc_ref':58.3}
+
+
+def timed(fcn,*args,**kwargs):
+    start=time.time()
+    result=fcn(*args,**kwargs)
+    return time.time()-start, result
+
+
+def chain(DHI,DNI,GHI,HExtra,SunZen,SunAz,DryBulb):
+    AM=1/np.cos(np.radians(np.minimum(SunZen,89)))
+    SkyDiffuse=pvl_perez(30,180,DHI,DNI,HExtra,SunZen,SunAz,AM)
+    IL,I0,Rs,Rsh,nNsVth=pvl_calcparams_desoto(S=GHI,Tcell=DryBulb,alpha_isc=.003,
+        ModuleParameters=pvl_tools.repack(MODULE),EgRef=1.121,dEgdT=-0.0002677)
+    Result=pvl_singlediode(Module=pvl_tools.repack(MODULE),IL=IL,I0=I0,Rs=Rs,Rsh=Rsh,nNsVth=nNsVth)
+    return SkyDiffuse, Result['Pmp']
+
+
+def main():
+    TMY,meta=tmy.readtmy3(filename=os.path.join(os.path.dirname(__file__),'..','pvlib','test','703165TY.csv'))
+    TMY=TMY[['DHI','DNI','GHI','DryBulb']]
+    #TMY3 months come from different years; put them all in one
+    TMY.index=pd.date_range('20130101 01:00',periods=len(TMY),freq='H')
+
+    print('%10s %10s %10s %10s %10s %11s %11s' % ('rows','day rows','full','mask','packed','diff perez','diff Pmp'))
+    for data in (TMY,TMY.resample('T').interpolate()):
+        SunAz,SunEl,SunZen,__=pvl_spa(data.index,meta)
+        SunAz=SunAz+180
+        HExtra=pvl_extraradiation(doy=data.index.dayofyear)
+        inputs=(data.DHI,data.DNI,data.GHI,HExtra,SunZen,SunAz,data.DryBulb)
+
+        t_full,(full_sky,full_pmp)=timed(chain,*inputs)
+
+        t_mask,mask=timed(DayMask.from_suntimes,data.index,meta)
+        start=time.time()
+        sky,pmp=mask.scatter(chain(*mask.pack(*inputs)),fill=0)
+        t_packed=time.time()-start
+
+        full_sky=full_sky.reindex(data.index,fill_value=0)
+        diff=np.nanmax(abs(sky.values[mask.mask]-full_sky.values[mask.mask]))
+        diff_pmp=np.nanmax(abs(pmp.values[mask.mask]-full_pmp.values[mask.mask]))
+        print('%10d %10d %10.3f %10.3f %10.3f %11.2e %11.2e' % (len(data),len(mask),t_full,t_mask,t_packed,diff,diff_pmp))
+    print('times in seconds; max diff of pvl_perez in W/m^2 and of Pmp in W over daytime rows')
+
+
+if __name__ == '__main__':
+    main()
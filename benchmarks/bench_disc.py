@@ -0,0 +1,54 @@
+'''
+bench_disc
+==========
+
+Benchmark of pvl_disc, and of its ndarray kernel, on ten years of hourly
+and five years of one-minute synthetic GHI (about half of the rows are
+night rows, which the kernel skips).
+
+Run from the repository root:
+
+    $ python benchmarks/bench_disc.py
+
+'''
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
+
+from pvlib import pvl_disc
+from pvlib.pvl_disc import disc
+
+
+def timed(fcn,*args,**kwargs):
+    start=time.time()
+    result=fcn(*args,**kwargs)
+    return time.time()-start,result
+
+
+def make_data(rows,freq):
+    rand=np.random.RandomState(0)
+    Time=pd.date_range('20100101',periods=rows,freq=freq)
+    SunZen=pd.Series(rand.uniform(0,180,rows),index=Time)
+    GHI=pd.Series(np.maximum(1100*np.cos(np.radians(SunZen))*rand.uniform(0.2,1,rows),0),index=Time)
+    pressure=pd.Series(rand.uniform(80000,102000,rows),index=Time)
+    return Time,GHI,SunZen,pressure
+
+
+def main():
+    print('%10s %10s %10s %10s' % ('rows','freq','pvl_disc','kernel'))
+    for rows,freq in ((10*8760,'H'),(5*525600,'min')):
+        Time,GHI,SunZen,pressure=make_data(rows,freq)
+        t_disc,__=timed(pvl_disc,GHI,SunZen,Time,pressure=pressure)
+        t_kernel,__=timed(disc,GHI.values,SunZen.values,Time.dayofyear,pressure.values)
+        print('%10d %10s %10.3f %10.3f' % (rows,freq,t_disc,t_kernel))
+    print('times in seconds')
+
+
+if __name__ == '__main__':
+    main()
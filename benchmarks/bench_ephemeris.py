@@ -0,0 +1,91 @@
+'''
+bench_ephemeris
+===============
+
+Benchmark of the vectorized refraction and Kepler solution in pvl_ephemeris
+against the previous Python loop implementations, on 8760, 525600 and
+5 million timestamps.
+
+Run from the repository root:
+
+    $ python benchmarks/bench_ephemeris.py [--skip-legacy-5m]
+
+'''
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
+
+from pvlib import pvl_ephemeris
+from pvlib.pvl_ephemeris import refraction, eccentric_anomaly
+
+
+def legacy_refraction(SunEl):
+    # Per-element loop previously used in pvl_ephemeris
+    Refract=[]
+    for Elevation in SunEl:
+        TanEl=np.tan(np.radians(Elevation))
+        if Elevation>5 and Elevation<=85:
+            Refract.append((58.1 / float(TanEl) - 0.07 / float(TanEl ** 3) + 8.6e-05 / float(TanEl ** 5)))
+        elif Elevation > -0.575 and Elevation <=5:
+            Refract.append((Elevation*((- 518.2 + Elevation*((103.4 + Elevation*((- 12.79 + Elevation*(0.711))))))) + 1735))
+        elif Elevation> -1 and Elevation<= -0.575:
+            Refract.append(- 20.774 / float(TanEl))
+        else:
+            Refract.append(0)
+    return np.array(Refract)
+
+
+def legacy_kepler(MeanAnom,Eccen):
+    # Convergence loop previously used in pvl_ephemeris
+    EccenAnom=MeanAnom
+    E=0
+    while np.max(abs(EccenAnom - E)) > 0.0001:
+        E=EccenAnom
+        EccenAnom=MeanAnom + np.degrees(Eccen)*(np.sin(np.radians(E)))
+    return EccenAnom
+
+
+def timed(fcn,*args):
+    start=time.time()
+    result=fcn(*args)
+    return time.time()-start, result
+
+
+def main():
+    skip_legacy_5m='--skip-legacy-5m' in sys.argv
+    location={'latitude':35.05,'longitude':-106.54,'altitude':1619,'TZ':-7}
+
+    print('%10s %13s %13s %13s %13s %13s %11s' % ('rows','refract old','refract new',
+        'kepler old','kepler new','ephemeris','max diff'))
+    for rows in (8760,525600,5000000):
+        rand=np.random.RandomState(0)
+        SunEl=rand.uniform(-90,90,rows)
+        MeanAnom=rand.uniform(0,360,rows)
+        Eccen=0.01675104 - 4.18e-05 * rand.uniform(0.8,1.2,rows)
+
+        if skip_legacy_5m and rows>525600:
+            t_rold=t_kold=np.nan
+            diff=np.nan
+        else:
+            t_rold,rold=timed(legacy_refraction,SunEl)
+            t_kold,kold=timed(legacy_kepler,MeanAnom,Eccen)
+        t_rnew,rnew=timed(refraction,SunEl)
+        t_knew,knew=timed(eccentric_anomaly,MeanAnom,Eccen)
+        if not(np.isnan(t_rold)):
+            diff=max(np.max(abs(rold-rnew)),np.max(abs(kold-knew)))
+
+        Time=pd.date_range('20130101',periods=rows,freq='T' if rows>8784 else 'H')
+        t_eph,__=timed(pvl_ephemeris,Time,location)
+
+        print('%10d %13.3f %13.3f %13.3f %13.3f %13.3f %11.2e' % (rows,t_rold,t_rnew,t_kold,t_knew,t_eph,diff))
+    print('times in seconds; max diff in arc seconds (refraction) or degrees (Kepler)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+'''
+bench_geocentrictable
+=====================
+
+Benchmark of pvl_spa with a GeocentricTable against pvl_spa calculating the
+periodic terms (compiled extension if built, and NumPy port), on one year of
+one-minute data and thirty years of hourly data, with the cost of building
+the table for 1990-2019.
+
+Run from the repository root:
+
+    $ python benchmarks/bench_geocentrictable.py
+
+'''
+
+import os
+import sys
+import importlib
+import time
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
+
+from pvlib import pvl_spa
+from pvlib import GeocentricTable
+# The module, to disable its compiled kernel (the package attribute pvl_spa
+# is the function)
+spa_module=importlib.import_module('pvlib.pvl_spa')
+
+
+def timed(fcn,*args,**kwargs):
+    start=time.time()
+    result=fcn(*args,**kwargs)
+    return time.time()-start, result
+
+
+def numpy_spa(*args,**kwargs):
+    compiled=spa_module.spa_py
+    spa_module.spa_py=None
+    try:
+        return pvl_spa(*args,**kwargs)
+    finally:
+        spa_module.spa_py=compiled
+
+
+def main():
+    location={'latitude':35.05,'longitude':-106.54,'altitude':1619,'TZ':-7}
+    directory=tempfile.mkdtemp()
+    try:
+        t_build,table=timed(GeocentricTable.build,os.path.join(directory,'geo'),1990,2019)
+        print('table 1990-2019: %d rows, %.1f MB, built in %.3f s' % (len(table.data),
+              table.data.nbytes/2.0**20,t_build))
+
+        print('%10s %12s %12s %12s %11s' % ('rows','compiled','numpy','table','max diff'))
+        for Time in (pd.date_range('20130101',periods=525600,freq='T'),
+                     pd.date_range('19900101',periods=262800,freq='H')):
+            if spa_module.spa_py is None:
+                t_compiled=np.nan
+            else:
+                t_compiled,__=timed(pvl_spa,Time,location)
+            t_numpy,(__,__,zenith,__)=timed(numpy_spa,Time,location)
+            t_table,(__,__,tzenith,__)=timed(pvl_spa,Time,location,Table=table)
+            print('%10d %12.3f %12.3f %12.3f %11.2e' % (len(Time),t_compiled,t_numpy,t_table,
+                  np.max(abs(zenith-tzenith))))
+        print('times in seconds; max diff of the zenith in degrees')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+'''
+bench_iam
+=========
+
+Benchmark of the tabulated mode of pvl_physicaliam and pvl_ashraeiam
+against their direct evaluation, on one year of one-minute angles of
+incidence (including angles beyond 90 degrees, as for the night hours).
+
+Run from the repository root:
+
+    $ python benchmarks/bench_iam.py
+
+'''
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
+
+from pvlib import pvl_physicaliam
+from pvlib import pvl_ashraeiam
+
+ROWS=525600
+
+
+def timed(fcn,*args,**kwargs):
+    start=time.time()
+    result=fcn(*args,**kwargs)
+    return time.time()-start,result
+
+
+def main():
+    rand=np.random.RandomState(0)
+    Time=pd.date_range('20130101',periods=ROWS,freq='min')
+    AOI=pd.Series(rand.uniform(0,180,ROWS),index=Time)
+
+    print('%d rows' % ROWS)
+    print('%10s %10s %10s %10s %10s' % ('model','direct','first','tabulated','max diff'))
+    for name,fcn,params in (('physical',pvl_physicaliam,(4,0.002,1.526)),
+                            ('ashrae',pvl_ashraeiam,(0.05,))):
+        t_direct,direct=timed(fcn,*(params+(AOI,)))
+        t_first,__=timed(fcn,*(params+(AOI,)),Tabulate=True)
+        t_table,table=timed(fcn,*(params+(AOI,)),Tabulate=True)
+        print('%10s %10.3f %10.3f %10.3f %10.2e' % (name,t_direct,t_first,t_table,np.max(np.abs(direct-table))))
+    print('times in seconds; first is the tabulated call which builds the table')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+'''
+bench_interpsolarposition
+=========================
+
+Benchmark of pvl_interpsolarposition against exact pvl_spa on one year of
+one-minute data (525600 rows) and one week of one-second data (604800 rows),
+for a range of maximum errors.
+
+Run from the repository root:
+
+    $ python benchmarks/bench_interpsolarposition.py
+
+'''
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
+
+from pvlib import pvl_spa
+from pvlib import pvl_interpsolarposition
+
+
+def timed(fcn,*args,**kwargs):
+    start=time.time()
+    result=fcn(*args,**kwargs)
+    return time.time()-start, result
+
+
+def angle(zenith1,azimuth1,zenith2,azimuth2):
+    zenith1,azimuth1,zenith2,azimuth2=[np.radians(np.asarray(x)) for x in (zenith1,azimuth1,zenith2,azimuth2)]
+    cosangle=np.cos(zenith1)*np.cos(zenith2)+np.sin(zenith1)*np.sin(zenith2)*np.cos(azimuth1-azimuth2)
+    return np.degrees(np.arccos(np.clip(cosangle,-1,1)))
+
+
+def main():
+    location={'latitude':35.05,'longitude':-106.54,'altitude':1619,'TZ':-7}
+
+    print('%8s %10s %10s %12s %12s %9s %14s' % ('freq','rows','MaxError','exact (s)','interp (s)','speedup','max error'))
+    for freq,rows in (('T',525600),('S',604800)):
+        Time=pd.date_range('20130101',periods=rows,freq=freq)
+        t_exact,exact=timed(pvl_spa,Time,location)
+        #rows next to the step of the refraction correction below the horizon are excluded
+        away=np.asarray(abs(pvl_spa(Time,location,Pressure=0)[1]+0.8334)>0.01)
+        for maxerror in (0.01,0.001,0.0001):
+            t_interp,interp=timed(pvl_interpsolarposition,Time,location,MaxError=maxerror)
+            error=angle(interp[2],interp[0],exact[2],exact[0])[away].max()
+            print('%8s %10d %10.0e %12.3f %12.3f %9.1f %14.2e' % (freq,rows,maxerror,t_exact,t_interp,t_exact/t_interp,error))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+'''
+bench_linketurbidity
+====================
+
+Benchmark of the Linke turbidity lookup of pvl_clearsky_ineichen: loading
+LinkeTurbidities.mat on every call (previous implementation) against the
+uint8 memory map of pvl_linketurbidity, and a per-site loop with a per-row
+apply of the month (previous implementation) against the (time x site)
+lookup of pvl_linketurbidity. A random climatology of the real size
+(2160 x 4320 x 12) is used, as the SoDa file is not distributed.
+
+Run from the repository root:
+
+    $ python benchmarks/bench_linketurbidity.py
+
+'''
+
+import os
+import sys
+import importlib
+import time
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import scipy.io
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
+
+from pvlib.pvl_linketurbidity import (pvl_linketurbidity, linke_turbidity_table, monthly_linke_turbidity,
+                                      convert_linke_turbidity, grid_index)
+# The module, to point the shared climatology at the random one (the package
+# attribute pvl_linketurbidity is the function)
+linke=importlib.import_module('pvlib.pvl_linketurbidity')
+
+
+def timed(fcn,*args,**kwargs):
+    start=time.time()
+    result=fcn(*args,**kwargs)
+    return time.time()-start, result
+
+
+def legacy_lookup(matfile,latitude,longitude):
+    # Previously done by every pvl_clearsky_ineichen call
+    LinkeTurbidity=scipy.io.loadmat(matfile)['LinkeTurbidity']
+    rows,columns=grid_index(latitude,longitude,LinkeTurbidity.shape)
+    return LinkeTurbidity[rows,columns]/20.0
+
+
+def legacy_series(Time,latitude,longitude):
+    # One site at a time, with the month applied row by row as previously
+    # done by pvl_clearsky_ineichen
+    columns=[]
+    for lat,lon in zip(latitude,longitude):
+        MonthlyTL=monthly_linke_turbidity(lat,lon)
+        LT=pd.DataFrame(index=Time)
+        LT['month']=Time.month
+        columns.append(LT.apply(lambda x: MonthlyTL[int(x['month'])-1],axis=1))
+    return pd.concat(columns,axis=1)
+
+
+def main():
+    directory=tempfile.mkdtemp()
+    try:
+        matfile=os.path.join(directory,'LinkeTurbidities.mat')
+        rand=np.random.RandomState(0)
+        scipy.io.savemat(matfile,{'LinkeTurbidity':rand.randint(20,140,(2160,4320,12)).astype(np.uint8)})
+        linke.LINKE_TURBIDITY_FILE=os.path.join(directory,'LinkeTurbidities.npy')
+
+        t_convert,__=timed(convert_linke_turbidity,matfile,linke.LINKE_TURBIDITY_FILE)
+        t_open,__=timed(linke_turbidity_table)
+        print('convert once: %.3f s, open: %.6f s' % (t_convert,t_open))
+
+        print('%10s %12s %12s %11s' % ('sites','loadmat','memmap','max diff'))
+        for sites in (1,100,10000):
+            latitude=rand.uniform(-60,60,sites)
+            longitude=rand.uniform(-180,180,sites)
+            t_legacy,legacy=timed(legacy_lookup,matfile,latitude,longitude)
+            t_new,new=timed(monthly_linke_turbidity,latitude,longitude)
+            print('%10d %12.4f %12.6f %11.2e' % (sites,t_legacy,t_new,np.max(abs(legacy-new))))
+        print('times in seconds per call')
+
+        Time=pd.date_range('20130101',periods=8760,freq='H')
+        print('')
+        print('%10s %12s %12s %12s %11s' % ('sites','apply loop','monthly','interpolated','max diff'))
+        for sites in (1,10,1000):
+            latitude=rand.uniform(-60,60,sites)
+            longitude=rand.uniform(-180,180,sites)
+            if sites<=10:
+                t_legacy,legacy=timed(legacy_series,Time,latitude,longitude)
+            else:
+                t_legacy,legacy=np.nan,None
+            t_new,new=timed(pvl_linketurbidity,Time,latitude,longitude,Interpolate=False)
+            t_interp,__=timed(pvl_linketurbidity,Time,latitude,longitude)
+            if legacy is None:
+                diff=np.nan
+            else:
+                diff=np.max(abs(legacy.values-new.values))
+            print('%10d %12.4f %12.4f %12.4f %11.2e' % (sites,t_legacy,t_new,t_interp,diff))
+        print('times in seconds for a year of hourly timestamps')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+'''
+bench_multisitespa
+==================
+
+Benchmark of pvl_multisitespa against a loop of pvl_spa calls, one per
+site, on one year of hourly data (8760 timestamps) for 1 to 10000 sites.
+
+Run from the repository root:
+
+    $ python benchmarks/bench_multisitespa.py [--skip-loop-10k]
+
+'''
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
+
+from pvlib import pvl_spa
+from pvlib import pvl_multisitespa
+
+
+def timed(fcn,*args,**kwargs):
+    start=time.time()
+    result=fcn(*args,**kwargs)
+    return time.time()-start, result
+
+
+def loop(Time,latitude,longitude):
+    zenith=np.empty((len(Time),len(latitude)))
+    for i in range(len(latitude)):
+        __,__,Zenith,__=pvl_spa(Time,{'latitude':latitude[i],'longitude':longitude[i],'altitude':0,'TZ':0})
+        zenith[:,i]=Zenith
+    return zenith
+
+
+def main():
+    skip_loop_10k='--skip-loop-10k' in sys.argv
+    Time=pd.date_range('20130101',periods=8760,freq='H')
+
+    print('%10s %12s %12s %12s %11s' % ('sites','pvl_spa loop','multisite','per pair us','max diff'))
+    for sites in (1,10,100,1000,10000):
+        rand=np.random.RandomState(0)
+        latitude=rand.uniform(-60,60,sites)
+        longitude=rand.uniform(-180,180,sites)
+
+        t_multi,(__,__,Zenith)=timed(pvl_multisitespa,Time,latitude,longitude)
+        if skip_loop_10k and sites>1000:
+            t_loop=diff=np.nan
+        else:
+            t_loop,zenith=timed(loop,Time,latitude,longitude)
+            diff=np.max(abs(zenith-Zenith.values))
+
+        print('%10d %12.3f %12.3f %12.3f %11.2e' % (sites,t_loop,t_multi,t_multi/Zenith.size*1e6,diff))
+    print('times in seconds; max diff of the zenith in degrees')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+'''
+bench_parse
+===========
+
+Benchmark of the cost of pvl_tools.Parse input validation, with and without
+trusted inputs, on one year of hourly (8760 rows) and one-minute (525600 rows)
+data.
+
+Run from the repository root:
+
+    $ python benchmarks/bench_parse.py
+
+'''
+
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
+
+from pvlib import pvl_tools
+from pvlib import pvl_getaoi
+
+#Same input logic as pvl_reindl1990
+Expect={'SurfTilt':('num','x>=0'),
+        'SurfAz':('num','x>=-180'),
+        'DHI':('num','x>=0'),
+        'DNI':('num','x>=0'),
+        'GHI':('num','x>=0'),
+        'HExtra':('num','x>=0'),
+        'SunZen':('num','x>=0'),
+        'SunAz':('num','x>=-180'),
+        }
+
+
+def make_inputs(rows):
+    index=pd.date_range('20130101',periods=rows,freq='T' if rows>8784 else 'H')
+    rand=np.random.RandomState(0)
+    return {'SurfTilt':30,
+            'SurfAz':0,
+            'DHI':pd.Series(rand.uniform(0,300,rows),index=index),
+            'DNI':pd.Series(rand.uniform(0,900,rows),index=index),
+            'GHI':pd.Series(rand.uniform(0,1200,rows),index=index),
+            'HExtra':pd.Series(rand.uniform(1320,1420,rows),index=index),
+            'SunZen':pd.Series(rand.uniform(0,180,rows),index=index),
+            'SunAz':pd.Series(rand.uniform(-180,180,rows),index=index)}
+
+
+def best_of(fcn,repeat=5,number=3):
+    return min(timeit.repeat(fcn,repeat=repeat,number=number))/number
+
+
+def main():
+    print('%10s %14s %14s %14s %14s' % ('rows','Parse (ms)','trusted (ms)','getaoi (ms)','trusted (ms)'))
+    for rows in (8760,525600):
+        inputs=make_inputs(rows)
+
+        parse=lambda: pvl_tools.Parse(dict(inputs),Expect)
+        getaoi=lambda: pvl_getaoi(SurfTilt=30,SurfAz=0,SunZen=inputs['SunZen'],SunAz=inputs['SunAz'])
+
+        checked=best_of(parse)
+        checked_aoi=best_of(getaoi)
+        with pvl_tools.trusted_inputs():
+            trusted=best_of(parse)
+            trusted_aoi=best_of(getaoi)
+
+        print('%10d %14.3f %14.3f %14.3f %14.3f' % (rows,checked*1e3,trusted*1e3,checked_aoi*1e3,trusted_aoi*1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+'''
+bench_poairradiance
+===================
+
+Benchmark of pvl_poairradiance against the chain of pvl_getaoi, pvl_perez,
+pvl_grounddiffuse and pvl_globalinplane, on five years of one-minute
+synthetic data. Each variant runs in its own process so that its peak
+memory can be reported.
+
+Run from the repository root:
+
+    $ python benchmarks/bench_poairradiance.py
+
+'''
+
+import os
+import sys
+import time
+import resource
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
+
+from pvlib import pvl_poairradiance
+from pvlib import pvl_getaoi
+from pvlib import pvl_perez
+from pvlib import pvl_grounddiffuse
+from pvlib import pvl_globalinplane
+
+ROWS=5*525600
+
+
+def make_data():
+    rand=np.random.RandomState(0)
+    Time=pd.date_range('20100101',periods=ROWS,freq='min')
+    series=lambda low,high: pd.Series(rand.uniform(low,high,ROWS),index=Time)
+    SunZen,SunAz=series(0,89),series(0,360)
+    DHI,DNI,HExtra,AM=series(1,400),series(0,1000),series(1300,1400),series(1,38)
+    GHI=DHI + DNI*np.cos(np.radians(SunZen))
+    return SunZen,SunAz,DHI,DNI,GHI,HExtra,AM
+
+
+def chain(SunZen,SunAz,DHI,DNI,GHI,HExtra,AM):
+    AOI=pvl_getaoi(30,180,SunZen,SunAz)
+    SkyDiffuse=pvl_perez(30,180,DHI,DNI,HExtra,SunZen,SunAz,AM)
+    GR=pvl_grounddiffuse(30,GHI,0.2)
+    return pvl_globalinplane(30,180,AOI['AOI'],DNI,SkyDiffuse['In_Plane_SkyDiffuse'],GR['GR'])
+
+
+def fused(SunZen,SunAz,DHI,DNI,GHI,HExtra,AM):
+    return pvl_poairradiance(30,180,DNI,DHI,GHI,SunZen,SunAz,0.2,HExtra=HExtra,AM=AM)
+
+
+def run(mode):
+    data=make_data()
+    baseline=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start=time.time()
+    {'chain':chain,'fused':fused}[mode](*data)
+    elapsed=time.time()-start
+    peak=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print('%8s %10.3f %14.0f' % (mode,elapsed,(peak-baseline)/1024.0))
+
+
+def main():
+    if len(sys.argv)>1:
+        run(sys.argv[1])
+        return
+    print('%d rows' % ROWS)
+    print('%8s %10s %14s' % ('','seconds','peak MB added'))
+    sys.stdout.flush()
+    for mode in ('chain','fused'):
+        subprocess.check_call([sys.executable,__file__,mode])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+'''
+bench_singlediode
+=================
+
+Benchmark of pvl_singlediode, and of its Voc and maximum power point
+kernels, on one year of one-minute synthetic irradiance and cell
+temperatures, with the largest error of Pmp against a dense sweep of the
+I-V curves of a sample of the rows.
+
+Run from the repository root:
+
+    $ python benchmarks/bench_singlediode.py
+
+'''
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
+
+from pvlib import pvl_tools
+from pvlib import pvl_calcparams_desoto
+from pvlib import pvl_singlediode
+from pvlib.pvl_singlediode import I_from_V, open_circuit_voltage, max_power_point
+
+ROWS=525600
+
+#Canadian_Solar_CS5P_220P
+MODULE={'A_c':1.639,'A_ref':2.3674,'Adjust':2.3,'Alpha_sc':0.0025,'Beta_oc':-0.19659,
+        'Gamma_r':-0.43,'I_l_ref':5.056,'I_mp_ref':4.73,'I_o_ref':1.006e-10,'I_sc_ref':5.05,
+        'N_s':96,'R_s':1.004,'R_sh_ref':837.51,'Source':'Multi-c-Si','T_noct':51.4,
+        'V_mp_ref':46.6,'V_oc_ref':58.3}
+
+
+def timed(fcn,*args,**kwargs):
+    start=time.time()
+    result=fcn(*args,**kwargs)
+    return time.time()-start, result
+
+
+def kernels(IL,I0,Rs,Rsh,nNsVth):
+    Voc=open_circuit_voltage(IL,I0,Rsh,nNsVth)
+    return max_power_point(IL,I0,Rs,Rsh,nNsVth,Voc)
+
+
+def main():
+    rand=np.random.RandomState(0)
+    Time=pd.date_range('20130101',periods=ROWS,freq='min')
+    S=pd.Series(rand.uniform(1,1100,ROWS),index=Time)
+    Tcell=pd.Series(rand.uniform(-10,65,ROWS),index=Time)
+    Module=pvl_tools.repack(MODULE)
+    IL,I0,Rs,Rsh,nNsVth=pvl_calcparams_desoto(S=S,Tcell=Tcell,alpha_isc=.003,ModuleParameters=Module,
+                                              EgRef=1.121,dEgdT=-0.0002677)
+
+    t_all,Result=timed(pvl_singlediode,Module=Module,IL=IL,I0=I0,Rs=Rs,Rsh=Rsh,nNsVth=nNsVth)
+    arrays=np.broadcast_arrays(*[np.asarray(value,dtype=float) for value in (IL,I0,Rs,Rsh,nNsVth)])
+    t_kernels,__=timed(kernels,*arrays)
+
+    sample=rand.randint(0,ROWS,200)
+    V=np.linspace(0,1,100001)*Result['Voc'].values[sample,np.newaxis]
+    I=I_from_V(Rsh.values[sample,np.newaxis],Rs,nNsVth.values[sample,np.newaxis],V,
+               I0.values[sample,np.newaxis],IL.values[sample,np.newaxis])
+    error=np.max(np.abs((V*I).max(axis=1) - Result['Pmp'].values[sample]))
+
+    print('%d rows' % ROWS)
+    print('pvl_singlediode %.3f s, Voc and maximum power point kernels %.3f s' % (t_all,t_kernels))
+    print('largest Pmp error against a sweep of 100001 points: %.2e W' % error)
+
+
+if __name__ == '__main__':
+    main()
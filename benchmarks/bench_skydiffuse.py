@@ -0,0 +1,100 @@
+'''
+bench_skydiffuse
+================
+
+Benchmark of pvl_skydiffuse, which evaluates a sky diffuse model for many
+surface orientations at once, against a loop of single-orientation calls
+(pvl_perez, pvl_klucher1979), on one year of hourly synthetic data; and of
+pvl_skydiffusemodels, which evaluates all the sky diffuse models in one
+pass, against one call per model, on one year of one-minute data.
+
+Run from the repository root:
+
+    $ python benchmarks/bench_skydiffuse.py
+
+'''
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
+
+from pvlib import pvl_skydiffuse
+from pvlib import pvl_skydiffusemodels
+from pvlib import pvl_perez
+from pvlib import pvl_klucher1979
+from pvlib import pvl_isotropicsky
+from pvlib import pvl_kingdiffuse
+from pvlib import pvl_haydavies1980
+from pvlib import pvl_reindl1990
+
+
+def timed(fcn,*args,**kwargs):
+    start=time.time()
+    result=fcn(*args,**kwargs)
+    return time.time()-start, result
+
+
+def perez_loop(tilts,azimuths,DHI,DNI,HExtra,SunZen,SunAz,AM):
+    result=np.zeros((len(tilts),len(DHI)))
+    for i in range(len(tilts)):
+        SkyDiffuse=pvl_perez(tilts[i],azimuths[i],DHI,DNI,HExtra,SunZen,SunAz,AM)
+        result[i,np.asarray(DHI>0)]=SkyDiffuse['In_Plane_SkyDiffuse']
+    return result
+
+
+def klucher_loop(tilts,azimuths,DHI,GHI,SunZen,SunAz):
+    return np.vstack([np.asarray(pvl_klucher1979(tilts[i],azimuths[i],DHI,GHI,SunZen,SunAz))
+                      for i in range(len(tilts))])
+
+
+def each_model(DHI,DNI,GHI,HExtra,SunZen,SunAz,AM):
+    return [pvl_isotropicsky(30,DHI),
+            pvl_kingdiffuse(30,DHI,GHI,SunZen),
+            pvl_klucher1979(30,180,DHI,GHI,SunZen,SunAz),
+            pvl_haydavies1980(30,180,DHI,DNI,HExtra,SunZen,SunAz),
+            pvl_reindl1990(30,180,DHI,DNI,GHI,HExtra,SunZen,SunAz),
+            pvl_perez(30,180,DHI,DNI,HExtra,SunZen,SunAz,AM)]
+
+
+def make_data(n,freq):
+    rand=np.random.RandomState(0)
+    Time=pd.date_range('20130101',periods=n,freq=freq)
+    series=lambda low,high: pd.Series(rand.uniform(low,high,n),index=Time)
+    SunZen,SunAz=series(0,89),series(0,360)
+    DHI,DNI,HExtra,AM=series(1,400),series(0,1000),series(1300,1400),series(1,38)
+    GHI=DHI + DNI*np.cos(np.radians(SunZen))
+    return SunZen,SunAz,DHI,DNI,HExtra,AM,GHI
+
+
+def main():
+    rand=np.random.RandomState(1)
+    SunZen,SunAz,DHI,DNI,HExtra,AM,GHI=make_data(8760,'H')
+
+    print('%12s %8s %10s %10s %11s' % ('model','surfaces','loop','batched','max diff'))
+    for surfaces in (10,100,500):
+        tilts=rand.uniform(0,90,surfaces)
+        azimuths=rand.uniform(90,270,surfaces)
+        t_loop,loop=timed(perez_loop,tilts,azimuths,DHI,DNI,HExtra,SunZen,SunAz,AM)
+        t_batch,batch=timed(pvl_skydiffuse,tilts,azimuths,DHI,SunZen,SunAz,DNI=DNI,HExtra=HExtra,AM=AM)
+        print('%12s %8d %10.3f %10.3f %11.2e' % ('perez',surfaces,t_loop,t_batch,np.max(abs(loop-batch.values))))
+        t_loop,loop=timed(klucher_loop,tilts,azimuths,DHI,GHI,SunZen,SunAz)
+        t_batch,batch=timed(pvl_skydiffuse,tilts,azimuths,DHI,SunZen,SunAz,GHI=GHI,Model='klucher')
+        print('%12s %8d %10.3f %10.3f %11.2e' % ('klucher',surfaces,t_loop,t_batch,np.max(abs(loop-batch.values))))
+    print('times in seconds for a year of hourly timestamps')
+
+    SunZen,SunAz,DHI,DNI,HExtra,AM,GHI=make_data(525600,'min')
+    t_each,__=timed(each_model,DHI,DNI,GHI,HExtra,SunZen,SunAz,AM)
+    t_perez,__=timed(pvl_perez,30,180,DHI,DNI,HExtra,SunZen,SunAz,AM)
+    t_all,__=timed(pvl_skydiffusemodels,30,180,DHI,SunZen,SunAz,DNI=DNI,GHI=GHI,HExtra=HExtra,AM=AM)
+    print('')
+    print('six models: %.3f s one call each (pvl_perez alone %.3f s), %.3f s in one pass' % (t_each,t_perez,t_all))
+    print('for a year of one-minute timestamps')
+
+
+if __name__ == '__main__':
+    main()
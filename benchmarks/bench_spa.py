@@ -0,0 +1,73 @@
+'''
+bench_spa
+=========
+
+Benchmark of the SPA: the per-timestamp spa_calc loop previously used in
+pvl_spa against the compiled spa_calc_array batch entry point and the
+vectorized NumPy port (spa_numpy), on 8760 and 525600 timestamps. The
+extension must be built first (see pvlib/spa_c_files/README).
+
+Run from the repository root:
+
+    $ python benchmarks/bench_spa.py
+
+'''
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+root=os.path.abspath(os.path.join(os.path.dirname(__file__),'..'))
+sys.path.insert(0,root)
+sys.path.insert(0,os.path.join(root,'pvlib','spa_c_files'))
+
+import spa_py
+from pvlib import spa_numpy
+
+
+def legacy_spa(Time,Location):
+    # Per-timestamp loop previously used in pvl_spa
+    spa_out=[]
+    for date in Time:
+        spa_out.append(spa_py.spa_calc(year=date.year,month=date.month,day=date.day,
+                        hour=date.hour,minute=date.minute,second=date.second,timezone=0,
+                        latitude=Location['latitude'],longitude=Location['longitude'],
+                        elevation=Location['altitude']))
+    return pd.DataFrame(spa_out,index=Time)
+
+
+def batch_spa(Time,Location,spa=spa_py):
+    zenith=np.empty(len(Time))
+    azimuth180=np.empty(len(Time))
+    spa.spa_calc_array(epoch=Time.asi8,timezone=0,latitude=Location['latitude'],
+                        longitude=Location['longitude'],elevation=Location['altitude'],
+                        zenith=zenith,azimuth180=azimuth180)
+    return pd.DataFrame({'zenith':zenith,'azimuth180':azimuth180},index=Time)
+
+
+def timed(fcn,*args):
+    start=time.time()
+    result=fcn(*args)
+    return time.time()-start, result
+
+
+def main():
+    location={'latitude':35.05,'longitude':-106.54,'altitude':1619,'TZ':-7}
+
+    print('%10s %13s %13s %13s %11s' % ('rows','loop (s)','array (s)','numpy (s)','max diff'))
+    for rows in (8760,525600):
+        Time=pd.date_range('20130101',periods=rows,freq='T' if rows>8784 else 'H')
+        t_old,old=timed(legacy_spa,Time,location)
+        t_new,new=timed(batch_spa,Time,location)
+        t_np,vec=timed(batch_spa,Time,location,spa_numpy)
+        diff=0
+        for result in (new,vec):
+            diff=max(diff,np.max(abs(old.zenith-result.zenith)),np.max(abs(old.azimuth180-result.azimuth180)))
+        print('%10d %13.3f %13.3f %13.3f %11.2e' % (rows,t_old,t_new,t_np,diff))
+
+
+if __name__ == '__main__':
+    main()
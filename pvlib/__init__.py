@@ -12,20 +12,33 @@ from pvl_getaoi import pvl_getaoi
 from pvl_disc import pvl_disc
 from pvl_ephemeris import pvl_ephemeris
 from pvl_spa import pvl_spa
+from pvl_multisitespa import pvl_multisitespa
+from pvl_geocentrictable import GeocentricTable
+from spa_numpy import SPA_ZA, SPA_ZA_INC, SPA_ZA_RTS, SPA_ALL
+from pvl_solarpositioncache import SolarPositionCache
+from pvl_interpsolarposition import pvl_interpsolarposition
+from pvl_sunrisesunset import pvl_sunrisesunset
+from pvl_daymask import DayMask
 from pvl_extraradiation import pvl_extraradiation
 from pvl_globalinplane import pvl_globalinplane
 from pvl_grounddiffuse import pvl_grounddiffuse
+from pvl_poairradiance import pvl_poairradiance
 from pvl_makelocationstruct import pvl_makelocationstruct
 from pvl_relativeairmass import pvl_relativeairmass
 from pvl_absoluteairmass import pvl_absoluteairmass
 from pvl_clearsky_ineichen import pvl_clearsky_ineichen
+from pvl_linketurbidity import pvl_linketurbidity, convert_linke_turbidity
+from pvl_clearskycache import ClearSkyCache
 from pvl_clearsky_haurwitz import pvl_clearsky_haurwitz
+from pvl_solargeometry import SolarGeometry, SurfaceGeometry
 '''
 Irradiance Translation Functions
 ================================
 '''
 
 from pvl_perez import pvl_perez
+from pvl_skydiffuse import pvl_skydiffuse
+from pvl_skydiffusemodels import pvl_skydiffusemodels
 from pvl_haydavies1980 import pvl_haydavies1980
 from pvl_isotropicsky import pvl_isotropicsky
 from pvl_kingdiffuse import pvl_kingdiffuse
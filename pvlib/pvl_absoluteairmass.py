@@ -56,6 +56,6 @@ def pvl_absoluteairmass(AMrelative,Pressure):
 
 	var=pvt.Parse(Vars,Expect)
 	
-	AMa=var.AMrelative.dot(var.Pressure) / 101325
+	AMa=var.AMrelative*var.Pressure / 101325
 	
 	return AMa
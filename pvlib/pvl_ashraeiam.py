@@ -2,8 +2,9 @@
 import numpy as np
 import os
 import pvl_tools 
+from pvl_iamtable import iam_table, interp_iam, iam_like
 
-def pvl_ashraeiam(b,theta):
+def pvl_ashraeiam(b,theta,Tabulate=False):
     '''
     Determine the incidence angle modifier using the ASHRAE transmission model.
 
@@ -30,6 +31,10 @@ def pvl_ashraeiam(b,theta):
             For values of theta near 90 degrees, the ASHRAE model may be above 1
             or less than 0 due to the discontinuity of secant(theta). IAM values
             outside of [0,1] are set to 0 and a warning is generated.
+    Tabulate : bool (optional, default False)
+            If True, the IAM is interpolated in a table of the model at every
+            0.01 degrees, which is built once for each b and kept for the next
+            calls, and no warning is printed. b must then be a scalar.
 
     Returns
     -------
@@ -59,23 +64,49 @@ def pvl_ashraeiam(b,theta):
     pvl_ephemeris
     pvl_spa  
     pvl_physicaliam
+
+    Notes
+    -----
+
+    With Tabulate, the error of the linear interpolation is at most
+    0.01**2/8 times the largest second derivative of the IAM (per degree
+    squared), which grows as the IAM falls towards 0. For b=0.05 it is below
+    1e-7 up to 80 degrees, and up to 3e-4 next to the angle where the IAM
+    reaches 0 (87.27 degrees).
     
     '''
     Vars=locals()
     Expect={'b':'x >= 0',
-            'theta':'num'}
+            'theta':'num',
+            'Tabulate':''}
     var=pvl_tools.Parse(Vars,Expect)
 
-    if any((var.theta < 0) | (var.theta >= 90)):
+    angle=np.asarray(theta,dtype=float)
+
+    if Tabulate:
+        if not(np.isscalar(b)):
+            raise Exception('b must be a scalar to tabulate the IAM')
+        table=iam_table(('ashrae',float(b)),lambda grid: ashrae_iam(b,grid))
+        return iam_like(theta,interp_iam(table,angle))
+
+    if np.any((angle < 0) | (angle >= 90)):
         print('Input incident angles <0 or >=90 detected For input angles with absolute value greater than 90, the ' + 'modifier is set to 0. For input angles between -90 and 0, the ' + 'angle is changed to its absolute value and evaluated.')
-        var.theta[(var.theta < 0) | (var.theta >= 90)]=abs((var.theta < 0) | (var.theta >= 90))
 
-    IAM=1 - var.b*((1/np.cos(np.radians(var.theta)) - 1))
+    IAM=1 - var.b*((1/np.cos(np.radians(abs(angle))) - 1))
 
-    IAM[abs(var.theta) > 90]=0
+    IAM=np.where(abs(angle) > 90,0,IAM)
 
-    if any((IAM > 1) | (IAM < 0)):
+    if np.any((IAM > 1) | (IAM < 0)):
         print('It seems that we have encountered a discontinuity. Any incident angle modifiers calculated to be less than 0 or ' + 'greather than 1 have been set to 0.')
-    IAM[((IAM > 1) | (IAM < 0))]=0
+    IAM=np.where((IAM > 1) | (IAM < 0),0,IAM)
 
-    return IAM
+    return iam_like(theta,IAM)
+
+
+def ashrae_iam(b,theta):
+    '''
+    IAM of the ASHRAE model for angles of incidence in [0, 90] degrees, with
+    the values outside of [0, 1] set to 0
+    '''
+    IAM=1 - b*((1/np.cos(np.radians(theta)) - 1))
+    return np.where((IAM > 1) | (IAM < 0),0,IAM)
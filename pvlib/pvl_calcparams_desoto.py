@@ -224,7 +224,7 @@ def pvl_calcparams_desoto(S, Tcell, alpha_isc, ModuleParameters, EgRef, dEgdT,
     Tref_K=var.Tref + 273.15
     Tcell_K=var.Tcell + 273.15
 
-    var.S[var.S == 0]=1e-10
+    var.S=pvl_tools.masked_replace(var.S,var.S == 0,1e-10)
     E_g=var.EgRef * ((1 + var.dEgdT*((Tcell_K - Tref_K))))
 
     nNsVth=a_ref*((Tcell_K / Tref_K))
@@ -1,6 +1,7 @@
 
 import numpy as np
 import pvl_tools
+from pvl_solargeometry import SolarGeometry
 
 
 def pvl_clearsky_haurwitz(ApparentZenith):
@@ -18,6 +19,7 @@ def pvl_clearsky_haurwitz(ApparentZenith):
     ApparentZenith : DataFrame
 
       The apparent (refraction corrected) sun zenith angle in degrees.
+      ApparentZenith may instead be a SolarGeometry.
 
     Returns
     -------
@@ -48,14 +50,19 @@ def pvl_clearsky_haurwitz(ApparentZenith):
     pvl_ephemeris
     pvl_spa
     pvl_ineichen
+    SolarGeometry
     '''
 
+    Sun=SolarGeometry.make(ApparentZenith)
+    ApparentZenith=Sun.zenith
+
     Vars=locals()
+    del Vars['Sun'] #geometry object, not an argument
 
     Expect={'ApparentZenith':('x<=180','x>=0')}
     var=pvl_tools.Parse(Vars,Expect)
 
-    ClearSkyGHI=1098.0 * pvl_tools.cosd(ApparentZenith)*(np.exp(- 0.059 / pvl_tools.cosd(ApparentZenith)))
+    ClearSkyGHI=1098.0 * Sun.cos_zenith*(np.exp(- 0.059 / Sun.cos_zenith))
 
     ClearSkyGHI[ClearSkyGHI < 0]=0
 
@@ -1,5 +1,4 @@
 import numpy as np
-import scipy
 import os
 import pvl_tools
 import pvl_extraradiation
@@ -7,11 +6,12 @@ import pvl_alt2pres
 import pvl_relativeairmass
 import pvl_absoluteairmass
 import pvl_ephemeris
-import pandas as pd
+import pvl_linketurbidity
 import pdb
+from pvl_solargeometry import SolarGeometry
 
 
-def pvl_clearsky_ineichen(Time,Location,LinkeTurbidity=-999):
+def pvl_clearsky_ineichen(Time,Location,LinkeTurbidity=-999,ApparentZenith=None,HExtra=None,AMabsolute=None):
     '''
     Determine clear sky GHI, DNI, and DHI from Ineichen/Perez model
 
@@ -62,6 +62,29 @@ def pvl_clearsky_ineichen(Time,Location,LinkeTurbidity=-999):
       and each element of the dataframe corresponds to any time and location
       elements.
 
+    ApparentZenith : Optional, float, DataFrame or SolarGeometry
+
+      The apparent (refraction corrected) sun zenith angle in degrees for
+      each element of Time. If omitted, it is calculated with pvl_ephemeris.
+      Passing the SolarGeometry already used for the transposition step
+      reuses its cached cos(zenith).
+
+    HExtra : Optional, float or DataFrame
+
+      Extraterrestrial normal irradiance in W/m^2 for each element of
+      Time. If omitted, it is calculated with pvl_extraradiation.
+
+    AMabsolute : Optional, float or DataFrame
+
+      Absolute (pressure corrected) airmass for each element of Time. If
+      omitted, it is calculated from ApparentZenith with the Kasten and Young
+      1989 model and the standard pressure of Location.altitude. Where it is
+      NaN (e.g. at night for some airmass models), the irradiances are NaN.
+
+    With ApparentZenith, HExtra and AMabsolute all given (e.g. the values
+    already computed for pvl_perez), pvl_clearsky_ineichen does not call any
+    solar position or atmosphere function.
+
     Returns
     -------
 
@@ -86,12 +109,12 @@ def pvl_clearsky_ineichen(Time,Location,LinkeTurbidity=-999):
     This implementation of the Ineichen model requires a number of other
     PV_LIB functions including pvl_ephemeris, pvl_date2doy,
     pvl_extraradiation, pvl_absoluteairmass, pvl_relativeairmass, and
-    pvl_alt2pres. It also requires the file "LinkeTurbidities.mat" to be
-    in the working directory. If you are using pvl_ineichen
-    in a loop, it may be faster to load LinkeTurbidities.mat outside of
-    the loop and feed it into pvl_ineichen as a variable, rather than
-    having pvl_ineichen open the file each time it is called (or utilize
-    column vectors of time/location instead of a loop).
+    pvl_alt2pres. The default Linke turbidities are read from the
+    climatology of pvl_linketurbidity, which is converted once from the file
+    "LinkeTurbidities.mat" and then memory-mapped, so calling pvl_ineichen
+    in a loop only reads the 12 monthly values of each site. The default
+    uses the value of each month; for turbidities interpolated by day of
+    year, pass pvl_linketurbidity(Time,latitude,longitude) as LinkeTurbidity.
 
     Initial implementation of this algorithm by Matthew Reno.
 
@@ -123,45 +146,44 @@ def pvl_clearsky_ineichen(Time,Location,LinkeTurbidity=-999):
     pvl_makelocationstruct
     pvl_ephemeris
     pvl_haurwitz
+    SolarGeometry
 
     '''
 
     Vars=locals()
     Expect={'Time':(''),
             'Location':(''),
-            'LinkeTurbidity':('optional')}
+            'LinkeTurbidity':('optional'),
+            'ApparentZenith':('optional'),
+            'HExtra':('optional'),
+            'AMabsolute':('optional')}
     var=pvl_tools.Parse(Vars,Expect)
 
-    I0=pvl_extraradiation.pvl_extraradiation(var.Time.dayofyear)
+    if HExtra is None:
+        I0=pvl_extraradiation.pvl_extraradiation(var.Time.dayofyear)
+    else:
+        I0=HExtra
 
-    __,__,ApparentSunElevation,__,__=pvl_ephemeris.pvl_ephemeris(var.Time,var.Location,pvl_alt2pres.pvl_alt2pres(var.Location.altitude)) # nargout=4
+    if ApparentZenith is None:
+        __,__,ApparentSunElevation,__,__=pvl_ephemeris.pvl_ephemeris(var.Time,var.Location,pvl_alt2pres.pvl_alt2pres(var.Location.altitude)) # nargout=4
+        ApparentZenith=90 - ApparentSunElevation
 
-    ApparentZenith=90 - ApparentSunElevation
-    ApparentZenith[ApparentZenith>=90]=90
+    Sun=SolarGeometry.make(ApparentZenith)
+    ApparentZenith=pvl_tools.masked_replace(Sun.zenith,Sun.zenith>=90,90)
+    CosZen=pvl_tools.masked_replace(Sun.cos_zenith,Sun.zenith>=90,pvl_tools.cosd(90))
 
 
 
-    if LinkeTurbidity==-999:
+    if np.isscalar(LinkeTurbidity) and LinkeTurbidity==-999:
 
-        # The .mat file 'LinkeTurbidities.mat' contains a single 2160 x 4320 x 12
-        # matrix of type uint8 called 'LinkeTurbidity'. The rows represent global
-        # latitudes from 90 to -90 degrees; the columns represent global longitudes
-        # from -180 to 180; and the depth (third dimension) represents months of
-        # the year from January (1) to December (12). To determine the Linke
-        # turbidity for a position on the Earth's surface for a given month do the
-        # following: LT = LinkeTurbidity(LatitudeIndex, LongitudeIndex, month).  Note that the numbers within the matrix are 20 * Linke
-        # Turbidity, so divide the number from the file by 20 to get the
-        # turbidity.
-        mat = scipy.io.loadmat('LinkeTurbidities.mat')
-        LinkeTurbidity=mat['LinkeTurbidity']
-        LatitudeIndex=np.round_(LinearlyScale(Location.latitude,90,- 90,1,2160))
-        LongitudeIndex=np.round_(LinearlyScale(Location.longitude,- 180,180,1,4320))
-        g=LinkeTurbidity[LatitudeIndex][LongitudeIndex]
-        ApplyMonth=lambda x:g[x[0]-1]
-        LT=pd.DataFrame(Time.month)
-        LT.index=Time
-        LT=LT.apply(ApplyMonth,axis=1)
-        TL=LT / float(20)
+        # The climatology (see pvl_linketurbidity) is a 2160 x 4320 x 12 uint8
+        # memory map of 20 * Linke turbidity, opened once per process. The rows
+        # represent global latitudes from 90 to -90 degrees; the columns
+        # represent global longitudes from -180 to 180; and the depth (third
+        # dimension) represents months of the year from January (1) to
+        # December (12). Only the 12 values of the site are read.
+        TL=pvl_linketurbidity.pvl_linketurbidity(Time,var.Location.latitude,var.Location.longitude,
+                                                 Interpolate=False)[0]
     else:
 
         TL=var.LinkeTurbidity
@@ -169,10 +191,11 @@ def pvl_clearsky_ineichen(Time,Location,LinkeTurbidity=-999):
     # Get the absolute airmass assuming standard local pressure (per
     # pvl_alt2pres) using Kasten and Young's 1989 formula for airmass.
 
-    AMabsolute=pvl_absoluteairmass.pvl_absoluteairmass(AMrelative=pvl_relativeairmass.pvl_relativeairmass(ApparentZenith,model='kastenyoung1989'),Pressure=pvl_alt2pres.pvl_alt2pres(var.Location.altitude))
+    if AMabsolute is None:
+        AMabsolute=pvl_absoluteairmass.pvl_absoluteairmass(AMrelative=pvl_relativeairmass.pvl_relativeairmass(ApparentZenith,model='kastenyoung1989'),Pressure=pvl_alt2pres.pvl_alt2pres(var.Location.altitude))
 
-    fh1=np.exp(var.Location.altitude*((- 1 / 8000)))
-    fh2=np.exp(var.Location.altitude*((- 1 / 1250)))
+    fh1=np.exp(var.Location.altitude*((- 1.0 / 8000)))
+    fh2=np.exp(var.Location.altitude*((- 1.0 / 1250)))
     cg1=(5.09e-05*(var.Location.altitude) + 0.868)
     cg2=3.92e-05*(var.Location.altitude) + 0.0387
 
@@ -196,23 +219,16 @@ def pvl_clearsky_ineichen(Time,Location,LinkeTurbidity=-999):
     #  equation from pg 311 because of the existence of known typos in the pg 156
     #  publication (notably the fh2-(TL-1) should be fh2 * (TL-1)). 
 
-    ClearSkyGHI=cg1*(I0)*(pvl_tools.cosd(ApparentZenith))*(np.exp(- cg2*(AMabsolute)*((fh1 + fh2*((TL - 1))))))*(np.exp(0.01*((AMabsolute) ** (1.8))))
-    ClearSkyGHI[ClearSkyGHI < 0]=0
+    ClearSkyGHI=cg1*(I0)*(CosZen)*(np.exp(- cg2*(AMabsolute)*((fh1 + fh2*((TL - 1))))))*(np.exp(0.01*((AMabsolute) ** (1.8))))
+    ClearSkyGHI=np.maximum(ClearSkyGHI,0)
 
     b=0.664 + 0.163 / fh1
     BncI=b*(I0)*(np.exp(- 0.09*(AMabsolute)*((TL - 1))))
 
-    ClearSkyDNI=np.min(BncI,ClearSkyGHI*((1 - (0.1 - 0.2*(np.exp(- TL))) / (0.1 + 0.882 / fh1))) / pvl_tools.cosd(ApparentZenith))
+    ClearSkyDNI=np.minimum(BncI,ClearSkyGHI*((1 - (0.1 - 0.2*(np.exp(- TL))) / (0.1 + 0.882 / fh1))) / CosZen)
 
     #ClearSkyDNI=ClearSkyGHI*((1 - (0.1 - 0.2*(np.exp(- TL))) / (0.1 + 0.882 / fh1))) / pvl_tools.cosd(ApparentZenith)
 
-    ClearSkyDHI=ClearSkyGHI - ClearSkyDNI*(pvl_tools.cosd(ApparentZenith))
+    ClearSkyDHI=ClearSkyGHI - ClearSkyDNI*(CosZen)
 
     return ClearSkyGHI,ClearSkyDNI,ClearSkyDHI,BncI
-
-
-def LinearlyScale(inputmatrix,inputmin,inputmax,outputmin,outputmax):
-    inputrange=inputmax - inputmin
-    outputrange=outputmax - outputmin
-    OutputMatrix=(inputmatrix - inputmin) * outputrange / inputrange + outputmin
-    return OutputMatrix
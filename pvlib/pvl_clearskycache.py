@@ -0,0 +1,208 @@
+'''
+pvl_clearskycache
+=================
+
+Cache of whole-year clear sky profiles per site, so that repeated clear sky
+requests for the same plants are answered by slicing stored arrays
+
+'''
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+import pvl_tools
+from pvl_alt2pres import pvl_alt2pres
+from pvl_ephemeris import pvl_ephemeris
+from pvl_clearsky_ineichen import pvl_clearsky_ineichen
+from pvl_clearsky_haurwitz import pvl_clearsky_haurwitz
+from pvl_linketurbidity import pvl_linketurbidity
+from pvl_solarpositioncache import SolarPositionCache, location_field, unpack
+
+
+MODELS=('ineichen','haurwitz')
+TURBIDITIES=('monthly','interpolated')
+INEICHEN_NAMES=('ClearSkyGHI','ClearSkyDNI','ClearSkyDHI','BncI')
+
+
+class ClearSkyCache(SolarPositionCache):
+  '''
+  Two-tier cache of clear sky irradiance profiles
+
+  Clear sky irradiance only depends on the site, the model, the turbidity
+  source and the timestamps. ClearSkyCache computes it for whole calendar
+  years (in the time zone of the request) on a regular grid of Step, and
+  keys each year profile by (latitude, longitude, altitude, TZ, model,
+  turbidity, time zone, year, Step). A request for any time window on that
+  grid is then answered by indexing the year profiles it spans, so jobs
+  which run every few minutes over the same plants only compute each
+  site-year once.
+
+  The in-memory LRU and the optional on-disk tier work as in
+  SolarPositionCache (which ClearSkyCache extends, so solar positions can be
+  cached in the same store).
+
+  Parameters
+  ----------
+
+  max_bytes : int (optional, default 256 MB)
+          Size limit of the in-memory tier, in bytes. A year of one-minute
+          pvl_clearsky_ineichen outputs takes 17 MB.
+
+  directory : string (optional)
+          Folder for the on-disk tier. It is created if it does not exist.
+          No on-disk tier if not given.
+
+  Returns
+  -------
+
+  self : ClearSkyCache
+
+          *self.clearsky(Time,Location,Model='ineichen',LinkeTurbidity='monthly',Step=None)*
+          - returns the same outputs as pvl_clearsky_ineichen or
+          pvl_clearsky_haurwitz for Time and Location
+
+          *self.hits*, *self.disk_hits*, *self.misses* - lookup counters,
+          one lookup per site-year
+
+  Notes
+  -----
+
+  The profiles use the apparent zenith of pvl_ephemeris at the standard
+  pressure of the site altitude, like pvl_clearsky_ineichen when it is not
+  given ApparentZenith.
+
+  See Also
+  --------
+  pvl_clearsky_ineichen
+  pvl_clearsky_haurwitz
+  SolarPositionCache
+  '''
+
+  def clearsky(self,Time,Location,Model='ineichen',LinkeTurbidity='monthly',Step=None):
+    '''
+    Clear sky irradiance for Time and Location, sliced from the cached year
+    profiles
+
+    Parameters
+    ----------
+
+    Time : Dataframe.index
+          A pandas datatime object. Every timestamp must be a whole number of
+          Step after January 1, 0h of its year.
+
+    Location : struct
+          Standard location structure, or a dict with the same fields
+
+    Model : string
+          'ineichen' (pvl_clearsky_ineichen) or 'haurwitz'
+          (pvl_clearsky_haurwitz)
+
+    LinkeTurbidity : string or float
+          Turbidity of the Ineichen model: 'monthly' (the climatology value
+          of each month, as in pvl_clearsky_ineichen), 'interpolated'
+          (pvl_linketurbidity interpolated by day of year) or a constant.
+          Not used by the Haurwitz model.
+
+    Step : string or Timedelta (optional)
+          Step of the year profiles. Defaults to the frequency of Time.
+
+    Returns
+    -------
+
+    ClearSkyGHI, ClearSkyDNI, ClearSkyDHI, BncI : Series
+          for the 'ineichen' Model, indexed by Time
+
+    ClearSkyGHI : Series
+          for the 'haurwitz' Model, indexed by Time
+    '''
+    if not(Model in MODELS):
+      raise Exception('Model must be one of: '+', '.join(MODELS))
+    if Model=='haurwitz':
+      LinkeTurbidity=None
+    elif not(LinkeTurbidity in TURBIDITIES if isinstance(LinkeTurbidity,str) else np.isscalar(LinkeTurbidity)):
+      raise Exception('LinkeTurbidity must be a number or one of: '+', '.join(TURBIDITIES))
+
+    if Step is None:
+      Step=Time.freq
+    try:
+      step=pd.Timedelta(Step).value
+    except (ValueError,TypeError):
+      raise Exception('Step must be a fixed time step (e.g. "1min"), required if Time has no frequency')
+    if step<=0:
+      raise Exception('Step must be positive')
+
+    site=tuple(float(location_field(Location,name)) for name in ('latitude','longitude','altitude','TZ'))
+    epoch=np.asarray(Time.asi8)
+    years=np.asarray(Time.year)
+
+    layout=None
+    data=None
+    for year in np.unique(years):
+      start=pd.Timestamp('%d-01-01' % year,tz=Time.tz).value
+      end=pd.Timestamp('%d-01-01' % (year+1),tz=Time.tz).value
+      key=profile_key(site,Model,LinkeTurbidity,str(Time.tz),year,step)
+      entry=self._lookup(key,lambda: year_profile(site,Model,LinkeTurbidity,Time.tz,start,end,step))
+
+      rows=np.flatnonzero(years==year)
+      positions,offsets=np.divmod(epoch[rows] - start,step)
+      if np.any(offsets!=0):
+        raise Exception('Time must be on the '+str(pd.Timedelta(step))+' grid of its years, from January 1, 0h')
+      if data is None:
+        layout=entry[0]
+        data=np.empty((entry[1].shape[0],len(Time)))
+      data[:,rows]=entry[1][:,positions]
+
+    if data is None:
+      layout=[['series',name] for name in profile_names(Model)]
+      data=np.empty((len(layout),0))
+    result=unpack((layout,data),Time)
+    if Model=='haurwitz':
+      return result[0]
+    return result
+
+
+
+def profile_key(site,Model,LinkeTurbidity,tz,year,step):
+  '''
+  Cache key (a hex digest) of a year profile
+  '''
+  digest=hashlib.sha1()
+  digest.update(repr(('clearsky',site,Model,LinkeTurbidity,tz,int(year),int(step))).encode())
+  return digest.hexdigest()
+
+
+def profile_names(Model):
+  if Model=='haurwitz':
+    return INEICHEN_NAMES[:1]
+  return INEICHEN_NAMES
+
+
+def year_profile(site,Model,LinkeTurbidity,tz,start,end,step):
+  '''
+  Clear sky outputs of Model from start to end (epoch nanoseconds, end
+  excluded) every step, as a tuple of named Series
+  '''
+  latitude,longitude,altitude,TZ=site
+  Time=pd.DatetimeIndex(np.arange(start,end,step))
+  if tz is not None:
+    Time=Time.tz_localize('UTC').tz_convert(tz)
+  Location={'latitude':latitude,'longitude':longitude,'altitude':altitude,'TZ':TZ}
+
+  __,__,ApparentSunEl,__,__=pvl_ephemeris(Time,Location,pvl_alt2pres(altitude))
+  ApparentZenith=90 - ApparentSunEl
+
+  if Model=='haurwitz':
+    result=(pvl_clearsky_haurwitz(ApparentZenith),)
+  else:
+    if LinkeTurbidity=='monthly':
+      TL=pvl_linketurbidity(Time,latitude,longitude,Interpolate=False)[0]
+    elif LinkeTurbidity=='interpolated':
+      TL=pvl_linketurbidity(Time,latitude,longitude)[0]
+    else:
+      TL=LinkeTurbidity
+    result=pvl_clearsky_ineichen(Time,pvl_tools.repack(Location),LinkeTurbidity=TL,ApparentZenith=ApparentZenith)
+
+  return tuple(pd.Series(np.asarray(value,dtype=float),index=Time,name=name)
+               for name,value in zip(profile_names(Model),result))
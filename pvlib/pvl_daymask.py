@@ -0,0 +1,170 @@
+'''
+pvl_daymask
+===========
+
+Pack the daytime rows of a time series into compact arrays, run the model
+chain on them only, and scatter the results back onto the full time index
+
+'''
+
+import numpy as np
+import pandas as pd
+
+from pvl_solargeometry import SolarGeometry, SurfaceGeometry
+from pvl_sunrisesunset import pvl_sunrisesunset, local_time
+
+
+class DayMask():
+  '''
+  Daytime rows of a time index
+
+  About half of the rows of a year of data are night, where the irradiance,
+  transposition and module models only produce zeros or NaNs. A DayMask
+  selects the rows to keep once; pack() then takes those rows from every
+  input of the model chain, and scatter() returns the (shorter) outputs to
+  the full index, filling the night rows.
+
+  Parameters
+  ----------
+
+  Day : boolean array or Series
+          True for the rows to keep.
+
+  Time : Dataframe.index (optional)
+          The full time index. Defaults to Day.index.
+
+  Returns
+  -------
+
+  self : DayMask
+
+          *self.index* - the full time index
+
+          *self.day_index* - the index of the kept rows
+
+          *self.mask* - boolean array, True for the kept rows
+
+          *self.positions* - integer positions of the kept rows
+
+  Examples
+  --------
+
+  >>> mask=DayMask.from_suntimes(Time,Location)
+  >>> DNI,DHI,SunZen,SunAz=mask.pack(DNI,DHI,SunZen,SunAz)
+  >>> SkyDiffuse=pvl_perez(SurfTilt,SurfAz,DHI,DNI,HExtra,SunZen,SunAz,AM)
+  >>> SkyDiffuse=mask.scatter(SkyDiffuse,fill=0)
+
+  See Also
+  --------
+  pvl_sunrisesunset
+  '''
+
+  def __init__(self,Day,Time=None):
+    if Time is None:
+      Time=Day.index
+    self.index=Time
+    self.mask=np.asarray(Day,dtype=bool)
+    if len(self.mask)!=len(Time):
+      raise Exception('Day must have the same length as Time')
+    self.positions=np.flatnonzero(self.mask)
+    self.day_index=Time[self.positions]
+
+  @classmethod
+  def from_zenith(cls,SunZen,MaxZenith=90):
+    '''
+    Rows where the sun zenith angle (Series, or SolarGeometry) is below
+    MaxZenith degrees
+    '''
+    if isinstance(SunZen,SolarGeometry):
+      SunZen=SunZen.zenith
+    return cls(np.asarray(SunZen)<MaxZenith,SunZen.index)
+
+  @classmethod
+  def from_suntimes(cls,Time,Location,Margin='0min'):
+    '''
+    Rows between sunrise and sunset (widened by Margin on both sides), from
+    pvl_sunrisesunset. Use a Margin of one interval if the timestamps label
+    the start rather than the end of the averaging period.
+    '''
+    SunTimes=pvl_sunrisesunset(Time,Location)
+    margin=pd.Timedelta(Margin).value
+
+    #Rows and day boundaries as local wall-clock nanoseconds
+    local=local_time(Time).asi8
+    day=np.searchsorted(local_time(SunTimes.index).asi8,local_time(Time).normalize().asi8)
+    sunrise=local_time(pd.DatetimeIndex(SunTimes.sunrise)).asi8[day]
+    sunset=local_time(pd.DatetimeIndex(SunTimes.sunset)).asi8[day]
+    norts=np.asarray(pd.isnull(SunTimes.sunrise))[day]
+
+    Day=(local>=sunrise-margin) & (local<=sunset+margin) & ~norts
+    Day=Day | np.asarray(SunTimes.polarday)[day]
+    return cls(Day,Time)
+
+  def __len__(self):
+    return len(self.positions)
+
+  def pack(self,*values):
+    '''
+    Daytime rows of each value
+
+    Series and DataFrames keep the daytime part of their index, arrays of the
+    same length as the full index are indexed, and scalars, None and arrays
+    of other lengths are passed through. SolarGeometry and SurfaceGeometry
+    are rebuilt from their packed angles. Returns a single value or a tuple,
+    like the arguments.
+    '''
+    packed=tuple(self._pack(value) for value in values)
+    if len(packed)==1:
+      return packed[0]
+    return packed
+
+  def _pack(self,value):
+    if isinstance(value,SolarGeometry):
+      return SolarGeometry(self._pack(value.zenith),self._pack(value.azimuth))
+    if isinstance(value,SurfaceGeometry):
+      return SurfaceGeometry(self._pack(value.tilt),self._pack(value.azimuth))
+    if not(self._full_length(value)):
+      return value
+    if isinstance(value,(pd.Series,pd.DataFrame)):
+      return value.iloc[self.positions]
+    return np.asarray(value)[self.positions]
+
+  def _full_length(self,value):
+    return (isinstance(value,(pd.Series,pd.DataFrame,np.ndarray)) and np.ndim(value)>0
+            and len(value)==len(self.index))
+
+  def scatter(self,values,fill=np.nan):
+    '''
+    Full-length versions of the daytime results in values
+
+    Series, arrays and DataFrames with one row per daytime row become Series
+    (or DataFrames) on the full index, with fill in the other rows. Series
+    and DataFrames on some other part of the full index (e.g. pvl_perez drops
+    rows) are aligned by their index. A tuple or dict of results is scattered
+    item by item; anything else is passed through.
+    '''
+    if isinstance(values,tuple):
+      return tuple(self.scatter(value,fill) for value in values)
+    if isinstance(values,dict):
+      return dict((name,self.scatter(value,fill)) for name,value in values.items())
+
+    if isinstance(values,(pd.Series,pd.DataFrame)) and not(values.index.equals(self.day_index)):
+      return values.reindex(self.index,fill_value=fill)
+
+    if not(isinstance(values,(pd.Series,pd.DataFrame,np.ndarray))) or np.ndim(values)==0 \
+       or len(values)!=len(self.positions):
+      return values
+
+    if isinstance(values,pd.DataFrame):
+      out=np.empty((len(self.index),values.shape[1]),dtype=np.result_type(values.values,fill))
+      out[:]=fill
+      out[self.positions]=values.values
+      return pd.DataFrame(out,index=self.index,columns=values.columns)
+
+    data=np.asarray(values)
+    out=np.empty((len(self.index),)+data.shape[1:],dtype=np.result_type(data,fill))
+    out[:]=fill
+    out[self.positions]=data
+    if out.ndim>1:
+      return out
+    return pd.Series(out,index=self.index,name=getattr(values,'name',None))
@@ -3,6 +3,10 @@ import numpy as np
 import pvl_tools as pvt
 import pandas as pd
 
+
+COLUMNS=['DNI_gen_DISC','Kt_gen_DISC','AM','Ztemp']
+
+
 def pvl_disc(GHI,SunZen,Time,pressure=101325):
 
   '''
@@ -18,20 +22,21 @@ def pvl_disc(GHI,SunZen,Time,pressure=101325):
   GHI : float or DataFrame
           global horizontal irradiance in W/m^2. GHI must be >=0.
 
-  Z : float or DataFrame
+  SunZen : float or DataFrame
         True (not refraction - corrected) zenith angles in decimal degrees. 
-        Z must be >=0 and <=180.
+        SunZen must be >=0 and <=180.
 
-  doy : float or DataFrame
+  Time : Dataframe.index
 
-        the day of the year. doy must be >= 1 and < 367.
+        A pandas datatime object, which gives the day of the year of each
+        value.
 
   Other Parameters
   ----------------
 
   pressure : float or DataFrame (optional, Default=101325)
 
-        site pressure in Pascal. Pressure may be measured
+        site pressure in Pascal, one value or one per timestamp. Pressure may be measured
         or an average pressure may be calculated from site altitude. If
         pressure is omitted, standard pressure (101325 Pa) will be used, this
         is acceptable if the site is near sea level. If the site is not near
@@ -40,11 +45,18 @@ def pvl_disc(GHI,SunZen,Time,pressure=101325):
 
   Returns   
   -------
-  DNI : float or DataFrame
+  DFOut : DataFrame, indexed by Time, with the columns
+
+  DNI_gen_DISC : 
         The modeled direct normal irradiance in W/m^2 provided by the
-        Direct Insolation Simulation Code (DISC) model. 
-  Kt : float or DataFrame
+        Direct Insolation Simulation Code (DISC) model. DNI is 0 where
+        SunZen > 87 degrees or GHI < 1 W/m^2, and is never negative.
+  Kt_gen_DISC : 
         Ratio of global to extraterrestrial irradiance on a horizontal plane.
+  AM : 
+        Pressure-corrected airmass, at SunZen limited to 87 degrees
+  Ztemp : 
+        SunZen limited to 87 degrees
 
   References
   ----------
@@ -76,42 +88,61 @@ def pvl_disc(GHI,SunZen,Time,pressure=101325):
 
   var=pvt.Parse(Vars,Expect)
 
-  #create a temporary dataframe to house masked values, initially filled with NaN
-  temp=pd.DataFrame(index=var.Time,columns=['A','B','C'])
+  out=np.empty((len(COLUMNS),len(var.Time)))
+  disc(var.GHI,var.SunZen,var.Time.dayofyear,var.pressure,out=out)
+
+  return pd.DataFrame(out.T,index=var.Time,columns=COLUMNS,copy=False)
+
+
 
+def disc(GHI,SunZen,DayOfYear,pressure=101325,out=None):
+  '''
+  DISC model on ndarrays
+
+  The kernel of pvl_disc. GHI, SunZen, DayOfYear and pressure are arrays (or
+  scalars) which broadcast together. The Kt and airmass terms are cheap and
+  calculated on every row; the DNI regression (A, B, C and the exponential)
+  only on the rows where SunZen <= 87 degrees and GHI >= 1 W/m^2, the other
+  rows get a DNI of 0. Rows where GHI, SunZen or pressure is NaN get a DNI of
+  NaN.
+
+  Returns
+  -------
+
+  DNI, Kt, AM, Ztemp : arrays
+          rows of out, a float array of shape (4, number of rows), if given
+  '''
+  GHI,SunZen,DayOfYear,pressure=np.broadcast_arrays(*[np.asarray(value,dtype=float) for value in
+                                                      (GHI,SunZen,DayOfYear,pressure)])
+  if out is None:
+    out=np.empty((len(COLUMNS),)+GHI.shape)
+  DNI,Kt,AM,Ztemp=out
 
-  var.pressure=101325
-  doy=var.Time.dayofyear
-  DayAngle=2.0 * np.pi*((doy - 1)) / 365
+  DayAngle=2.0 * np.pi*((DayOfYear - 1)) / 365
   re=1.00011 + 0.034221*(np.cos(DayAngle)) + (0.00128)*(np.sin(DayAngle)) + 0.000719*(np.cos(2.0 * DayAngle)) + (7.7e-05)*(np.sin(2.0 * DayAngle))
   I0=re*(1370)
-  I0h=I0*(np.cos(np.radians(var.SunZen)))
-  Ztemp=var.SunZen
-  Ztemp[var.SunZen > 87]=87
-  AM=1.0 / (np.cos(np.radians(Ztemp)) + 0.15*(((93.885 - Ztemp) ** (- 1.253))))*(var.pressure) / 101325
-  Kt=var.GHI / (I0h)
-  Kt[Kt < 0]=0
-  temp.A[Kt > 0.6]=- 5.743 + 21.77*(Kt[Kt > 0.6]) - 27.49*(Kt[Kt > 0.6] ** 2) + 11.56*(Kt[Kt > 0.6] ** 3)
-  temp.B[Kt > 0.6]=41.4 - 118.5*(Kt[Kt > 0.6]) + 66.05*(Kt[Kt > 0.6] ** 2) + 31.9*(Kt[Kt > 0.6] ** 3)
-  temp.C[Kt > 0.6]=- 47.01 + 184.2*(Kt[Kt > 0.6]) - 222.0 * Kt[Kt > 0.6] ** 2 + 73.81*(Kt[Kt > 0.6] ** 3)
-  temp.A[(Kt <= 0.6-1)]=0.512 - 1.56*(Kt[(Kt <= 0.6-1)]) + 2.286*(Kt[(Kt <= 0.6-1)] ** 2) - 2.222*(Kt[(Kt <= 0.6-1)] ** 3)
-  temp.B[(Kt <= 0.6-1)]=0.37 + 0.962*(Kt[(Kt <= 0.6-1)])
-  temp.C[(Kt <= 0.6-1)]=- 0.28 + 0.932*(Kt[(Kt <= 0.6-1)]) - 2.048*(Kt[(Kt <= 0.6-1)] ** 2)
-  #return to numeric after masking operations 
-  temp=temp.astype(float)
-  delKn=temp.A + temp.B*((temp.C*(AM)).apply(np.exp))
-  Knc=0.866 - 0.122*(AM) + 0.0121*(AM ** 2) - 0.000653*(AM ** 3) + 1.4e-05*(AM ** 4)
-  Kn=Knc - delKn
-  DNI=(Kn)*(I0)
-
-  # DNI[var.SunZen > 87]=0
-  # DNI[var.GHI < 1]=0
-  # DNI[DNI < 0]=0
-
-  DFOut=pd.DataFrame({'DNI_gen_DISC':DNI})
-
-  DFOut['Kt_gen_DISC']=Kt
-  DFOut['AM']=AM
-  DFOut['Ztemp']=Ztemp
-
-  return DFOut
+  with np.errstate(divide='ignore',invalid='ignore'):
+    np.divide(GHI,I0*(np.cos(np.radians(SunZen))),out=Kt)
+  np.maximum(Kt,0,out=Kt)
+  np.minimum(SunZen,87,out=Ztemp)
+  np.multiply(1.0 / (np.cos(np.radians(Ztemp)) + 0.15*(((93.885 - Ztemp) ** (- 1.253)))),pressure / 101325,out=AM)
+
+  DNI[...]=0
+  DNI[np.isnan(GHI) | np.isnan(SunZen) | np.isnan(pressure)]=np.nan
+  day=(SunZen <= 87) & (GHI >= 1)
+  if not(np.any(day)):
+    return out
+  kt=Kt[day]
+  am=AM[day]
+
+  #Regression coefficients of the two clearness regimes, evaluated once per mask
+  high=kt > 0.6
+  A=np.where(high,-5.743 + kt*(21.77 + kt*(-27.49 + kt*11.56)),0.512 + kt*(-1.56 + kt*(2.286 - kt*2.222)))
+  B=np.where(high,41.4 + kt*(-118.5 + kt*(66.05 + kt*31.9)),0.37 + 0.962*kt)
+  C=np.where(high,-47.01 + kt*(184.2 + kt*(-222.0 + kt*73.81)),-0.28 + kt*(0.932 - kt*2.048))
+  Knc=0.866 + am*(-0.122 + am*(0.0121 + am*(-0.000653 + am*1.4e-05)))
+  with np.errstate(over='ignore',invalid='ignore'): #unphysical Kt >> 1 overflows to a DNI of 0
+    delKn=A + B*np.exp(C*am)
+    DNI[day]=np.maximum((Knc - delKn)*I0[day],0)
+
+  return out
@@ -87,13 +87,13 @@ def pvl_ephemeris(Time,Location,pressure=101325,temperature=12):
   '''
   Latitude=var.Location['latitude']
   Longitude=1 * var.Location['longitude']
-  Year=var.Time.year
-  Month=var.Time.month
-  Day=var.Time.day
-  Hour=var.Time.hour
-  Minute=var.Time.minute
-  Second=var.Time.second
-  DayOfYear=var.Time.dayofyear
+  Year=np.asarray(var.Time.year)
+  Month=np.asarray(var.Time.month)
+  Day=np.asarray(var.Time.day)
+  Hour=np.asarray(var.Time.hour)
+  Minute=np.asarray(var.Time.minute)
+  Second=np.asarray(var.Time.second)
+  DayOfYear=np.asarray(var.Time.dayofyear)
   
   DecHours=Hour + Minute / float(60) + Second / float(3600)
 
@@ -122,14 +122,7 @@ def pvl_ephemeris(Time,Location,pressure=101325,temperature=12):
   MlPerigee=281.22083 + 4.70684e-05 * EpochDate + 0.000453 * T1 ** 2 + 3e-06 * T1 ** 3
   MeanAnom=np.mod((358.47583 + 0.985600267 * EpochDate - 0.00015 * T1 ** 2 - 3e-06 * T1 ** 3),360)
   Eccen=0.01675104 - 4.18e-05 * T1 - 1.26e-07 * T1 ** 2
-  EccenAnom=MeanAnom
-  E=0
-
-  while np.max(abs(EccenAnom - E)) > 0.0001:
-
-    E=EccenAnom
-    EccenAnom=MeanAnom + np.degrees(Eccen)*(np.sin(np.radians(E)))
-  #pdb.set_trace()     
+  EccenAnom=eccentric_anomaly(MeanAnom,Eccen)
   TrueAnom=2 * np.mod(np.degrees(np.arctan2(((1 + Eccen) / (1 - Eccen)) ** 0.5*np.tan(np.radians(EccenAnom) / float(2)),1)),360)
   EcLon=np.mod(MlPerigee + TrueAnom,360) - Abber
   EcLonR=np.radians(EcLon)
@@ -148,21 +141,7 @@ def pvl_ephemeris(Time,Location,pressure=101325,temperature=12):
   SunEl=np.degrees(np.arcsin((np.cos(LatR)*(np.cos(DecR))*(np.cos(HrAngleR)) + np.sin(LatR)*(np.sin(DecR))))) #potential error
   SolarTime=(180 + HrAngle) / float(15)
 
-  Refract=[]
-
-  for Elevation in SunEl:
-      TanEl=np.tan(np.radians(Elevation))
-      if Elevation>5 and Elevation<=85:
-          Refract.append((58.1 / float(TanEl) - 0.07 / float(TanEl ** 3) + 8.6e-05 / float(TanEl ** 5)))
-      elif Elevation > -0.575 and Elevation <=5:
-          Refract.append((Elevation*((- 518.2 + Elevation*((103.4 + Elevation*((- 12.79 + Elevation*(0.711))))))) + 1735))
-      elif Elevation> -1 and Elevation<= -0.575:
-          Refract.append(- 20.774 / float(TanEl))
-      else:
-          Refract.append(0)
-
-
-  Refract=np.array(Refract)*((283 / float(273 + var.temperature)))*(var.pressure) / float(101325) / float(3600)
+  Refract=refraction(SunEl)*((283 / float(273 + var.temperature)))*(var.pressure) / float(101325) / float(3600)
 
 
   SunZen=90-SunEl
@@ -177,3 +156,83 @@ def pvl_ephemeris(Time,Location,pressure=101325,temperature=12):
   DFOut['SolarTime']=SolarTime
 
   return DFOut['SunAz'], DFOut['SunEl'], DFOut['ApparentSunEl'], DFOut['SolarTime'], DFOut['SunZen']
+
+
+
+def eccentric_anomaly(MeanAnom,Eccen,iterations=5):
+  '''
+  Solve Kepler's equation for the eccentric anomaly
+
+  Vectorized fixed-point solution of E = M + e*sin(E), with all angles in
+  degrees. The iteration contracts by a factor of at least e on every step,
+  and e < 0.0168 for the Earth's orbit, so the default 5 iterations from a
+  starting guess of M converge to better than 1e-8 degrees.
+
+  Parameters
+  ----------
+
+  MeanAnom : float or array
+        Mean anomaly in decimal degrees
+
+  Eccen : float or array
+        Orbital eccentricity
+
+  Other Parameters
+  ----------------
+
+  iterations : int (optional, default=5)
+        Number of fixed-point updates
+
+  Returns
+  -------
+
+  EccenAnom : float or array
+        Eccentric anomaly in decimal degrees
+  '''
+
+  EccenDeg=np.degrees(Eccen)
+  EccenAnom=MeanAnom
+  for i in range(iterations):
+    EccenAnom=MeanAnom + EccenDeg*(np.sin(np.radians(EccenAnom)))
+
+  return EccenAnom
+
+
+
+def refraction(Elevation):
+  '''
+  Atmospheric refraction at standard conditions
+
+  Masked, vectorized form of the piecewise refraction formula used by
+  pvl_ephemeris. Each branch is evaluated only on the elevations it covers.
+
+  Parameters
+  ----------
+
+  Elevation : float or array
+        True sun elevation in decimal degrees
+
+  Returns
+  -------
+
+  Refract : array
+        Refraction in arc seconds at 283 K and 101325 Pa. Zero for
+        elevations above 85 degrees or at or below -1 degree.
+  '''
+
+  Elevation=np.asarray(Elevation,dtype=float)
+  Refract=np.zeros(Elevation.shape)
+
+  High=(Elevation > 5) & (Elevation <= 85)
+  Low=(Elevation > -0.575) & (Elevation <= 5)
+  Below=(Elevation > -1) & (Elevation <= -0.575)
+
+  TanEl=np.tan(np.radians(Elevation[High]))
+  Refract[High]=58.1 / TanEl - 0.07 / TanEl ** 3 + 8.6e-05 / TanEl ** 5
+
+  El=Elevation[Low]
+  Refract[Low]=El*((- 518.2 + El*((103.4 + El*((- 12.79 + El*(0.711))))))) + 1735
+
+  Refract[Below]=- 20.774 / np.tan(np.radians(Elevation[Below]))
+
+  return Refract
@@ -0,0 +1,147 @@
+'''
+pvl_geocentrictable
+===================
+
+Table of the geocentric sun position on disk, so that the SPA periodic term
+sums are evaluated once per table step instead of once per timestamp and
+site
+
+'''
+
+import os
+import json
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import spa_numpy
+from pvl_interpsolarposition import cubic_interpolation
+
+
+COLUMNS=['alpha','delta','r','equinoxes','eot']
+MARGIN=2.0 #days of table before and after the years, for time zones and delta_t
+BLOCK=2**16 #rows per block while building
+
+
+class GeocentricTable():
+  '''
+  Memory-mapped table of the geocentric sun position
+
+  The table holds, at a regular step of terrestrial time (JDE), the
+  geocentric right ascension *alpha* (degrees, unwrapped), declination
+  *delta* (degrees), Earth-Sun distance *r* (AU), equation of the equinoxes
+  *equinoxes* (nutation in right ascension, degrees) and equation of time
+  *eot* (minutes) of the NREL SPA. These only depend on time. They are
+  interpolated with four-point cubic polynomials, and the apparent sidereal
+  time is rebuilt from its exact mean part, so that the topocentric step of
+  the SPA is all that remains per timestamp and site.
+
+  Build a table once with GeocentricTable.build(), then open it with
+  GeocentricTable(filename) and pass it to pvl_spa as Table. Opening only
+  maps the file, and only the pages around the requested times are read.
+
+  Parameters
+  ----------
+
+  filename : string
+          Path of the table, without extension (a .npy and a .json file)
+
+  Returns
+  -------
+
+  self : GeocentricTable
+
+          *self.geocentric(jd,delta_t=67)* - the intermediate SPA values used
+          by the topocentric step (alpha, delta, r, nu) and eot, like
+          spa_numpy.geocentric_sun
+
+          *self.start*, *self.end* - range of the table, Julian ephemeris days
+
+          *self.step* - step of the table in days
+
+  Notes
+  -----
+
+  With the default step of one hour the interpolated values differ from the
+  full SPA by less than 1e-9 degrees (and 1e-9 minutes for the equation of
+  time), and a one-day step is still within 1e-6. That is far below the
+  0.0003 degree uncertainty of the SPA itself. The topocentric zenith has
+  the same error; the azimuth error grows as the sun approaches the zenith.
+
+  See Also
+  --------
+  pvl_spa
+  '''
+
+  def __init__(self,filename):
+    self.filename=filename
+    with open(filename+'.json') as f:
+      layout=json.load(f)
+    if layout['columns']!=COLUMNS:
+      raise Exception('Not a geocentric table: '+filename)
+    self.start=layout['start']
+    self.step=layout['step']
+    self.data=np.load(filename+'.npy',mmap_mode='r')
+    self.end=self.start + self.step*(len(self.data)-1)
+
+  @classmethod
+  def build(cls,filename,StartYear,EndYear,Step='1H'):
+    '''
+    Calculate the table for the years StartYear to EndYear (inclusive) with
+    the full SPA, write it to filename (.npy and .json) and open it
+    '''
+    step=pd.Timedelta(Step).value/8.64e13
+    if step<=0:
+      raise Exception('Step must be positive')
+    start=float(spa_numpy.julian_day(StartYear,1,1,0,0,0)) - MARGIN
+    rows=int(np.ceil((spa_numpy.julian_day(EndYear+1,1,1,0,0,0) + MARGIN - start)/step)) + 1
+
+    directory=os.path.dirname(os.path.abspath(filename))
+    fd,tmp=tempfile.mkstemp(dir=directory,suffix='.npy')
+    os.close(fd)
+    data=np.lib.format.open_memmap(tmp,mode='w+',dtype=float,shape=(rows,len(COLUMNS)))
+    for first in range(0,rows,BLOCK):
+      block=slice(first,min(rows,first+BLOCK))
+      geo=spa_numpy.geocentric_sun(start + step*np.arange(block.start,block.stop),0) #jd is JDE here
+      data[block,0]=geo['alpha']
+      data[block,1]=geo['delta']
+      data[block,2]=geo['r']
+      data[block,3]=geo['del_psi']*np.cos(np.radians(geo['epsilon']))
+      data[block,4]=spa_numpy.equation_of_time(geo)
+    data[:,0]=np.degrees(np.unwrap(np.radians(data[:,0])))
+    data.flush()
+    del data
+
+    #Write to temporary files and rename, so that readers never see a partial table
+    fd,tmpjson=tempfile.mkstemp(dir=directory)
+    with os.fdopen(fd,'w') as f:
+      json.dump({'columns':COLUMNS,'start':start,'step':step},f)
+    os.rename(tmp,filename+'.npy')
+    os.rename(tmpjson,filename+'.json')
+
+    return cls(filename)
+
+  def geocentric(self,jd,delta_t=67):
+    '''
+    Geocentric sun position at the Julian days (UT) jd
+
+    Returns
+    -------
+
+    geo : dict
+          alpha, delta, r, nu (apparent sidereal time) and eot, as in
+          spa_numpy.geocentric_sun
+    '''
+    jd=np.asarray(jd,dtype=float)
+    jde=jd + delta_t/86400.0
+    if jde.size and (np.min(jde)<self.start + self.step or np.max(jde)>=self.end - self.step):
+      raise Exception('Time is outside of the range of the geocentric table '+self.filename)
+
+    values=cubic_interpolation(self.data.T,self.start,self.step,jde)
+    jc=(jd - 2451545.0)/36525.0
+    return {'alpha':spa_numpy.limit_degrees(values[0]),
+            'delta':values[1],
+            'r':values[2],
+            'nu':spa_numpy.greenwich_mean_sidereal_time(jd,jc) + values[3],
+            'eot':values[4]}
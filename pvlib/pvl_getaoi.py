@@ -2,6 +2,8 @@
 import pandas as pd
 import numpy as np
 import pvl_tools
+from pvl_solargeometry import SolarGeometry, SurfaceGeometry
+
 def pvl_getaoi(SurfTilt,SurfAz,SunZen,SunAz):
   '''
   Determine angle of incidence from surface tilt/azimuth and apparent sun zenith/azimuth 
@@ -25,6 +27,8 @@ def pvl_getaoi(SurfTilt,SurfAz,SunZen,SunAz):
                inputs. SurfAz must be >=0 and <=360. The Azimuth convention is defined
                as degrees east of north (e.g. North = 0, East = 90, West = 270).
 
+               SurfTilt may instead be a SurfaceGeometry, in which case SurfAz is ignored.
+
   SunZen : scalar or DataFrame of apparent (refraction-corrected) zenith angles in decimal degrees. 
 
                If SunZen is a DataFrame it must be of the same size as all other DataFrame 
@@ -36,6 +40,8 @@ def pvl_getaoi(SurfTilt,SurfAz,SunZen,SunAz):
                inputs. SunAz must be >=0 and <=360. The Azimuth convention is defined
                as degrees east of north (e.g. North = 0, East = 90, West = 270).
 
+               SunZen may instead be a SolarGeometry, in which case SunAz is ignored.
+
   Returns
   -------
   AOI : DataFrame
@@ -50,9 +56,17 @@ def pvl_getaoi(SurfTilt,SurfAz,SunZen,SunAz):
   See Also
   --------
   PVL_EPHEMERIS
+  SolarGeometry
+  SurfaceGeometry
   '''
 
+  Sun=SolarGeometry.make(SunZen,SunAz)
+  Surface=SurfaceGeometry.make(SurfTilt,SurfAz)
+  SunZen,SunAz=Sun.zenith,Sun.azimuth
+  SurfTilt,SurfAz=Surface.tilt,Surface.azimuth
+
   Vars=locals()
+  del Vars['Sun'],Vars['Surface'] #geometry objects, not arguments
   Expect={'SurfTilt':('num','x>=0'),
   		'SurfAz':('num','x>=-180','x<=180'),
   		'SunZen':('x>=0'),
@@ -61,7 +75,7 @@ def pvl_getaoi(SurfTilt,SurfAz,SunZen,SunAz):
 
   var=pvl_tools.Parse(Vars,Expect)
 
-  AOI=np.degrees(np.arccos(np.cos(np.radians(var.SunZen))*(np.cos(np.radians(var.SurfTilt))) + np.sin(np.radians(var.SurfTilt))*(np.sin(np.radians(var.SunZen)))*(np.cos(np.radians(var.SunAz) - np.radians(var.SurfAz))))) #Duffie and Beckmann 1.6.3
+  AOI=np.degrees(np.arccos(np.clip(Surface.cos_aoi(Sun),-1,1))) #Duffie and Beckmann 1.6.3
 
 
   return pd.DataFrame({'AOI':AOI})
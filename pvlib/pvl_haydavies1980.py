@@ -2,6 +2,7 @@
 
 import numpy as np
 import pvl_tools
+from pvl_solargeometry import SolarGeometry, SurfaceGeometry
 
 def pvl_haydavies1980(SurfTilt,SurfAz,DHI,DNI,HExtra,SunZen,SunAz):
 
@@ -29,6 +30,7 @@ def pvl_haydavies1980(SurfTilt,SurfAz,DHI,DNI,HExtra,SunZen,SunAz):
           Surface azimuth angles in decimal degrees.
           SurfAz must be >=0 and <=360. The Azimuth convention is defined
           as degrees east of north (e.g. North = 0, South=180 East = 90, West = 270).
+          SurfTilt may instead be a SurfaceGeometry, in which case SurfAz is ignored.
 
     DHI : float or DataFrame
           diffuse horizontal irradiance in W/m^2. 
@@ -51,6 +53,7 @@ def pvl_haydavies1980(SurfTilt,SurfAz,DHI,DNI,HExtra,SunZen,SunAz):
           Sun azimuth angles in decimal degrees.
           SunAz must be >=0 and <=360. The Azimuth convention is defined
           as degrees east of north (e.g. North = 0, East = 90, West = 270).
+          SunZen may instead be a SolarGeometry, in which case SunAz is ignored.
 
     Returns
     --------
@@ -84,10 +87,18 @@ def pvl_haydavies1980(SurfTilt,SurfAz,DHI,DNI,HExtra,SunZen,SunAz):
     pvl_klucher1979   
     pvl_kingdiffuse
     pvl_spa
+    SolarGeometry
+    SurfaceGeometry
 
     '''
 
+    Sun=SolarGeometry.make(SunZen,SunAz)
+    Surface=SurfaceGeometry.make(SurfTilt,SurfAz)
+    SunZen,SunAz=Sun.zenith,Sun.azimuth
+    SurfTilt,SurfAz=Surface.tilt,Surface.azimuth
+
     Vars=locals()
+    del Vars['Sun'],Vars['Surface'] #geometry objects, not arguments
     Expect={'SurfTilt':('num','x>=0'),
               'SurfAz':('x>=-180'),
               'DHI':('x>=0'),
@@ -98,13 +109,13 @@ def pvl_haydavies1980(SurfTilt,SurfAz,DHI,DNI,HExtra,SunZen,SunAz):
               }
     var=pvl_tools.Parse(Vars,Expect)
 
-    COSTT=pvl_tools.cosd(SurfTilt)*pvl_tools.cosd(SunZen) + pvl_tools.sind(SurfTilt)*pvl_tools.sind(SunZen)*pvl_tools.cosd(SunAz - SurfAz)
+    COSTT=Surface.cos_aoi(Sun)
 
-    RB=np.max(COSTT,0) / np.max(pvl_tools.cosd(SunZen),0.01745)
+    RB=np.maximum(COSTT,0) / np.maximum(Sun.cos_zenith,0.01745)
 
     AI=DNI / HExtra
 
-    SkyDiffuse=DHI*((AI*(RB) + (1 - AI)*(0.5)*((1 + pvl_tools.cosd(SurfTilt)))))
+    SkyDiffuse=DHI*((AI*(RB) + (1 - AI)*(0.5)*((1 + Surface.cos_tilt))))
 
 
     return SkyDiffuse
@@ -0,0 +1,85 @@
+'''
+pvl_iamtable
+============
+
+Incidence angle modifier tables, built once per model and parameter set and
+shared by the tabulated modes of pvl_physicaliam and pvl_ashraeiam
+
+'''
+
+import collections
+
+import numpy as np
+import pandas as pd
+
+
+IAM_TABLE_STEP=0.01 #degrees of angle of incidence between table entries
+IAM_TABLE_SIZE=int(round(90/IAM_TABLE_STEP)) + 1
+MAX_TABLES=64 #parameter sets kept, the least recently used is dropped first
+
+_tables=collections.OrderedDict() #process-wide, keyed by model and parameters
+_grid=np.linspace(0,90,IAM_TABLE_SIZE)
+_grid.flags.writeable=False
+
+
+def iam_table(key,fcn):
+  '''
+  IAM table of a model and parameter set
+
+  Parameters
+  ----------
+
+  key : tuple
+          hashable model name and parameters, e.g. ('ashrae', 0.05)
+
+  fcn : function
+          IAM of an array of angles of incidence in [0, 90] degrees, only
+          called if the table of key is not cached yet
+
+  Returns
+  -------
+
+  table : array
+          read-only IAM at every IAM_TABLE_STEP degrees from 0 to 90
+  '''
+  if key in _tables:
+    table=_tables.pop(key)
+  else:
+    table=np.asarray(fcn(_grid),dtype=float)
+    table.flags.writeable=False
+    if len(_tables)>=MAX_TABLES:
+      _tables.popitem(last=False)
+  _tables[key]=table
+  return table
+
+
+def interp_iam(table,theta):
+  '''
+  IAM of angles of incidence (degrees, any shape) interpolated linearly in
+  table. Negative angles are evaluated at their absolute value and angles
+  beyond 90 degrees get 0, as in pvl_physicaliam and pvl_ashraeiam.
+
+  The table is uniform, so the entries around each angle are found by
+  direct indexing rather than the binary search of np.interp.
+  '''
+  angle=np.abs(theta)
+  position=angle/IAM_TABLE_STEP
+  with np.errstate(invalid='ignore'):
+    i=np.clip(position.astype(np.intp),0,IAM_TABLE_SIZE-2)
+  low=table[i]
+  IAM=low + (position - i)*(table[i+1] - low)
+  with np.errstate(invalid='ignore'):
+    return np.where(angle>90,0,IAM)
+
+
+def iam_like(theta,IAM):
+  '''
+  IAM with the type, index and columns of the input angles theta
+  '''
+  if isinstance(theta,pd.DataFrame):
+    return pd.DataFrame(IAM,index=theta.index,columns=theta.columns)
+  if isinstance(theta,pd.Series):
+    return pd.Series(IAM,index=theta.index,name=theta.name)
+  if np.ndim(IAM)==0:
+    return float(IAM)
+  return IAM
@@ -0,0 +1,201 @@
+import numpy as np
+import pandas as pd
+import pvl_tools
+from pvl_spa import pvl_spa
+from pvl_ephemeris import pvl_ephemeris, refraction
+import spa_numpy
+
+
+def pvl_interpsolarposition(Time,Location,Algorithm='spa',MaxError=0.01,Step='1H',**kwargs):
+  '''
+  Solar position on high frequency timestamps, interpolated from a coarse grid
+
+  The exact position is calculated by pvl_spa or pvl_ephemeris on a regular
+  coarse grid spanning Time. The sun unit vector (not the angles, so there
+  are no problems with azimuth wrapping or near the zenith) is interpolated
+  onto Time with four-point cubic polynomials, and the refraction correction
+  is applied afterwards at full resolution.
+
+  The interpolation error is checked against the exact position in the
+  middle of every coarse interval, where it is largest. While it exceeds
+  MaxError the grid spacing is halved. If the grid would have as many
+  points as Time, the position is calculated directly instead.
+
+  Parameters
+  ----------
+
+  Time : Dataframe.index
+
+      A pandas datatime object
+
+  Location : struct
+
+      Standard location structure, see pvl_spa or pvl_ephemeris
+
+  Algorithm : string (optional, default 'spa')
+
+      'spa' (pvl_spa) or 'ephemeris' (pvl_ephemeris)
+
+  MaxError : float (optional, default 0.01)
+
+      Maximum angular error of the interpolated sun position in decimal
+      degrees. The check is made on the unrefracted position with a margin
+      for the largest slope of the refraction correction near the horizon.
+      Both refraction models switch off abruptly below the horizon (SPA at
+      -0.83 degrees elevation, ephemeris at -1 degree), so within MaxError
+      of that point the correction may be applied on the other side of the
+      step.
+
+  Step : string or Timedelta (optional, default '1H')
+
+      Initial spacing of the coarse grid
+
+  kwargs :
+
+      Pressure and Temperature for 'spa', pressure and temperature for
+      'ephemeris'. These only enter the refraction correction, so they may
+      be vectors of the same length as Time.
+
+  Returns
+  -------
+
+  The same outputs as pvl_spa (Function=SPA_ZA, so SPAOut has no columns) or
+  pvl_ephemeris, indexed by Time
+
+  See Also
+  --------
+  pvl_spa
+  pvl_ephemeris
+  pvl_solarpositioncache
+  '''
+
+  Vars=locals()
+  del Vars['kwargs'] #algorithm inputs, checked below
+  Expect={'Time':'',
+          'Location':'',
+          'Algorithm':('str',('spa','ephemeris')),
+          'MaxError':('num','x>0'),
+          'Step':''
+          }
+  var=pvl_tools.Parse(Vars,Expect)
+
+  if Algorithm=='spa':
+    allowed=('Pressure','Temperature')
+  else:
+    allowed=('pressure','temperature')
+  for name in kwargs:
+    if not(name in allowed):
+      raise Exception('Only '+' and '.join(allowed)+' are accepted for Algorithm '+Algorithm)
+
+  #Margin for the slope of the refraction correction near the horizon (about 0.2)
+  tolerance=float(MaxError)/1.25
+
+  t=np.asarray(Time.asi8,dtype=np.int64)
+  step=int(pd.Timedelta(Step).value)
+  if len(t)==0:
+    step=0
+
+  while step>=10**9:
+    grid=np.arange((t.min()//step - 1)*step,t.max() + 3*step,step)
+    if 2*len(grid)>=len(t):
+      break
+    zenith,azimuth,solartime=true_position(Algorithm,grid_index(grid,Time),Location)
+    vectors=unit_vectors(zenith,azimuth)
+
+    #Exact and interpolated position in the middle of each interval
+    middle=grid[1:-2] + step//2
+    mzenith,mazimuth,__=true_position(Algorithm,grid_index(middle,Time),Location)
+    exact=unit_vectors(mzenith,mazimuth)
+    approx=normalize(cubic_interpolation(vectors,grid[0],step,middle))
+    error=np.degrees(np.arccos(np.clip(np.sum(exact*approx,axis=0),-1,1)))
+
+    if np.max(error)<=tolerance:
+      approx=normalize(cubic_interpolation(vectors,grid[0],step,t))
+      zenith=np.degrees(np.arccos(np.clip(approx[2],-1,1)))
+      azimuth=np.mod(np.degrees(np.arctan2(approx[0],approx[1])),360)
+      if solartime is not None:
+        solartime=np.mod(cubic_interpolation(np.unwrap(solartime*np.pi/12)*12/np.pi,grid[0],step,t),24)
+      return apparent_outputs(Algorithm,Time,zenith,azimuth,solartime,kwargs)
+
+    step=step//2
+
+  #Too few timestamps for interpolation to pay off
+  if Algorithm=='spa':
+    return pvl_spa(Time,Location,**kwargs)
+  return pvl_ephemeris(Time,Location,**kwargs)
+
+
+
+def grid_index(grid,Time):
+  '''
+  DatetimeIndex of int64 nanoseconds, in the same timezone as Time
+  '''
+  index=pd.DatetimeIndex(grid)
+  if Time.tz is not None:
+    index=index.tz_localize('UTC').tz_convert(Time.tz)
+  return index
+
+
+def true_position(Algorithm,Time,Location):
+  '''
+  Zenith without refraction and azimuth from North, plus the solar time for
+  'ephemeris'
+  '''
+  if Algorithm=='spa':
+    SunAz,SunEl,Zenith,__=pvl_spa(Time,Location,Pressure=0) #no refraction at zero pressure
+    return np.asarray(Zenith), np.asarray(SunAz)+180, None
+
+  SunAz,SunEl,ApparentSunEl,SolarTime,SunZen=pvl_ephemeris(Time,Location)
+  return 90-np.asarray(SunEl), np.asarray(SunAz)+180, np.asarray(SolarTime)
+
+
+def unit_vectors(zenith,azimuth):
+  '''
+  East, North, Up components of the sun direction
+  '''
+  zenith=np.radians(zenith)
+  azimuth=np.radians(azimuth)
+  return np.vstack((np.sin(zenith)*np.sin(azimuth),np.sin(zenith)*np.cos(azimuth),np.cos(zenith)))
+
+
+def normalize(vectors):
+  return vectors/np.sqrt(np.sum(vectors**2,axis=0))
+
+
+def cubic_interpolation(values,start,step,t):
+  '''
+  Four-point Lagrange interpolation of values (last axis sampled every step
+  nanoseconds from start) at the nanosecond timestamps t. The error term is
+  proportional to f(f+1)(f-1)(f-2), which peaks in the middle of an interval.
+  '''
+  u=(t-start)/float(step)
+  i=np.clip(np.floor(u).astype(int),1,values.shape[-1]-3)
+  f=u-i
+  return (values[...,i-1]*(-f*(f-1)*(f-2)/6) + values[...,i]*((f+1)*(f-1)*(f-2)/2) +
+          values[...,i+1]*(-(f+1)*f*(f-2)/2) + values[...,i+2]*((f+1)*f*(f-1)/6))
+
+
+def apparent_outputs(Algorithm,Time,zenith,azimuth,solartime,kwargs):
+  '''
+  Outputs of pvl_spa or pvl_ephemeris from the unrefracted position
+  '''
+  if Algorithm=='spa':
+    Pressure=np.asarray(kwargs.get('Pressure',820),dtype=float)
+    Temperature=np.asarray(kwargs.get('Temperature',11),dtype=float)
+    zenith=zenith-spa_numpy.atmospheric_refraction_correction(Pressure,Temperature,0.5667,90-zenith)
+    DFOut=pd.DataFrame({'zenith':zenith,'azimuth180':azimuth-180},index=Time)
+    DFOut['SunEl']=90-DFOut.zenith
+    return DFOut['azimuth180'],DFOut['SunEl'],DFOut['zenith'],pd.DataFrame(index=Time)
+
+  pressure=np.asarray(kwargs.get('pressure',101325),dtype=float)
+  temperature=np.asarray(kwargs.get('temperature',12),dtype=float)
+  SunEl=90-zenith
+  Refract=refraction(SunEl)*((283 / (273 + temperature)))*(pressure) / float(101325) / float(3600)
+
+  DFOut=pd.DataFrame({'SunEl':SunEl}, index=Time)
+  DFOut['SunAz']=azimuth-180
+  DFOut['SunZen']=np.minimum(zenith,90)
+  DFOut['ApparentSunEl']=SunEl + Refract
+  DFOut['SolarTime']=solartime
+
+  return DFOut['SunAz'], DFOut['SunEl'], DFOut['ApparentSunEl'], DFOut['SolarTime'], DFOut['SunZen']
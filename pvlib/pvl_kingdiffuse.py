@@ -1,5 +1,6 @@
 import numpy as np
 import pvl_tools
+from pvl_solargeometry import SolarGeometry, SurfaceGeometry
 
 def pvl_kingdiffuse(SurfTilt,DHI,GHI,SunZen):
 	'''
@@ -20,6 +21,7 @@ def pvl_kingdiffuse(SurfTilt,DHI,GHI,SunZen):
 	      SurfTilt must be >=0 and <=180. The tilt angle is defined as
 	      degrees from horizontal (e.g. surface facing up = 0, surface facing
 	      horizon = 90)
+	      SurfTilt may instead be a SurfaceGeometry.
 	DHI : float or DataFrame
 	      diffuse horizontal irradiance in W/m^2. 
 	      DHI must be >=0.
@@ -31,6 +33,7 @@ def pvl_kingdiffuse(SurfTilt,DHI,GHI,SunZen):
 	      apparent (refraction-corrected) zenith
 	      angles in decimal degrees. 
 	      SunZen must be >=0 and <=180.
+	      SunZen may instead be a SolarGeometry.
 
 	Returns
 	--------
@@ -52,9 +55,17 @@ def pvl_kingdiffuse(SurfTilt,DHI,GHI,SunZen):
 	pvl_perez 
 	pvl_klucher1979   
 	pvl_reindl1990
+	SolarGeometry
+	SurfaceGeometry
 
 	'''
+	Sun=SolarGeometry.make(SunZen)
+	Surface=SurfaceGeometry.make(SurfTilt)
+	SunZen=Sun.zenith
+	SurfTilt=Surface.tilt
+
 	Vars=locals()
+	del Vars['Sun'],Vars['Surface'] #geometry objects, not arguments
 	Expect={'SurfTilt':('num','x>=0'),
 	      'SunZen':('x>=-180'),
 	      'DHI':('x>=0'),
@@ -63,6 +74,6 @@ def pvl_kingdiffuse(SurfTilt,DHI,GHI,SunZen):
 
 	var=pvl_tools.Parse(Vars,Expect)
 
-	SkyDiffuse=DHI*((1 + pvl_tools.cosd(SurfTilt))) / 2 + GHI*((0.012 * SunZen - 0.04))*((1 - pvl_tools.cosd(SurfTilt))) / 2
+	SkyDiffuse=DHI*((1 + Surface.cos_tilt)) / 2 + GHI*((0.012 * SunZen - 0.04))*((1 - Surface.cos_tilt)) / 2
 
 	return SkyDiffuse
@@ -1,5 +1,6 @@
 import numpy as np
 import pvl_tools
+from pvl_solargeometry import SolarGeometry, SurfaceGeometry
 
 def pvl_klucher1979(SurfTilt,SurfAz,DHI,GHI,SunZen,SunAz):
     '''
@@ -26,6 +27,7 @@ def pvl_klucher1979(SurfTilt,SurfAz,DHI,GHI,SunZen,SunAz):
             Surface azimuth angles in decimal degrees.
             SurfAz must be >=0 and <=360. The Azimuth convention is defined
             as degrees east of north (e.g. North = 0, South=180 East = 90, West = 270).
+            SurfTilt may instead be a SurfaceGeometry, in which case SurfAz is ignored.
 
     DHI : float or DataFrame
             diffuse horizontal irradiance in W/m^2. 
@@ -44,6 +46,7 @@ def pvl_klucher1979(SurfTilt,SurfAz,DHI,GHI,SunZen,SunAz):
             Sun azimuth angles in decimal degrees.
             SunAz must be >=0 and <=360. The Azimuth convention is defined
             as degrees east of north (e.g. North = 0, East = 90, West = 270).
+            SunZen may instead be a SolarGeometry, in which case SunAz is ignored.
 
     Returns
     -------
@@ -75,9 +78,17 @@ def pvl_klucher1979(SurfTilt,SurfAz,DHI,GHI,SunZen,SunAz):
     pvl_perez 
     pvl_reindl1990  
     pvl_kingdiffuse
+    SolarGeometry
+    SurfaceGeometry
 
     '''
+    Sun=SolarGeometry.make(SunZen,SunAz)
+    Surface=SurfaceGeometry.make(SurfTilt,SurfAz)
+    SunZen,SunAz=Sun.zenith,Sun.azimuth
+    SurfTilt,SurfAz=Surface.tilt,Surface.azimuth
+
     Vars=locals()
+    del Vars['Sun'],Vars['Surface'] #geometry objects, not arguments
     Expect={'SurfTilt':('num','x>=0'),
             'SurfAz':('x>=-180'),
             'DHI':('x>=0'),
@@ -88,13 +99,13 @@ def pvl_klucher1979(SurfTilt,SurfAz,DHI,GHI,SunZen,SunAz):
 
     var=pvl_tools.Parse(Vars,Expect)
 
-    GHI[GHI < DHI]=DHI
-    GHI[GHI < 1e-06]=1e-06
+    GHI=pvl_tools.masked_replace(GHI,GHI < DHI,DHI)
+    GHI=pvl_tools.masked_replace(GHI,GHI < 1e-06,1e-06)
 
-    COSTT=pvl_tools.cosd(SurfTilt)*pvl_tools.cosd(SunZen) + pvl_tools.sind(SurfTilt)*pvl_tools.sind(SunZen)*pvl_tools.cosd(SunAz - SurfAz)
+    COSTT=Surface.cos_aoi(Sun)
 
     F=1 - ((DHI / GHI) ** 2)
 
-    SkyDiffuse=DHI*((0.5*((1 + pvl_tools.cosd(SurfTilt)))))*((1 + F*(((pvl_tools.sind(SurfTilt / 2)) ** 3))))*((1 + F*(((COSTT) ** 2))*(((pvl_tools.sind(SunZen)) ** 3))))
+    SkyDiffuse=DHI*((0.5*((1 + Surface.cos_tilt))))*((1 + F*(((pvl_tools.sind(SurfTilt / 2)) ** 3))))*((1 + F*(((COSTT) ** 2))*(((Sun.sin_zenith) ** 3))))
 
     return SkyDiffuse
@@ -0,0 +1,256 @@
+'''
+pvl_linketurbidity
+==================
+
+Monthly Linke turbidity climatology of SoDa, stored as a uint8 memory map
+which is opened once per process, and its (time x site) lookup
+
+'''
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import scipy.io
+
+import pvl_tools
+
+
+LINKE_TURBIDITY_FILE=os.path.join(os.path.dirname(os.path.abspath(__file__)),'LinkeTurbidities.npy')
+
+_table=None #process-wide memory map of LINKE_TURBIDITY_FILE
+
+#Month lengths and mid-month days (from January 1, 0h) of common and leap
+#years, padded with the December before and the January after
+MONTH_DAYS=np.array([[31,31,28,31,30,31,30,31,31,30,31,30,31,31],
+                     [31,31,29,31,30,31,30,31,31,30,31,30,31,31]])
+MID_MONTH=np.cumsum(MONTH_DAYS,axis=1) - MONTH_DAYS/2.0 - 31
+
+
+def pvl_linketurbidity(Time,Latitude,Longitude,Interpolate=True,Table=None):
+  '''
+  Linke turbidity of many sites and timestamps at once
+
+  The 12 monthly values of every site are read from the climatology with
+  one integer array lookup, and spread over Time with array indexing as
+  well, without a Python loop over the timestamps or the sites.
+
+  Parameters
+  ----------
+
+  Time : Dataframe.index
+
+      A pandas datatime object. The month and day of year are those of its
+      (local) timestamps.
+
+  Latitude : float, array or Series
+
+      Site latitudes in decimal degrees (positive is northern hemisphere).
+      If a Series, its index labels the sites.
+
+  Longitude : float, array or Series
+
+      Site longitudes in decimal degrees (positive is east of prime
+      meridian), the same length as Latitude
+
+  Interpolate : bool (optional, default True)
+
+      If True, the monthly values are taken as those of the middle of each
+      month and interpolated linearly in time (across the new year as
+      well), which avoids the steps of clear sky irradiance at the month
+      boundaries. If False, every timestamp gets the value of its month.
+
+  Table : array (optional)
+
+      Climatology from linke_turbidity_table. Defaults to the shared one.
+
+  Returns
+  -------
+
+  LinkeTurbidity : DataFrame
+
+      Linke turbidity, one row per timestamp and one column per site
+
+  See Also
+  --------
+  pvl_clearsky_ineichen
+  '''
+
+  Vars=locals()
+  Expect={'Time':'',
+          'Latitude':'',
+          'Longitude':'',
+          'Interpolate':'',
+          'Table':''
+          }
+  var=pvl_tools.Parse(Vars,Expect)
+
+  if isinstance(Latitude,pd.Series):
+    sites=Latitude.index
+  else:
+    sites=None
+  latitude,longitude=np.broadcast_arrays(np.atleast_1d(np.asarray(Latitude,dtype=float)),
+                                         np.asarray(Longitude,dtype=float))
+  if latitude.ndim!=1:
+    raise Exception('Latitude and Longitude must be scalars or vectors')
+
+  #(month x site), with the December before and the January after
+  monthly=monthly_linke_turbidity(latitude,longitude,Table).T
+  monthly=monthly[np.arange(-1,13)%12]
+
+  month=np.asarray(Time.month)
+  if not(Interpolate):
+    return pd.DataFrame(monthly[month],index=Time,columns=sites)
+
+  #day of year (from January 1, 0h) and the mid-month days around it, on the
+  #local wall clock
+  local=Time if Time.tz is None else Time.tz_localize(None)
+  leap=np.asarray(local.is_leap_year,dtype=int)
+  day=np.asarray(local.dayofyear) - 1 + (local.asi8 - local.normalize().asi8)/8.64e13
+  before=month - (day<MID_MONTH[leap,month])
+  weight=(day - MID_MONTH[leap,before])/(MID_MONTH[leap,before+1] - MID_MONTH[leap,before])
+  weight=weight[:,np.newaxis]
+
+  return pd.DataFrame((1-weight)*monthly[before] + weight*monthly[before+1],index=Time,columns=sites)
+
+
+def linke_turbidity_table(filename=None):
+  '''
+  Memory-mapped Linke turbidity climatology
+
+  The array has one row per latitude (from 90 to -90 degrees), one column per
+  longitude (from -180 to 180 degrees) and the 12 months in the last
+  dimension, so the values of one site are contiguous. The values are 20
+  times the Linke turbidity, as uint8.
+
+  Parameters
+  ----------
+
+  filename : string (optional)
+
+          A .npy file written by convert_linke_turbidity. By default
+          LINKE_TURBIDITY_FILE, which is mapped once and shared by all
+          callers. If it does not exist yet, it is converted from
+          'LinkeTurbidities.mat' next to this module or in the working
+          directory. Where LINKE_TURBIDITY_FILE cannot be written (e.g. a
+          read-only install), the .npy is written next to the .mat instead,
+          and if that fails too, the .mat is read into memory once per
+          process.
+
+  Returns
+  -------
+
+  table : numpy.memmap (numpy.ndarray if read from the .mat)
+  '''
+  global _table
+  if filename is not None:
+    return open_table(filename)
+  if _table is None:
+    if os.path.isfile(LINKE_TURBIDITY_FILE):
+      _table=open_table(LINKE_TURBIDITY_FILE)
+    else:
+      _table=default_table()
+  return _table
+
+
+def default_table():
+  '''
+  Shared climatology from LinkeTurbidities.mat, converted to
+  LINKE_TURBIDITY_FILE or to a .npy next to the .mat where possible
+  '''
+  for directory in (os.path.dirname(LINKE_TURBIDITY_FILE),os.getcwd()):
+    matfile=os.path.join(directory,'LinkeTurbidities.mat')
+    if os.path.exists(matfile):
+      break
+  else:
+    raise Exception('No Linke turbidity climatology: run convert_linke_turbidity on '
+                    'LinkeTurbidities.mat, or provide LinkeTurbidity')
+
+  beside=os.path.splitext(matfile)[0] + '.npy'
+  if os.path.isfile(beside):
+    return open_table(beside)
+  data=read_linke_turbidity(matfile)
+  for filename in (LINKE_TURBIDITY_FILE,beside):
+    try:
+      save_table(data,filename)
+    except (IOError,OSError):
+      continue
+    return open_table(filename)
+  data.flags.writeable=False
+  return data
+
+
+def open_table(filename):
+  table=np.load(filename,mmap_mode='r')
+  if table.dtype!=np.uint8 or table.ndim!=3 or table.shape[2]!=12:
+    raise Exception('Not a Linke turbidity climatology: '+filename)
+  return table
+
+
+def convert_linke_turbidity(matfile,filename=LINKE_TURBIDITY_FILE):
+  '''
+  Convert the 'LinkeTurbidity' matrix of a .mat file (2160 x 4320 x 12,
+  uint8) to the .npy store read by linke_turbidity_table. This only has to
+  be done once.
+  '''
+  save_table(read_linke_turbidity(matfile),filename)
+
+
+def read_linke_turbidity(matfile):
+  mat=scipy.io.loadmat(matfile,variable_names=['LinkeTurbidity'])
+  data=np.ascontiguousarray(mat['LinkeTurbidity'],dtype=np.uint8)
+  if data.ndim!=3 or data.shape[2]!=12:
+    raise Exception('LinkeTurbidity must be a latitude x longitude x 12 months matrix')
+  return data
+
+
+def save_table(data,filename):
+  #Write to a temporary file and rename, so that readers never see a partial table
+  fd,tmp=tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)),suffix='.npy')
+  try:
+    with os.fdopen(fd,'wb') as f:
+      np.save(f,data)
+    os.rename(tmp,filename)
+  except:
+    os.remove(tmp)
+    raise
+
+
+def monthly_linke_turbidity(latitude,longitude,table=None):
+  '''
+  Monthly Linke turbidities at the given sites
+
+  Parameters
+  ----------
+
+  latitude, longitude : float or array
+          Site coordinates in decimal degrees
+
+  table : array (optional)
+          Climatology from linke_turbidity_table. Defaults to the shared one.
+
+  Returns
+  -------
+
+  TL : array
+          Linke turbidity, with the 12 months in the last dimension
+          (shape (12,) for a scalar site, (n, 12) for n sites)
+  '''
+  if table is None:
+    table=linke_turbidity_table()
+  rows,columns=grid_index(latitude,longitude,table.shape)
+  return table[rows,columns]/20.0
+
+
+def grid_index(latitude,longitude,shape):
+  '''
+  Nearest row and column of the latitude x longitude grid of a climatology
+  '''
+  latitude=np.asarray(latitude,dtype=float)
+  longitude=np.asarray(longitude,dtype=float)
+  if np.any(abs(latitude)>90) or np.any(abs(longitude)>180):
+    raise Exception('Latitude must be within +/-90 and longitude within +/-180')
+  rows=np.round((90 - latitude)*(shape[0]-1)/180.0).astype(int)
+  columns=np.round((longitude + 180)*(shape[1]-1)/360.0).astype(int)
+  return rows,columns
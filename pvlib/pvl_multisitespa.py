@@ -0,0 +1,228 @@
+import numpy as np
+import pandas as pd
+import pvl_tools
+import spa_numpy
+
+
+CHUNK=2**18 #elements per block of the (time x site) arrays, to stay in cache
+
+
+def pvl_multisitespa(Time,Latitude,Longitude,Altitude=0,Pressure=820,Temperature=11,TZ=0,Table=None):
+  '''
+  Solar position for many sites at once, with the NREL SPA
+
+  The Earth periodic terms, nutation and the geocentric sun position only
+  depend on time, so they are calculated once per timestamp. Only the
+  topocentric correction, which is cheap, is evaluated for every (time,
+  site) pair, in blocks of the 2-D arrays. The local hour angle is split
+  into its time and longitude parts with the angle-sum identities, so that
+  only the elevation, azimuth and refraction need transcendental functions
+  per pair.
+
+  Parameters
+  ----------
+
+  Time : Dataframe.index
+
+      A pandas datatime object. Naive indexes are in the time zone TZ.
+
+  Latitude : float, array or Series
+
+      Site latitudes in decimal degrees (positive is northern hemisphere).
+      If a Series, its index labels the sites.
+
+  Longitude : float, array or Series
+
+      Site longitudes in decimal degrees (positive is east of prime
+      meridian), the same length as Latitude
+
+  Altitude : float, array or Series (optional, default 0)
+
+      Site altitudes in meters
+
+  Pressure : float or array (optional, default 820)
+
+      Local pressure in mbar, used for the refraction correction. A scalar,
+      one value per timestamp (e.g. TMY Pressure), or an array which
+      broadcasts to (time x site), e.g. a (1 x site) row of site values.
+
+  Temperature : float or array (optional, default 11)
+
+      Local temperature in degrees C, in the same forms as Pressure
+
+  TZ : float (optional, default 0)
+
+      Time zone of a naive Time index, in hours from UTC
+
+  Table : GeocentricTable (optional)
+
+      Precomputed geocentric sun position covering Time, interpolated
+      instead of calculating the periodic terms
+
+  Returns
+  -------
+
+  SunAz : DataFrame
+
+      Azimuth of the sun in decimal degrees from South (-180 to 180, add 180
+      for the azimuth from North), one column per site
+
+  SunEl : DataFrame
+
+      Apparent (refraction corrected) elevation of the sun in decimal degrees
+
+  Zenith : DataFrame
+
+      Apparent zenith of the sun in decimal degrees
+
+  References
+  ----------
+
+  I. Reda and A. Andreas, Solar position algorithm for solar radiation
+  applications. Solar Energy, vol. 76, no. 5, pp. 577-589, 2004.
+
+  See Also
+  --------
+  pvl_spa
+  GeocentricTable
+  '''
+
+  Vars=locals()
+  Expect={'Time':'',
+          'Latitude':'',
+          'Longitude':'',
+          'Altitude':'',
+          'Pressure':'',
+          'Temperature':'',
+          'TZ':('num','x>=-18','x<=18'),
+          'Table':''
+          }
+  var=pvl_tools.Parse(Vars,Expect)
+
+  if isinstance(Latitude,pd.Series):
+    sites=Latitude.index
+  else:
+    sites=None
+  latitude,longitude,altitude=np.broadcast_arrays(np.atleast_1d(np.asarray(Latitude,dtype=float)),
+                                                  np.asarray(Longitude,dtype=float),
+                                                  np.asarray(Altitude,dtype=float))
+  if latitude.ndim!=1:
+    raise Exception('Latitude, Longitude and Altitude must be scalars or vectors')
+  if np.any(abs(latitude)>90) or np.any(abs(longitude)>180) or np.any(altitude<-6500000):
+    raise Exception('Latitude must be within +/-90, Longitude within +/-180 and Altitude above -6500000')
+
+  shape=(len(Time),len(latitude))
+  pressure=site_array(Pressure,shape)
+  temperature=site_array(Temperature,shape)
+  if np.any(pressure<0) or np.any(pressure>5000) or np.any(temperature<=-273) or np.any(temperature>6000):
+    raise Exception('Pressure must be within 0-5000 mbar and Temperature within -273-6000 C')
+  #pressure and temperature part of the SPA refraction correction
+  refraction=(pressure / 1010.0) * (283.0 / (273.0 + temperature)) * 1.02 / 60.0
+
+  #Time-only terms, once per timestamp
+  epoch=np.asarray(Time.asi8,dtype=np.int64)
+  if Time.tz is None:
+    epoch=epoch - np.int64(TZ*3600*10**9)
+  jd=spa_numpy.julian_day_from_epoch(epoch)
+  if Table is None:
+    sun=time_terms(spa_numpy.geocentric_sun(jd))
+  else:
+    sun=time_terms(Table.geocentric(jd))
+  site=site_terms(latitude,longitude,altitude)
+
+  #Topocentric terms, in blocks of rows
+  zenith=np.empty(shape)
+  azimuth180=np.empty(shape)
+  rows=max(1,CHUNK//max(1,shape[1]))
+  for start in range(0,shape[0],rows):
+    block=slice(start,start+rows)
+    if refraction.shape[0]>1:
+      blockrefraction=refraction[block]
+    else:
+      blockrefraction=refraction
+    zenith[block],azimuth180[block]=topocentric_block(dict((name,value[block]) for name,value in sun.items()),
+                                                      site,blockrefraction)
+
+  SunAz=pd.DataFrame(azimuth180,index=Time,columns=sites)
+  SunEl=pd.DataFrame(90-zenith,index=Time,columns=sites)
+  Zenith=pd.DataFrame(zenith,index=Time,columns=sites)
+
+  return SunAz, SunEl, Zenith
+
+
+
+def site_array(value,shape):
+  '''
+  A scalar, per-timestamp vector or array which broadcasts to shape, as a
+  2-D array which broadcasts to shape
+  '''
+  value=np.asarray(value,dtype=float)
+  if value.ndim==1 and len(value)==shape[0]:
+    value=value[:,np.newaxis]
+  try:
+    np.broadcast_to(value,shape)
+  except ValueError:
+    raise Exception('Pressure and Temperature must be scalars, one value per timestamp, or broadcast to (time x site)')
+  return value.reshape((1,)*(2-value.ndim) + value.shape)
+
+
+def time_terms(geo):
+  '''
+  Sines and cosines of the geocentric terms, as (time x 1) columns
+  '''
+  hour=np.radians(geo['nu'] - geo['alpha'])
+  delta=np.radians(geo['delta'])
+  terms={'cos_hour':np.cos(hour),'sin_hour':np.sin(hour),
+         'cos_delta':np.cos(delta),'sin_delta':np.sin(delta),
+         'sin_xi':np.sin(np.radians(8.794 / (3600.0 * geo['r'])))}
+  return dict((name,value[:,np.newaxis]) for name,value in terms.items())
+
+
+def site_terms(latitude,longitude,altitude):
+  '''
+  Site terms of the SPA topocentric correction, as (1 x site) rows
+  '''
+  lat_rad=np.radians(latitude)
+  lon_rad=np.radians(longitude)
+  u=np.arctan(0.99664719 * np.tan(lat_rad))
+  terms={'cos_lon':np.cos(lon_rad),'sin_lon':np.sin(lon_rad),
+         'cos_lat':np.cos(lat_rad),'sin_lat':np.sin(lat_rad),
+         'x':np.cos(u) + altitude*np.cos(lat_rad)/6378140.0,
+         'y':0.99664719 * np.sin(u) + altitude*np.sin(lat_rad)/6378140.0}
+  return dict((name,value[np.newaxis,:]) for name,value in terms.items())
+
+
+def topocentric_block(sun,site,refraction,atmos_refract=0.5667):
+  '''
+  spa_numpy.topocentric_sun for every (time, site) pair, from time_terms,
+  site_terms and the pressure and temperature factor of the refraction
+  correction
+  '''
+  #local hour angle h = nu - alpha + longitude
+  cos_h=sun['cos_hour']*site['cos_lon'] - sun['sin_hour']*site['sin_lon']
+  sin_h=sun['sin_hour']*site['cos_lon'] + sun['cos_hour']*site['sin_lon']
+
+  #parallax in right ascension (delta_alpha) and topocentric declination
+  xsinxi=site['x']*sun['sin_xi']
+  denom=sun['cos_delta'] - xsinxi*cos_h
+  norm=np.hypot(xsinxi*sin_h,denom)
+  cos_dalpha=denom/norm
+  sin_dalpha=-xsinxi*sin_h/norm
+  tan_delta_prime=(sun['sin_delta'] - site['y']*sun['sin_xi'])*cos_dalpha/denom
+  cos_delta_prime=1/np.sqrt(1 + tan_delta_prime**2)
+
+  #topocentric hour angle h - delta_alpha
+  cos_hp=cos_h*cos_dalpha + sin_h*sin_dalpha
+  sin_hp=sin_h*cos_dalpha - cos_h*sin_dalpha
+
+  e0=np.degrees(np.arcsin(cos_delta_prime*(site['sin_lat']*tan_delta_prime + site['cos_lat']*cos_hp)))
+
+  #refraction correction, only evaluated above the horizon
+  up=e0 >= -1*(spa_numpy.SUN_RADIUS + atmos_refract)
+  del_e=np.zeros(e0.shape)
+  np.tan(np.radians(e0 + 10.3/(e0 + 5.11)),out=del_e,where=up)
+  np.divide(refraction,del_e,out=del_e,where=up)
+  zenith=90.0 - (e0 + del_e)
+  azimuth180=np.degrees(np.arctan2(sin_hp,cos_hp*site['sin_lat'] - tan_delta_prime*site['cos_lat']))
+
+  return zenith, azimuth180
@@ -1,8 +1,9 @@
 
 import pvl_tools
 import numpy as np
+from pvl_iamtable import iam_table, interp_iam, iam_like
 
-def pvl_physicaliam(K,L,n,theta):
+def pvl_physicaliam(K,L,n,theta,Tabulate=False):
 
     '''
     Determine the incidence angle modifier using refractive 
@@ -51,6 +52,13 @@ def pvl_physicaliam(K,L,n,theta):
             values of theta where -90 < theta < 0, theta is set to abs(theta) and
             evaluated. A warning will be generated if any(theta<0 or theta>90).
 
+    Tabulate : bool (optional, default False)
+
+            If True, the IAM is interpolated in a table of the model at every
+            0.01 degrees, which is built once for each (K, L, n) and kept for
+            the next calls, and no warning is printed. K, L and n must then
+            be scalars.
+
     Returns
     -------
 
@@ -79,35 +87,56 @@ def pvl_physicaliam(K,L,n,theta):
     pvl_spa    
     pvl_ashraeiam
 
+    Notes
+    -----
+
+    With Tabulate, the error of the linear interpolation is at most
+    0.01**2/8 times the largest second derivative of the IAM (per degree
+    squared). For glass (K=4, L=0.002, n=1.526) it is below 2e-7 up to 90
+    degrees, and below 5e-8 up to 80 degrees.
+
     '''
     Vars=locals()
 
     Expect={'K':'x >= 0',
             'L':'x >= 0',
             'n':'x >= 0',
-            'theta':'num'}
+            'theta':'num',
+            'Tabulate':''}
     var=pvl_tools.Parse(Vars,Expect)
 
+    angle=np.asarray(theta,dtype=float)
 
+    if Tabulate:
+        if not(np.isscalar(K) and np.isscalar(L) and np.isscalar(n)):
+            raise Exception('K, L and n must be scalars to tabulate the IAM')
+        table=iam_table(('physical',float(K),float(L),float(n)),lambda grid: physical_iam(K,L,n,grid))
+        return iam_like(theta,interp_iam(table,angle))
 
-    if any((var.theta < 0) | (var.theta >= 90)):
+    if np.any((angle < 0) | (angle >= 90)):
         print('Input incident angles <0 or >=90 detected For input angles with absolute value greater than 90, the ' + 'modifier is set to 0. For input angles between -90 and 0, the ' + 'angle is changed to its absolute value and evaluated.')
-        var.theta[(var.theta < 0) | (var.theta >= 90)]=abs((var.theta < 0) | (var.theta >= 90))
 
+    IAM=np.where(abs(angle) > 90,0,physical_iam(K,L,n,np.minimum(abs(angle),90)))
+
+    return iam_like(theta,IAM)
+
+
+ZEROANG=1e-06 #angle of incidence (degrees) of the normal incidence transmittance
+
+
+def physical_iam(K,L,n,theta):
+    '''
+    IAM of the physical model for angles of incidence in [0, 90] degrees
+    '''
+    theta=np.maximum(theta,ZEROANG)
+    return np.maximum(transmittance(K,L,n,theta) / transmittance(K,L,n,ZEROANG),0)
+
+
+def transmittance(K,L,n,theta):
+    '''
+    Transmittance of the cover, eqns. 14-16 of [1] with the refraction angle
+    theta_r = arcsin(1/n * sin(theta))
+    '''
     thetar_deg=pvl_tools.asind(1.0 / n*(pvl_tools.sind(theta)))
 
-    tau=np.exp(- 1.0 * (K*(L) / pvl_tools.cosd(thetar_deg)))*((1 - 0.5*((((pvl_tools.sind(thetar_deg - theta)) ** 2) / ((pvl_tools.sind(thetar_deg + theta)) ** 2) + ((pvl_tools.tand(thetar_deg - theta)) ** 2) / ((pvl_tools.tand(thetar_deg + theta)) ** 2)))))
-    
-    zeroang=1e-06
-    
-    thetar_deg0=pvl_tools.asind(1.0 / n*(pvl_tools.sind(zeroang)))
-    
-    tau0=np.exp(- 1.0 * (K*(L) / pvl_tools.cosd(thetar_deg0)))*((1 - 0.5*((((pvl_tools.sind(thetar_deg0 - zeroang)) ** 2) / ((pvl_tools.sind(thetar_deg0 + zeroang)) ** 2) + ((pvl_tools.tand(thetar_deg0 - zeroang)) ** 2) / ((pvl_tools.tand(thetar_deg0 + zeroang)) ** 2)))))
-    
-    IAM=tau / tau0
-    
-    IAM[theta == 0]=1
-    
-    IAM[abs(theta) > 90 | (IAM < 0)]=0
-    
-    return IAM
+    return np.exp(- 1.0 * (K*(L) / pvl_tools.cosd(thetar_deg)))*((1 - 0.5*((((pvl_tools.sind(thetar_deg - theta)) ** 2) / ((pvl_tools.sind(thetar_deg + theta)) ** 2) + ((pvl_tools.tand(thetar_deg - theta)) ** 2) / ((pvl_tools.tand(thetar_deg + theta)) ** 2)))))
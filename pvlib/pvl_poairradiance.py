@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+import pvl_tools
+from pvl_solargeometry import SolarGeometry, SurfaceGeometry
+from pvl_skydiffuse import sky_diffuse, check_required, MODELS
+
+
+CHUNK=2**15 #rows per block, so that the temporaries of a block stay in cache
+COLUMNS=['AOI','Eb','In_Plane_SkyDiffuse','GR','E','Ediff']
+
+
+def pvl_poairradiance(SurfTilt,SurfAz,DNI,DHI,GHI,SunZen,SunAz,Albedo,HExtra=None,AM=None,Model='perez',modelt='allsitescomposite1990',out=None):
+  '''
+  Plane of array irradiance in one pass
+
+  Evaluates the angle of incidence (pvl_getaoi), the sky diffuse irradiance
+  (one of the models of pvl_skydiffuse), the ground reflected irradiance
+  (pvl_grounddiffuse) and the in-plane beam, diffuse and total irradiance
+  (pvl_globalinplane) block by block, so that the intermediate arrays of a
+  block stay in cache and each result is written once, to one preallocated
+  array.
+
+  Parameters
+  ----------
+
+  SurfTilt : float or DataFrame
+          Surface tilt angles in decimal degrees (one value, or one per
+          timestamp for trackers). SurfTilt must be >=0 and <=180.
+
+  SurfAz : float or DataFrame
+          Surface azimuth angles in decimal degrees (North = 0, South = 180).
+
+  DNI, DHI, GHI : float or DataFrame
+          direct normal, diffuse horizontal and global horizontal irradiance
+          in W/m^2
+
+  SunZen : float, DataFrame or SolarGeometry
+          apparent (refraction-corrected) zenith angles in decimal degrees.
+          SunZen may instead be a SolarGeometry, in which case SunAz is
+          ignored.
+
+  SunAz : float or DataFrame
+          Sun azimuth angles in decimal degrees
+
+  Albedo : float or DataFrame
+          Ground reflectance, between 0 and 1
+
+  HExtra, AM : float or DataFrame (optional)
+          extraterrestrial normal irradiance in W/m^2 and relative airmass, as
+          required by Model (see pvl_skydiffuse)
+
+  Model : string (optional, default 'perez')
+          'isotropic', 'king', 'klucher', 'haydavies', 'reindl' or 'perez'
+
+  modelt : string (optional, default 'allsitescomposite1990')
+          set of Perez coefficients, see pvl_perez
+
+  out : array (optional)
+          float array of shape (6, number of timestamps) to write the
+          results to, one row per column of POA. It can be reused between
+          calls; POA is a view of it.
+
+  Returns
+  -------
+
+  POA : DataFrame
+          with the columns *AOI* (degrees), *Eb* (in-plane beam),
+          *In_Plane_SkyDiffuse*, *GR* (ground reflected), *E* (total) and
+          *Ediff* (in-plane diffuse, sky and ground), in W/m^2
+
+  Notes
+  -----
+
+  Eb is 0 when the sun is behind the surface (AOI > 90 degrees), and the
+  sky diffuse irradiance is calculated for every timestamp, including those
+  which pvl_perez leaves out (where it is 0).
+
+  See Also
+  --------
+  pvl_getaoi
+  pvl_skydiffuse
+  pvl_grounddiffuse
+  pvl_globalinplane
+  '''
+
+  Vars=locals()
+  Expect={'SurfTilt':('x>=0','x<=180'),
+          'SurfAz':('x>=-180'),
+          'DNI':('x>=0'),
+          'DHI':('x>=0'),
+          'GHI':('x>=0'),
+          'SunZen':'',
+          'SunAz':('optional'),
+          'Albedo':('x>=0','x<=1'),
+          'HExtra':('optional'),
+          'AM':('optional'),
+          'Model':('str',MODELS),
+          'modelt':'',
+          'out':('optional')
+          }
+  var=pvl_tools.Parse(Vars,Expect)
+  check_required((Model,),Vars)
+
+  if isinstance(SunZen,SolarGeometry):
+    SunZen,SunAz=SunZen.zenith,SunZen.azimuth
+  Time=None
+  for value in (SunZen,DNI,DHI,GHI):
+    if isinstance(value,(pd.Series,pd.DataFrame)):
+      Time=value.index
+      break
+
+  inputs=dict((name,as_array(value)) for name,value in (('SurfTilt',SurfTilt),('SurfAz',SurfAz),('DNI',DNI),
+                                                        ('DHI',DHI),('GHI',GHI),('SunZen',SunZen),('SunAz',SunAz),
+                                                        ('Albedo',Albedo),('HExtra',HExtra),('AM',AM)))
+  rows=max([len(value) for value in inputs.values() if value is not None and value.ndim>0] + [1])
+  if Time is None:
+    Time=pd.Index(np.arange(rows))
+
+  if out is None:
+    out=np.empty((len(COLUMNS),rows))
+  elif out.shape!=(len(COLUMNS),rows):
+    raise Exception('out must be an array of shape (%d, %d)' % (len(COLUMNS),rows))
+  AOI,Eb,SkyDiffuse,GR,E,Ediff=out
+
+  for start in range(0,rows,CHUNK):
+    block=slice(start,min(rows,start+CHUNK))
+    value=dict((name,block_of(array,block)) for name,array in inputs.items())
+    Sun=SolarGeometry(value['SunZen'],value['SunAz'])
+    Surface=SurfaceGeometry(value['SurfTilt'],value['SurfAz'])
+
+    cos_aoi=Surface.cos_aoi(Sun)
+    np.degrees(np.arccos(np.clip(cos_aoi,-1,1)),out=AOI[block])
+    np.multiply(value['DNI'],np.maximum(cos_aoi,0),out=Eb[block])
+    sky_diffuse(Model,Sun,Surface,value['DHI'],value['DNI'],value['GHI'],value['HExtra'],value['AM'],modelt,
+                out=SkyDiffuse[block])
+    np.multiply(value['GHI']*value['Albedo'],0.5*(1 - Surface.cos_tilt),out=GR[block])
+    np.add(SkyDiffuse[block],GR[block],out=Ediff[block])
+    np.add(Eb[block],Ediff[block],out=E[block])
+
+  return pd.DataFrame(out.T,index=Time,columns=COLUMNS,copy=False)
+
+
+
+def as_array(value):
+  if value is None:
+    return None
+  return np.asarray(value,dtype=float)
+
+
+def block_of(value,block):
+  '''
+  Rows block of a per-timestamp array; scalars and None are passed through
+  '''
+  if value is None or value.ndim==0:
+    return value
+  return value[block]
@@ -1,6 +1,7 @@
 
 import numpy as np
 import pvl_tools
+from pvl_solargeometry import SolarGeometry, SurfaceGeometry
 
 def pvl_reindl1990(SurfTilt,SurfAz,DHI,DNI,GHI,HExtra,SunZen,SunAz):
   '''
@@ -27,6 +28,7 @@ def pvl_reindl1990(SurfTilt,SurfAz,DHI,DNI,GHI,HExtra,SunZen,SunAz):
           Surface azimuth angles in decimal degrees.
           SurfAz must be >=0 and <=360. The Azimuth convention is defined
           as degrees east of north (e.g. North = 0, South=180 East = 90, West = 270).
+          SurfTilt may instead be a SurfaceGeometry, in which case SurfAz is ignored.
 
   DHI : DataFrame
           diffuse horizontal irradiance in W/m^2. 
@@ -53,6 +55,7 @@ def pvl_reindl1990(SurfTilt,SurfAz,DHI,DNI,GHI,HExtra,SunZen,SunAz):
           Sun azimuth angles in decimal degrees.
           SunAz must be >=0 and <=360. The Azimuth convention is defined
           as degrees east of north (e.g. North = 0, East = 90, West = 270).
+          SunZen may instead be a SolarGeometry, in which case SunAz is ignored.
 
   Returns
   -------
@@ -99,9 +102,17 @@ def pvl_reindl1990(SurfTilt,SurfAz,DHI,DNI,GHI,HExtra,SunZen,SunAz):
   pvl_perez 
   pvl_klucher1979   
   pvl_kingdiffuse
+  SolarGeometry
+  SurfaceGeometry
 
   '''          
+  Sun=SolarGeometry.make(SunZen,SunAz)
+  Surface=SurfaceGeometry.make(SurfTilt,SurfAz)
+  SunZen,SunAz=Sun.zenith,Sun.azimuth
+  SurfTilt,SurfAz=Surface.tilt,Surface.azimuth
+
   Vars=locals()
+  del Vars['Sun'],Vars['Surface'] #geometry objects, not arguments
   Expect={'SurfTilt':('num','x>=0'),
       'SurfAz':('num','x>=-180'),
       'DHI':('num','x>=0'),
@@ -117,17 +128,16 @@ def pvl_reindl1990(SurfTilt,SurfAz,DHI,DNI,GHI,HExtra,SunZen,SunAz):
 
   small=1e-06
 
-  COSTT=pvl_tools.cosd(SurfTilt)*pvl_tools.cosd(SunZen) + pvl_tools.sind(SurfTilt)*pvl_tools.sind(SunZen)*pvl_tools.cosd(SunAz - SurfAz)
-  RB=np.max(COSTT,0) / np.max(pvl_tools.cosd(SunZen),0.01745)
+  COSTT=Surface.cos_aoi(Sun)
+  RB=np.maximum(COSTT,0) / np.maximum(Sun.cos_zenith,0.01745)
   AI=DNI / HExtra
-  GHI[GHI < small]=small
-  HB=DNI*(pvl_tools.cosd(SunZen))
-  HB[HB < 0]=0
-  GHI[GHI < 0]=0
+  GHI=pvl_tools.masked_replace(GHI,GHI < small,small)
+  HB=DNI*(Sun.cos_zenith)
+  HB=np.maximum(HB,0)
   F=np.sqrt(HB / GHI)
   SCUBE=(pvl_tools.sind(SurfTilt*(0.5))) ** 3
 
 
-  SkyDiffuse=DHI*((AI*(RB) + (1 - AI)*(0.5)*((1 + pvl_tools.cosd(SurfTilt)))*((1 + F*(SCUBE)))))
+  SkyDiffuse=DHI*((AI*(RB) + (1 - AI)*(0.5)*((1 + Surface.cos_tilt))*((1 + F*(SCUBE)))))
 
   return SkyDiffuse
@@ -4,10 +4,15 @@ import numpy as np
 import pvl_tools
 import pandas as pd
 import scipy 
-from scipy.special import lambertw
 import time
 
 
+VTOL=1e-04 #tolerance on the last Newton step of the voltage searches, in volts;
+           #the steps converge quadratically, so the error left is far smaller
+MAX_ITERATIONS=100
+HALLEY_STEPS=2 #of lambertw_exp, enough for double precision from its starting points
+
+
 def pvl_singlediode(Module,IL,I0,Rs,Rsh,nNsVth,**kwargs):
     '''
     Solve the single-diode model to obtain a photovoltaic IV curve
@@ -87,6 +92,12 @@ def pvl_singlediode(Module,IL,I0,Rs,Rsh,nNsVth,**kwargs):
     the Lambert W function to obtain an explicit function of V=f(i) and
     I=f(V) as shown in [2].
 
+    Voc is the closed form Lambert W solution at I=0, polished by Newton's
+    method, and the maximum power point is found with Newton's method on dP/dV using the derivatives of the explicit
+    I=f(V), safeguarded by bisection. Both searches run on arrays and track
+    convergence per element, so every curve is solved to the same tolerance
+    (VTOL) whatever the other rows.
+
     References
     -----------
 
@@ -137,17 +148,14 @@ def pvl_singlediode(Module,IL,I0,Rs,Rsh,nNsVth,**kwargs):
     DFOut['I0']=var.I0
     DFOut['IL']=var.IL
 
-    __,Voc_return = golden_sect_DataFrame(DFOut,0,var.Module.V_oc_ref*1.6,Voc_optfcn)
-    Voc=Voc_return.copy() #create an immutable copy 
-
-    Pmp,Vmax = golden_sect_DataFrame(DFOut,0,var.Module.V_oc_ref*1.14,pwr_optfcn)
-    Imax = I_from_V(Rsh=var.Rsh, Rs=var.Rs, nNsVth=var.nNsVth, V=Vmax, I0=var.I0, IL=var.IL)
-    # Invert the Power-Current curve. Find the current where the inverted power
-    # is minimized. This is Imax. Start the optimization at Voc/2
+    IL,I0,Rs,Rsh,nNsVth=np.broadcast_arrays(*[np.asarray(value,dtype=float) for value in
+                                              (var.IL,var.I0,var.Rs,var.Rsh,var.nNsVth)])
+    Voc = open_circuit_voltage(IL,I0,Rsh,nNsVth)
+    Vmax,Imax,Pmp = max_power_point(IL,I0,Rs,Rsh,nNsVth,Voc)
 
     # Find Ix and Ixx using Lambert W
-    Ix = I_from_V(Rsh=var.Rsh, Rs=var.Rs, nNsVth=var.nNsVth, V=.5*Voc, I0=var.I0, IL=var.IL)
-    Ixx = I_from_V(Rsh=var.Rsh, Rs=var.Rs, nNsVth=var.nNsVth, V=0.5*(Voc+Vmax), I0=var.I0, IL=var.IL)
+    Ix = I_from_V(Rsh=Rsh, Rs=Rs, nNsVth=nNsVth, V=.5*Voc, I0=I0, IL=IL)
+    Ixx = I_from_V(Rsh=Rsh, Rs=Rs, nNsVth=nNsVth, V=0.5*(Voc+Vmax), I0=I0, IL=IL)
 
     '''
     # If the user says they want a curve of with number of points equal to
@@ -165,120 +173,182 @@ def pvl_singlediode(Module,IL,I0,Rs,Rsh,nNsVth,**kwargs):
     end
     '''
 
-    DFOut['Imp']=Imax
-    DFOut['Voc']=Voc
-    DFOut['Vmp']=Vmax
-    DFOut['Pmp']=Pmp
-    DFOut['Ix']=Ix
-    DFOut['Ixx']=Ixx
+    for name,value in zip(['Imp','Voc','Vmp','Pmp','Ix','Ixx'],[Imax,Voc,Vmax,Pmp,Ix,Ixx]):
+        DFOut[name]=value[()] if np.ndim(value)==0 else value #numpy scalars for scalar inputs
 
     return  DFOut
 
 
 
-'''
-Created April,2014
-Author: Rob Andrews, Calama Consulting
-'''
-
-def golden_sect_DataFrame(df,VL,VH,func):
+def open_circuit_voltage(IL,I0,Rsh,nNsVth):
     '''
-    Vectorized golden section search for finding MPPT from a dataframe timeseries
-
-    Parameters
-    ----------
-
-    df : DataFrame
-
-            Dataframe containing a timeseries of inputs to the function to be optimized.
-            Each row should represent an independant optimization
-
-    VL: float
-            low bound of the optimization
-
-    VH: float
-            Uppoer bound of the optimization
+    Open circuit voltage of the single diode model on ndarrays
 
-    func: function
-            function to be optimized must be in the form f(dataframe,x)
+    At I = 0 the series resistance drops out and V solves
+    IL + I0 - I0*exp(V/nNsVth) - V/Rsh = 0, whose closed form solution is
+    (IL + I0)*Rsh - nNsVth*W(I0*Rsh/nNsVth*exp((IL + I0)*Rsh/nNsVth))
+    (Eqn. 3 of Jain and Kapoor at I = 0). The argument of W overflows for
+    most modules, so W is evaluated in log space with lambertw_exp. The
+    difference of the two terms loses digits when Rsh is very large, which
+    a Newton step on the (concave, decreasing) open circuit equation
+    corrects; converged elements are dropped from the iterations.
 
     Returns
     -------
-    func(df,'V1') : DataFrame
-            function evaluated at the optimal point
 
-    df['V1']: Dataframe
-            Dataframe of optimal points
+    Voc : array
+            open circuit voltage in volts, shaped as the inputs
+    '''
+    Voc=np.array((IL + I0)*Rsh - nNsVth*lambertw_exp(np.log(I0*Rsh/nNsVth) + (IL + I0)*Rsh/nNsVth),dtype=float)
+    active=np.flatnonzero(np.isfinite(Voc))
+    for iteration in range(MAX_ITERATIONS):
+        if len(active)==0:
+            break
+        V,a,i0,il,rsh=Voc.flat[active],nNsVth.flat[active],I0.flat[active],IL.flat[active],Rsh.flat[active]
+        diode=i0*np.exp(V/a)
+        step=(il + i0 - diode - V/rsh)/(diode/a + 1/rsh)
+        Voc.flat[active]=V + step
+        active=active[np.abs(step)>VTOL]
+    if len(active)>0:
+        raise Exception('Open circuit voltage search did not converge in %d iterations' % MAX_ITERATIONS)
+    return Voc
+
+
+def max_power_point(IL,I0,Rs,Rsh,nNsVth,Voc):
+    '''
+    Maximum power point of the single diode model on ndarrays
 
-    Notes
-    -----
+    Solves dP/dV = I + V*dI/dV = 0 on [0, Voc] with Newton steps, using the
+    first and second derivatives of the explicit Lambert W solution I(V)
+    (Eqn. 4 of Jain and Kapoor). The power is concave in V, and each element
+    keeps a bracket of the maximum: steps which leave it are replaced by
+    bisection. Convergence is checked per element and converged elements are
+    dropped from the iterations.
 
-    This funtion will find the MAXIMUM of a function
+    Returns
+    -------
 
+    Vmp, Imp, Pmp : arrays
+            voltage, current and power at the maximum power point, shaped as
+            the inputs
     '''
+    #Starting point from the usual approximation of the ideal diode, less the
+    #drop across Rs at the current of that approximation
+    Vmp=Voc - nNsVth*np.log1p(Voc/nNsVth)
+    Vmp=np.array(np.clip(Vmp - Rs*(IL*Vmp/(Vmp + nNsVth) - Vmp/Rsh),0,Voc),dtype=float)
+    Imp=np.full_like(Vmp,np.nan) #rows with NaN inputs are never iterated
+
+    #Per element terms, kept compact: converged elements are written back and
+    #removed from them
+    active=np.flatnonzero(np.isfinite(Vmp))
+    V,lo,hi,a,i0,il,rs,rsh=[value.flat[active] for value in (Vmp,np.zeros_like(Voc),Voc,nNsVth,I0,IL,Rs,Rsh)]
+    G=1/(rs + rsh)
+    ratio=rsh/rs
+    curvature=ratio*rsh*G**2/a
+    Iterm=rsh*(il + i0)*G
+    for iteration in range(MAX_ITERATIONS):
+        if len(active)==0:
+            break
+        W=lambertw_term(rsh,rs,a,V,i0,il)
+        I=Iterm - V*G - (a/rs)*W
+        dI=-G*(1 + ratio*W/(1 + W))
+        d2I=-curvature*W/(1 + W)**3
+        dP=I + V*dI
+        d2P=2*dI + V*d2I
+
+        rising=dP>0
+        lo=np.where(rising,V,lo)
+        hi=np.where(rising,hi,V)
+        with np.errstate(divide='ignore',invalid='ignore'):
+            step=-dP/d2P
+        step=np.where((V + step>lo) & (V + step<hi),step,0.5*(lo + hi) - V) #bisect if the step leaves the bracket
+        V=V + step
+        I=I + dI*step #first order update of the current, exact to well below the tolerance at convergence
+
+        keep=(np.abs(step)>VTOL) & (hi - lo>VTOL)
+        done=~keep
+        Vmp.flat[active[done]]=V[done]
+        Imp.flat[active[done]]=I[done]
+        if not(keep.all()):
+            active,V,lo,hi,a,i0,il,rs,rsh,G,ratio,curvature,Iterm=[value[keep] for value in
+                (active,V,lo,hi,a,i0,il,rs,rsh,G,ratio,curvature,Iterm)]
+    if len(active)>0:
+        raise Exception('Maximum power point search did not converge in %d iterations' % MAX_ITERATIONS)
+
+    return Vmp,Imp,Vmp*Imp
 
-    df['VH']=VH
-    df['VL']=VL
 
-    err=df['VH']-df['VL']
-    errflag=True
-    iterations=0
-    while errflag:
-
-        phi=(np.sqrt(5)-1)/2*(df['VH']-df['VL'])
-        df['V1']=df['VL']+phi
-        df['V2']=df['VH']-phi
-        
-        df['f1']=func(df,'V1')
-        df['f2']=func(df,'V2')
-        df['SW_Flag']=df['f1']>df['f2']
-        
-        df['VL']=df['V2']*df['SW_Flag']+df['VL']*(~df['SW_Flag'])
-        df['VH']=df['V1']*~df['SW_Flag']+df['VH']*(df['SW_Flag'])
-        
-        err=(df['V1']-df['V2'])
-        if isinstance(df,pd.DataFrame):
-            errflag=all(abs(err)>.01)
-        else:
-            errflag=(abs(err)>.01)
+def I_from_V(Rsh, Rs, nNsVth, V, I0, IL):
+    '''
+    # calculates I from V per Eq 2 Jain and Kapoor 2004
+    # uses the real valued, overflow-safe Lambert W of lambertw_exp
+    # Rsh, nVth, V, I0, IL can all be DataFrames
+    # Rs can be a DataFrame, but should be a scalar
+    '''
 
-        iterations=iterations+1
+    inputterm = lambertw_term(Rsh, Rs, nNsVth, V, I0, IL)
 
-        if iterations >50:
-            raise Exception("EXCEPTION:iterations exeeded maximum (50)")
+    # Eqn. 4 in Jain and Kapoor, 2004
+    I = -V/(Rs + Rsh) - (nNsVth/Rs) * inputterm + Rsh*(IL + I0)/(Rs + Rsh)
+    
 
+    return I
 
-    return func(df,'V1') , df['V1']
 
-def pwr_optfcn(df,loc):
+def lambertw_term(Rsh, Rs, nNsVth, V, I0, IL):
     '''
-    function to find power from I_from_V
+    Lambert W term of the explicit solution I(V), Eqn. 4 of Jain and Kapoor
     '''
+    # log of the argument of W, which overflows near Voc
+    logargW = np.log(Rs*I0*Rsh/(nNsVth*(Rs + Rsh))) + Rsh*(Rs*(IL+I0)+V)/(nNsVth*(Rs+Rsh))
+    return lambertw_exp(logargW)
 
-    I=I_from_V(Rsh=df['Rsh'],Rs=df['Rs'], nNsVth=df['nNsVth'], V=df[loc], I0=df['I0'], IL=df['IL'])
-    return I*df[loc]
 
-def Voc_optfcn(df,loc):
+def lambertw_exp(x):
     '''
-    function to find V_oc from I_from_V
-    '''
-    I=-abs(I_from_V(Rsh=df['Rsh'], Rs=df['Rs'], nNsVth=df['nNsVth'], V=df[loc], I0=df['I0'], IL=df['IL']))
-    return I
+    Principal branch of the Lambert W function at exp(x), for real x
 
+    Real valued and overflow-safe replacement of
+    scipy.special.lambertw(np.exp(x)).real. For x < 1, Halley's method is
+    applied to w*exp(w) = exp(x) from the approximation of Winitzki; for
+    x >= 1 (W >= 1), it is applied to the log form w + log(w) = x from the
+    asymptotic expansion x - log(x) + log(x)/x, so exp(x) is never formed
+    and any finite x is accepted. HALLEY_STEPS steps give a relative error
+    below 1e-14.
 
-def I_from_V(Rsh, Rs, nNsVth, V, I0, IL):
-    '''
-    # calculates I from V per Eq 2 Jain and Kapoor 2004
-    # uses Lambert W implemented in wapr_vec.m
-    # Rsh, nVth, V, I0, IL can all be DataFrames
-    # Rs can be a DataFrame, but should be a scalar
-    '''
+    Parameters
+    ----------
 
-    argW = Rs*I0*Rsh*np.exp(Rsh*(Rs*(IL+I0)+V)/(nNsVth*(Rs+Rsh)))/(nNsVth*(Rs + Rsh))
-    inputterm =lambertw(argW)
+    x : float or array
+            log of the argument of W
 
-    # Eqn. 4 in Jain and Kapoor, 2004
-    I = -V/(Rs + Rsh) - (nNsVth/Rs) * inputterm + Rsh*(IL + I0)/(Rs + Rsh)
-    
+    Returns
+    -------
 
-    return I.real
\ No newline at end of file
+    W : float or array
+            W(exp(x)), the same shape as x
+    '''
+    x=np.asarray(x,dtype=float)
+    W=np.empty_like(x)
+    small=x < 1
+
+    z=np.exp(x[small])
+    L=np.log1p(z)
+    w=L*(1 - np.log1p(L)/(2 + L))
+    for step in range(HALLEY_STEPS):
+        ew=np.exp(w)
+        f=w*ew - z
+        w=w - f/(ew*(w + 1) - (w + 2)*f/(2*w + 2))
+    W[small]=w
+
+    x=x[~small]
+    L=np.log(x)
+    w=x - L + L/x
+    for step in range(HALLEY_STEPS):
+        f=w + np.log(w) - x
+        w=w - f*w/(1 + w)/(1 + f/(2*(1 + w))/(1 + w))
+    W[~small]=w
+
+    if W.ndim==0:
+        return W[()]
+    return W
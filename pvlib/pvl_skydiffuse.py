@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+import pvl_tools
+from pvl_solargeometry import SolarGeometry, SurfaceGeometry
+from pvl_perez import perez_skydiffuse
+
+
+MODELS=('isotropic','king','klucher','haydavies','reindl','perez')
+REQUIRED={'king':('GHI',),
+          'klucher':('GHI',),
+          'haydavies':('DNI','HExtra'),
+          'reindl':('DNI','GHI','HExtra'),
+          'perez':('DNI','HExtra','AM')}
+
+
+def pvl_skydiffuse(SurfTilt,SurfAz,DHI,SunZen,SunAz=None,DNI=None,GHI=None,HExtra=None,AM=None,Model='perez',modelt='allsitescomposite1990'):
+  '''
+  Diffuse irradiance from the sky on many surface orientations at once
+
+  Evaluates one of the sky diffuse models of pvl_isotropicsky,
+  pvl_kingdiffuse, pvl_klucher1979, pvl_haydavies1980, pvl_reindl1990 or
+  pvl_perez for every
+  pair of (SurfTilt, SurfAz) and every timestamp. The terms which only
+  depend on the sun and the irradiance (anisotropy index, sky clearness
+  bins, F1 and F2, cos(SunZen), ...) are calculated once, as (1 x time)
+  rows, and only the surface terms and the angle of incidence are broadcast
+  over the (orientation x time) matrix.
+
+  Parameters
+  ----------
+
+  SurfTilt : float or array
+          Surface tilt angles in decimal degrees, one per orientation.
+          SurfTilt must be >=0 and <=180.
+
+  SurfAz : float or array
+          Surface azimuth angles in decimal degrees (North = 0, South = 180),
+          the same length as SurfTilt.
+
+  DHI : float or DataFrame
+          diffuse horizontal irradiance in W/m^2, one value per timestamp.
+          DHI must be >=0.
+
+  SunZen : float, DataFrame or SolarGeometry
+          apparent (refraction-corrected) zenith angles in decimal degrees.
+          SunZen may instead be a SolarGeometry, in which case SunAz is
+          ignored.
+
+  SunAz : float or DataFrame
+          Sun azimuth angles in decimal degrees. Not used by the isotropic
+          model.
+
+  DNI : float or DataFrame
+          direct normal irradiance in W/m^2. Required by the haydavies,
+          reindl and perez models.
+
+  GHI : float or DataFrame
+          global horizontal irradiance in W/m^2. Required by the king,
+          klucher and reindl models.
+
+  HExtra : float or DataFrame
+          extraterrestrial normal irradiance in W/m^2. Required by the
+          haydavies, reindl and perez models.
+
+  AM : float or DataFrame
+          relative airmass. Required by the perez model.
+
+  Model : string (optional, default 'perez')
+          'isotropic', 'king', 'klucher', 'haydavies', 'reindl' or 'perez'
+
+  modelt : string (optional, default 'allsitescomposite1990')
+          set of Perez coefficients, see pvl_perez
+
+  Returns
+  -------
+
+  SkyDiffuse : DataFrame
+          sky diffuse irradiance in W/m^2, one row per orientation (indexed by
+          SurfTilt and SurfAz) and one column per timestamp. Unlike
+          pvl_perez, no timestamps are left out.
+
+  Notes
+  -----
+
+  The haydavies and reindl models use max(cos(AOI), 0) / max(cos(SunZen),
+  0.01745) for the beam ratio, as in their references.
+
+  See Also
+  --------
+  pvl_perez
+  pvl_haydavies1980
+  pvl_reindl1990
+  pvl_klucher1979
+  pvl_isotropicsky
+  pvl_kingdiffuse
+  pvl_skydiffusemodels
+  '''
+
+  Vars=locals()
+  Expect={'SurfTilt':('x>=0','x<=180'),
+          'SurfAz':('x>=-180'),
+          'DHI':('x>=0'),
+          'SunZen':'',
+          'SunAz':('optional'),
+          'DNI':('optional'),
+          'GHI':('optional'),
+          'HExtra':('optional'),
+          'AM':('optional'),
+          'Model':('str',MODELS),
+          'modelt':''
+          }
+  var=pvl_tools.Parse(Vars,Expect)
+
+  check_required((Model,),Vars)
+
+  tilt,azimuth=np.broadcast_arrays(np.atleast_1d(np.asarray(SurfTilt,dtype=float)),np.asarray(SurfAz,dtype=float))
+  if tilt.ndim!=1:
+    raise Exception('SurfTilt and SurfAz must be scalars or vectors')
+  orientations=pd.MultiIndex.from_arrays([tilt,azimuth],names=['SurfTilt','SurfAz'])
+
+  if isinstance(SunZen,SolarGeometry):
+    SunZen,SunAz=SunZen.zenith,SunZen.azimuth
+  Time=None
+  for value in (DHI,SunZen,DNI,GHI,HExtra,AM):
+    if isinstance(value,(pd.Series,pd.DataFrame)):
+      Time=value.index
+      break
+
+  Sun=SolarGeometry(time_row(SunZen),time_row(SunAz))
+  Surface=SurfaceGeometry(tilt[:,np.newaxis],azimuth[:,np.newaxis])
+  SkyDiffuse=sky_diffuse(Model,Sun,Surface,time_row(DHI),time_row(DNI),time_row(GHI),time_row(HExtra),time_row(AM),modelt)
+
+  return pd.DataFrame(SkyDiffuse,index=orientations,columns=Time)
+
+
+
+def sky_diffuse(Model,Sun,Surface,DHI,DNI=None,GHI=None,HExtra=None,AM=None,modelt='allsitescomposite1990',out=None):
+  '''
+  Sky diffuse irradiance of Model on ndarrays, see sky_diffuse_models
+  '''
+  if out is not None:
+    out=out[np.newaxis]
+  return sky_diffuse_models((Model,),Sun,Surface,DHI,DNI,GHI,HExtra,AM,modelt,out)[0]
+
+
+def sky_diffuse_models(Models,Sun,Surface,DHI,DNI=None,GHI=None,HExtra=None,AM=None,modelt='allsitescomposite1990',out=None):
+  '''
+  Sky diffuse irradiance of several models on ndarrays
+
+  The kernel of pvl_skydiffuse, pvl_skydiffusemodels and pvl_poairradiance.
+  Sun and Surface hold arrays which broadcast together with the irradiance
+  inputs; terms which only depend on the sun are calculated on the shape of
+  the sun inputs. The intermediate terms shared by the models (cos(AOI),
+  the beam ratio, the anisotropy index DNI/HExtra, the tilt factors, ...)
+  are calculated once, on first use.
+
+  Returns
+  -------
+
+  SkyDiffuse : array
+          one row per model (the first axis), written to out if given
+  '''
+  terms={}
+  def term(name,fcn):
+    if not(name in terms):
+      terms[name]=fcn()
+    return terms[name]
+
+  #tilt factors: (1+cos(tilt))/2, (1-cos(tilt))/2 = sin(tilt/2)**2 and sin(tilt/2)**3
+  sky=lambda: term('sky',lambda: 0.5*(1 + Surface.cos_tilt))
+  ground=lambda: term('ground',lambda: 0.5*(1 - Surface.cos_tilt))
+  scube=lambda: term('scube',lambda: ground()*np.sqrt(ground()))
+  cos_aoi=lambda: term('cos_aoi',lambda: Surface.cos_aoi(Sun))
+  AI=lambda: term('AI',lambda: DNI / HExtra)
+  Rb=lambda: term('Rb',lambda: np.maximum(cos_aoi(),0) / np.maximum(Sun.cos_zenith,0.01745))
+
+  results=[]
+  for i,Model in enumerate(Models):
+    if Model=='isotropic':
+      SkyDiffuse=DHI*sky()
+
+    elif Model=='king':
+      SkyDiffuse=DHI*sky() + GHI*(0.012*Sun.zenith - 0.04)*ground()
+
+    elif Model=='klucher':
+      F=1 - (DHI / np.maximum(np.maximum(GHI,DHI),1e-06))**2
+      SkyDiffuse=DHI*sky()*(1 + F*scube())*(1 + F*cos_aoi()**2*Sun.sin_zenith**3)
+
+    elif Model=='haydavies':
+      SkyDiffuse=DHI*(AI()*Rb() + (1 - AI())*sky())
+
+    elif Model=='reindl':
+      F=np.sqrt(np.maximum(DNI*Sun.cos_zenith,0) / np.maximum(GHI,1e-06))
+      SkyDiffuse=DHI*(AI()*Rb() + (1 - AI())*sky()*(1 + F*scube()))
+
+    elif Model=='perez':
+      SkyDiffuse=perez_skydiffuse(DHI,DNI,HExtra,AM,Sun.zenith,Sun.cos_zenith,cos_aoi(),
+                                  Surface.cos_tilt,Surface.sin_tilt,modelt)
+
+    else:
+      raise Exception('Model must be one of: '+', '.join(MODELS))
+    if out is None:
+      results.append(SkyDiffuse)
+    else:
+      out[i]=SkyDiffuse
+
+  if out is None:
+    out=np.empty((len(results),)+np.broadcast(*results).shape)
+    for i,SkyDiffuse in enumerate(results):
+      out[i]=SkyDiffuse
+  return out
+
+
+def check_required(Models,Vars):
+  '''
+  Raise if an input required by one of Models is None in Vars
+  '''
+  for Model in Models:
+    for name in REQUIRED.get(Model,()):
+      if Vars[name] is None:
+        raise Exception('The '+Model+' model requires '+', '.join(REQUIRED[Model]))
+
+
+def time_row(value):
+  '''
+  A scalar, or a per-timestamp vector as a (1 x time) row
+  '''
+  if value is None:
+    return None
+  value=np.asarray(value,dtype=float)
+  if value.ndim==0:
+    return value
+  return value.reshape(1,-1)
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pvl_tools
+from pvl_solargeometry import SolarGeometry, SurfaceGeometry
+from pvl_skydiffuse import sky_diffuse_models, check_required, MODELS
+
+
+def pvl_skydiffusemodels(SurfTilt,SurfAz,DHI,SunZen,SunAz=None,DNI=None,GHI=None,HExtra=None,AM=None,Models=MODELS,modelt='allsitescomposite1990'):
+  '''
+  Diffuse irradiance from the sky on a tilted surface with several models at
+  once
+
+  Evaluates the selected sky diffuse models (pvl_isotropicsky,
+  pvl_kingdiffuse, pvl_klucher1979, pvl_haydavies1980, pvl_reindl1990 and
+  pvl_perez) on the same inputs, for model comparisons. The intermediate
+  terms they share (cos(AOI), the beam ratio, the anisotropy index
+  DNI/HExtra and the tilt factors) are calculated once, so the cost of all
+  the models is close to that of the most expensive one.
+
+  Parameters
+  ----------
+
+  SurfTilt : float or DataFrame
+          Surface tilt angles in decimal degrees (one value, or one per
+          timestamp). SurfTilt must be >=0 and <=180.
+
+  SurfAz : float or DataFrame
+          Surface azimuth angles in decimal degrees (North = 0, South = 180).
+
+  DHI : float or DataFrame
+          diffuse horizontal irradiance in W/m^2. DHI must be >=0.
+
+  SunZen : float, DataFrame or SolarGeometry
+          apparent (refraction-corrected) zenith angles in decimal degrees.
+          SunZen may instead be a SolarGeometry, in which case SunAz is
+          ignored.
+
+  SunAz : float or DataFrame
+          Sun azimuth angles in decimal degrees
+
+  DNI, GHI, HExtra, AM : float or DataFrame (optional)
+          direct normal, global horizontal and extraterrestrial irradiance in
+          W/m^2, and relative airmass, as required by Models (see
+          pvl_skydiffuse)
+
+  Models : sequence of strings (optional, default all)
+          any of 'isotropic', 'king', 'klucher', 'haydavies', 'reindl' and
+          'perez'
+
+  modelt : string (optional, default 'allsitescomposite1990')
+          set of Perez coefficients, see pvl_perez
+
+  Returns
+  -------
+
+  SkyDiffuse : DataFrame
+          sky diffuse irradiance in W/m^2, one column per model. Unlike
+          pvl_perez, no timestamps are left out.
+
+  See Also
+  --------
+  pvl_skydiffuse
+  pvl_isotropicsky
+  pvl_kingdiffuse
+  pvl_klucher1979
+  pvl_haydavies1980
+  pvl_reindl1990
+  pvl_perez
+  '''
+
+  Vars=locals()
+  Expect={'SurfTilt':('x>=0','x<=180'),
+          'SurfAz':('x>=-180'),
+          'DHI':('x>=0'),
+          'SunZen':'',
+          'SunAz':('optional'),
+          'DNI':('optional'),
+          'GHI':('optional'),
+          'HExtra':('optional'),
+          'AM':('optional'),
+          'Models':'',
+          'modelt':''
+          }
+  var=pvl_tools.Parse(Vars,Expect)
+
+  Models=list(Models)
+  for Model in Models:
+    if not(Model in MODELS):
+      raise Exception('Models must be among: '+', '.join(MODELS))
+  check_required(Models,Vars)
+
+  if isinstance(SunZen,SolarGeometry):
+    Sun=SunZen
+  else:
+    Sun=SolarGeometry(SunZen,SunAz)
+  Surface=SurfaceGeometry.make(SurfTilt,SurfAz)
+  Time=None
+  for value in (DHI,Sun.zenith,DNI,GHI,HExtra,AM,Surface.tilt):
+    if isinstance(value,(pd.Series,pd.DataFrame)):
+      Time=value.index
+      break
+
+  SkyDiffuse=sky_diffuse_models(Models,array_of(Sun),array_of(Surface),array_of(DHI),array_of(DNI),
+                                array_of(GHI),array_of(HExtra),array_of(AM),modelt)
+
+  return pd.DataFrame(np.atleast_2d(SkyDiffuse.T),index=Time,columns=Models)
+
+
+
+def array_of(value):
+  '''
+  Float array of a per-timestamp input; geometries are rebuilt from arrays
+  '''
+  if value is None:
+    return None
+  if isinstance(value,SolarGeometry):
+    return SolarGeometry(array_of(value.zenith),array_of(value.azimuth))
+  if isinstance(value,SurfaceGeometry):
+    return SurfaceGeometry(array_of(value.tilt),array_of(value.azimuth))
+  return np.asarray(value,dtype=float)
@@ -0,0 +1,180 @@
+'''
+pvl_solargeometry
+=================
+
+Cached sun and surface trigonometry shared by the AOI, transposition and
+clear sky functions
+
+'''
+
+import pvl_tools
+
+
+class SolarGeometry():
+  '''
+  Sun position with its trigonometric terms computed once and cached
+
+  Pass a SolarGeometry in place of the sun zenith (and azimuth) inputs of
+  pvl_getaoi, pvl_perez, pvl_haydavies1980, pvl_reindl1990,
+  pvl_klucher1979, pvl_kingdiffuse, pvl_clearsky_haurwitz and
+  pvl_clearsky_ineichen so that each cos/sin is evaluated only once for a
+  whole model chain.
+
+  Parameters
+  ----------
+
+  SunZen : float or DataFrame
+          apparent (refraction-corrected) zenith angles in decimal degrees.
+
+  SunAz : float or DataFrame (optional)
+          Sun azimuth angles in decimal degrees. Only required by the
+          functions which need the angle of incidence.
+
+  Returns
+  -------
+
+  self : SolarGeometry
+
+          *self.zenith*, *self.azimuth* - the input angles
+
+          *self.cos_zenith*, *self.sin_zenith*, *self.cos_azimuth*,
+          *self.sin_azimuth* - trigonometric terms, computed on first use
+
+  See Also
+  --------
+  SurfaceGeometry
+  pvl_ephemeris
+  pvl_spa
+  '''
+
+  def __init__(self,SunZen,SunAz=None):
+    self.zenith=SunZen
+    self.azimuth=SunAz
+    self._cache={}
+
+  @classmethod
+  def make(cls,SunZen,SunAz=None):
+    '''
+    Return SunZen if it is already a SolarGeometry, otherwise build one
+    '''
+    if isinstance(SunZen,cls):
+      return SunZen
+    return cls(SunZen,SunAz)
+
+  def _get(self,name,fcn,angle):
+    if not(name in self._cache):
+      self._cache[name]=fcn(angle)
+    return self._cache[name]
+
+  @property
+  def cos_zenith(self):
+    return self._get('cos_zenith',pvl_tools.cosd,self.zenith)
+
+  @property
+  def sin_zenith(self):
+    return self._get('sin_zenith',pvl_tools.sind,self.zenith)
+
+  @property
+  def cos_azimuth(self):
+    return self._get('cos_azimuth',pvl_tools.cosd,self.azimuth)
+
+  @property
+  def sin_azimuth(self):
+    return self._get('sin_azimuth',pvl_tools.sind,self.azimuth)
+
+
+
+class SurfaceGeometry():
+  '''
+  Surface orientation with its trigonometric terms computed once and cached
+
+  Pass a SurfaceGeometry in place of the surface tilt (and azimuth) inputs
+  of the AOI and transposition functions. The cosine of the angle of
+  incidence for a given SolarGeometry is also cached, so pvl_getaoi and a
+  sky diffuse model called with the same pair of objects share it.
+
+  Parameters
+  ----------
+
+  SurfTilt : float or DataFrame
+          Surface tilt angles in decimal degrees.
+
+  SurfAz : float or DataFrame (optional)
+          Surface azimuth angles in decimal degrees. Only required by the
+          functions which need the angle of incidence.
+
+  Returns
+  -------
+
+  self : SurfaceGeometry
+
+          *self.tilt*, *self.azimuth* - the input angles
+
+          *self.cos_tilt*, *self.sin_tilt*, *self.cos_azimuth*,
+          *self.sin_azimuth* - trigonometric terms, computed on first use
+
+  See Also
+  --------
+  SolarGeometry
+  pvl_getaoi
+  '''
+
+  def __init__(self,SurfTilt,SurfAz=None):
+    self.tilt=SurfTilt
+    self.azimuth=SurfAz
+    self._cache={}
+    self._sun=None
+    self._cos_aoi=None
+
+  @classmethod
+  def make(cls,SurfTilt,SurfAz=None):
+    '''
+    Return SurfTilt if it is already a SurfaceGeometry, otherwise build one
+    '''
+    if isinstance(SurfTilt,cls):
+      return SurfTilt
+    return cls(SurfTilt,SurfAz)
+
+  def _get(self,name,fcn,angle):
+    if not(name in self._cache):
+      self._cache[name]=fcn(angle)
+    return self._cache[name]
+
+  @property
+  def cos_tilt(self):
+    return self._get('cos_tilt',pvl_tools.cosd,self.tilt)
+
+  @property
+  def sin_tilt(self):
+    return self._get('sin_tilt',pvl_tools.sind,self.tilt)
+
+  @property
+  def cos_azimuth(self):
+    return self._get('cos_azimuth',pvl_tools.cosd,self.azimuth)
+
+  @property
+  def sin_azimuth(self):
+    return self._get('sin_azimuth',pvl_tools.sind,self.azimuth)
+
+  def cos_aoi(self,Sun):
+    '''
+    Cosine of the angle of incidence of the sun beam on the surface
+
+    Parameters
+    ----------
+
+    Sun : SolarGeometry
+
+    Returns
+    -------
+
+    COSTT : float or DataFrame
+          cos(AOI), using cos(SunAz-SurfAz)=cos(SunAz)cos(SurfAz)+sin(SunAz)sin(SurfAz)
+          so that only cached terms are needed. The result for the most
+          recent Sun is cached.
+    '''
+    if not(Sun is self._sun):
+      cosdaz=Sun.cos_azimuth*self.cos_azimuth + Sun.sin_azimuth*self.sin_azimuth
+      self._cos_aoi=self.cos_tilt*Sun.cos_zenith + self.sin_tilt*Sun.sin_zenith*cosdaz
+      self._sun=Sun
+    return self._cos_aoi
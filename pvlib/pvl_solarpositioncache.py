@@ -0,0 +1,229 @@
+'''
+pvl_solarpositioncache
+======================
+
+Cache of solar position results keyed by site, algorithm and time index, so
+that systems sharing a weather station and time index only pay for the sun
+position once
+
+'''
+
+import os
+import json
+import hashlib
+import tempfile
+import collections
+
+import numpy as np
+import pandas as pd
+
+from pvl_ephemeris import pvl_ephemeris
+from pvl_spa import pvl_spa
+
+
+ALGORITHMS={'ephemeris':pvl_ephemeris,
+            'spa':pvl_spa}
+
+
+class SolarPositionCache():
+  '''
+  Two-tier cache of pvl_ephemeris / pvl_spa results
+
+  Results are keyed by (latitude, longitude, altitude, TZ, algorithm,
+  algorithm options, hash of the time index). The first tier is an in-memory
+  LRU which evicts the least recently used results once their total size
+  exceeds max_bytes. If a directory is given, results are also stored there
+  as .npy files and loaded back memory-mapped, so they are shared between
+  processes and survive restarts.
+
+  Parameters
+  ----------
+
+  max_bytes : int (optional, default 256 MB)
+          Size limit of the in-memory tier, in bytes.
+
+  directory : string (optional)
+          Folder for the on-disk tier. It is created if it does not exist.
+          No on-disk tier if not given.
+
+  Returns
+  -------
+
+  self : SolarPositionCache
+
+          *self.solarposition(Time,Location,Algorithm='spa',**kwargs)* -
+          returns the same outputs as pvl_spa(Time,Location,**kwargs) or
+          pvl_ephemeris(Time,Location,**kwargs)
+
+          *self.hits*, *self.disk_hits*, *self.misses* - lookup counters
+
+  Notes
+  -----
+
+  The returned Series share the cached arrays, which are read-only. Copy
+  them before modifying values in place.
+
+  See Also
+  --------
+  pvl_spa
+  pvl_ephemeris
+  '''
+
+  def __init__(self,max_bytes=256*2**20,directory=None):
+    self.max_bytes=max_bytes
+    self.directory=directory
+    self.nbytes=0
+    self.hits=0
+    self.disk_hits=0
+    self.misses=0
+    self._entries=collections.OrderedDict()
+    if directory is not None and not(os.path.isdir(directory)):
+      os.makedirs(directory)
+
+  def key(self,Time,Location,Algorithm='spa',**kwargs):
+    '''
+    Cache key (a hex digest) of a solar position request
+    '''
+    digest=hashlib.sha1()
+    site=tuple(float(location_field(Location,name)) for name in ('latitude','longitude','altitude','TZ'))
+    digest.update(repr((site,Algorithm,str(Time.tz),len(Time))).encode())
+    digest.update(np.ascontiguousarray(Time.asi8).view(np.uint8))
+    for name in sorted(kwargs):
+      value=kwargs[name]
+      digest.update(name.encode())
+      if isinstance(value,(np.ndarray,pd.Series)):
+        digest.update(np.ascontiguousarray(value,dtype=float).view(np.uint8))
+      else:
+        digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+  def solarposition(self,Time,Location,Algorithm='spa',**kwargs):
+    '''
+    Solar position for Time and Location, from the cache if possible
+
+    Parameters
+    ----------
+
+    Time : Dataframe.index
+          A pandas datatime object
+
+    Location : struct
+          Standard location structure
+
+    Algorithm : string
+          'spa' (pvl_spa) or 'ephemeris' (pvl_ephemeris)
+
+    kwargs :
+          Other inputs of the algorithm, e.g. Pressure and Temperature
+
+    Returns
+    -------
+
+    The outputs of pvl_spa or pvl_ephemeris, indexed by Time
+    '''
+    if not(Algorithm in ALGORITHMS):
+      raise Exception('Algorithm must be one of: '+', '.join(sorted(ALGORITHMS)))
+
+    key=self.key(Time,Location,Algorithm,**kwargs)
+    entry=self._lookup(key,lambda: ALGORITHMS[Algorithm](Time,Location,**kwargs))
+    return unpack(entry,Time)
+
+  def _lookup(self,key,compute):
+    '''
+    Packed entry of key from the memory or disk tier, or pack(compute())
+    '''
+    entry=self._entries.pop(key,None)
+    if entry is not None:
+      self.hits=self.hits+1
+    else:
+      entry=self._load(key)
+      if entry is not None:
+        self.disk_hits=self.disk_hits+1
+      else:
+        self.misses=self.misses+1
+        entry=pack(compute())
+        self._save(key,entry)
+      self.nbytes=self.nbytes+entry[1].nbytes
+    self._entries[key]=entry   #most recently used last
+    self._evict()
+    return entry
+
+  def clear(self):
+    '''
+    Empty the in-memory tier. The on-disk tier is left as is.
+    '''
+    self._entries.clear()
+    self.nbytes=0
+
+  def _evict(self):
+    while self.nbytes>self.max_bytes and len(self._entries)>1:
+      key,entry=self._entries.popitem(last=False)
+      self.nbytes=self.nbytes-entry[1].nbytes
+
+  def _path(self,key):
+    return os.path.join(self.directory,key)
+
+  def _load(self,key):
+    if self.directory is None or not(os.path.exists(self._path(key)+'.npy')):
+      return None
+    with open(self._path(key)+'.json') as f:
+      layout=json.load(f)
+    return layout, np.load(self._path(key)+'.npy',mmap_mode='r')
+
+  def _save(self,key,entry):
+    if self.directory is None:
+      return
+    #Write to temporary files and rename, so that readers never see a partial entry
+    for ext,write in (('.json',lambda f: f.write(json.dumps(entry[0]).encode())),
+                      ('.npy',lambda f: np.save(f,entry[1]))):
+      fd,tmp=tempfile.mkstemp(dir=self.directory)
+      with os.fdopen(fd,'wb') as f:
+        write(f)
+      os.rename(tmp,self._path(key)+ext)
+
+
+
+def location_field(Location,name,default=0):
+  '''
+  Field of a Location dict (e.g. TMY meta) or struct (pvl_makelocationstruct)
+  '''
+  try:
+    return Location[name]
+  except (KeyError,TypeError,AttributeError):
+    return getattr(Location,name,default)
+
+
+def pack(result):
+  '''
+  Stack a tuple of Series / DataFrames into a read-only 2-D array, with the
+  layout needed to rebuild them
+  '''
+  layout=[]
+  rows=[]
+  for item in result:
+    if isinstance(item,pd.DataFrame):
+      layout.append(['frame',[str(name) for name in item.columns]])
+      rows.extend(np.asarray(item[name],dtype=float) for name in item.columns)
+    else:
+      layout.append(['series',str(item.name)])
+      rows.append(np.asarray(item,dtype=float))
+  data=np.vstack(rows)
+  data.setflags(write=False)
+  return layout, data
+
+
+def unpack(entry,Time):
+  '''
+  Rebuild the outputs stored by pack, indexed by Time
+  '''
+  layout,data=entry
+  result=[]
+  row=0
+  for kind,names in layout:
+    if kind=='frame':
+      result.append(pd.DataFrame(data[row:row+len(names)].T,index=Time,columns=names))
+      row=row+len(names)
+    else:
+      result.append(pd.Series(data[row],index=Time,name=names))
+      row=row+1
+  return tuple(result)
@@ -1,13 +1,46 @@
 import numpy as np
 from scipy.io import loadmat,savemat
 import os
-import sys
+import imp
 from pvl_tools import * #load all of pvl_tools into namespace
 import pandas as pd
+import spa_numpy
+from spa_numpy import SPA_ZA, SPA_ZA_INC, SPA_ZA_RTS, SPA_ALL
 
 
-
-def pvl_spa(Time,Location):
+def load_spa_py(directory=None):
+    '''
+    Import the compiled spa_py extension, either from the python path or from
+    directory (default './spa_c_files/' next to this file). Returns None if it
+    has not been built, cannot be loaded (e.g. a stale build for another
+    python version), or was built from a spa_py.pyx without the
+    spa_calc_array batch entry point.
+    '''
+    if directory is None:
+        directory=os.path.join(os.path.dirname(os.path.abspath(__file__)),'spa_c_files')
+    try:
+        import spa_py
+    except ImportError:
+        try:
+            found=imp.find_module('spa_py',[directory])
+        except ImportError:
+            return None
+        try:
+            spa_py=imp.load_module('spa_py',*found)
+        except (ImportError,OSError):
+            return None
+        finally:
+            if found[0] is not None:
+                found[0].close()
+
+    if hasattr(spa_py,'spa_calc_array'):
+        return spa_py
+    return None
+
+spa_py=load_spa_py()
+
+
+def pvl_spa(Time,Location,Pressure=820,Temperature=11,Function=SPA_ZA,SurfTilt=30,SurfAz=170,Table=None):
     '''
     Calculate the solar position using the C implementation of the NREL 
     SPA code 
@@ -15,12 +48,16 @@ def pvl_spa(Time,Location):
     The source files for this code are located in './spa_c_files/', along with
     a README file which describes how the C code is wrapped in Python. 
 
+    If the compiled extension has not been built, the vectorized NumPy port
+    of the same algorithm in spa_numpy is used instead.
+
     Parameters
     ----------
 
     Time: Dataframe.index
 
-        A pandas datatime object
+        A pandas datatime object. Naive indexes are in the time zone
+        Location.TZ
 
     Location: struct
 
@@ -33,6 +70,40 @@ def pvl_spa(Time,Location):
         *Location.altitude* - an optional component of the Location struct, not
                               used in the ephemeris code directly, but it may be used to calculate
                               standard site pressure (see pvl_alt2pres function)
+        *Location.TZ* - timezone in hours from UTC, used for naive indexes
+
+    Pressure: float or DataFrame (optional, default 820)
+
+        Local pressure in mbar, used for the refraction correction. May be a
+        vector of the same length as Time (e.g. TMY Pressure)
+
+    Temperature: float or DataFrame (optional, default 11)
+
+        Local temperature in degrees C, used for the refraction correction.
+        May be a vector of the same length as Time (e.g. TMY DryBulb)
+
+    Function: int (optional, default SPA_ZA)
+
+        SPA output level. SPA_ZA only calculates the sun position, which is
+        the cheapest. SPA_ZA_INC adds the incidence angle on the surface given
+        by SurfTilt and SurfAz, SPA_ZA_RTS adds sunrise, transit and sunset,
+        and SPA_ALL adds both.
+
+    SurfTilt: float (optional, default 30)
+
+        Surface tilt angle in decimal degrees, used by SPA_ZA_INC and SPA_ALL
+
+    SurfAz: float (optional, default 170)
+
+        Surface azimuth angle in decimal degrees from North (180 = South),
+        used by SPA_ZA_INC and SPA_ALL
+
+    Table: GeocentricTable (optional)
+
+        Precomputed geocentric sun position covering Time. The sun position
+        is interpolated from the table instead of calculated from the
+        periodic terms, within the tolerance given in GeocentricTable, and
+        the vectorized NumPy version of the SPA does the rest.
 
     Returns
     -------
@@ -44,6 +115,17 @@ def pvl_spa(Time,Location):
         Actual elevation (not accounting for refraction)of the sun 
         in decimal degrees, 0 = on horizon. The complement of the True Zenith
         Angle.
+
+    ApparentZenith : DataFrame
+        Refraction corrected zenith angle of the sun in decimal degrees
+
+    SPAOut : DataFrame
+        Outputs selected by Function, always returned so that the number of
+        outputs does not depend on Function. Contains *incidence*
+        (SPA_ZA_INC and SPA_ALL) in decimal degrees and/or *suntransit*,
+        *sunrise* and *sunset* (SPA_ZA_RTS and SPA_ALL) in fractional hours UTC
+        of the UTC day (-99999 if the sun does not rise or set that day). Has
+        no columns for SPA_ZA.
     
 
     References
@@ -53,35 +135,46 @@ def pvl_spa(Time,Location):
     
     '''
     
-    sys.path.append(os.path.abspath('spa_c_files/'))
-    
-    import spa_py #import the Cython version of the C compiled NREL SPA algorithm
-
-    try: 
-        Timeshifted=Time.tz_convert('UTC') #This will work with a timezone aware dataset
-    except:
-        Timeshifted=Time.shift(abs(Location['TZ']),freq='H') #This will work with a timezone unaware dataset
-
-    spa_out=[]
-    
-    for date in Timeshifted:
-        spa_out.append(spa_py.spa_calc(year=date.year,
-                        month=date.month,
-                        day=date.day,
-                        hour=date.hour,
-                        minute=date.minute,
-                        second=date.second,
-                        timezone=0, #timezone corrections handled above
-                        latitude=Location['latitude'],
-                        longitude=Location['longitude'],
-                        elevation=Location['altitude']))
-    
-    DFOut=pd.DataFrame(spa_out,index=Time)
+    if spa_py is None or Table is not None:
+        spa=spa_numpy #vectorized NumPy version of the NREL SPA algorithm
+    else:
+        spa=spa_py #the Cython version of the C compiled NREL SPA algorithm
+
+    epoch=np.asarray(Time.asi8,dtype=np.int64) #UTC for a timezone aware dataset
+    if Time.tz is None:
+        epoch=epoch - np.int64(Location['TZ']*3600*10**9) #a timezone unaware dataset is in Location['TZ']
+
+    outputs=['zenith','azimuth180']
+    if Function in (SPA_ZA_INC,SPA_ALL):
+        outputs=outputs+['incidence']
+    if Function in (SPA_ZA_RTS,SPA_ALL):
+        outputs=outputs+['suntransit','sunrise','sunset']
+
+    spa_out={}
+    for name in outputs:
+        spa_out[name]=np.empty(len(epoch))
+
+    options=dict(spa_out)
+    if Table is not None:
+        options['table']=Table
+
+    spa.spa_calc_array(epoch=epoch,
+                    timezone=0, #timezone corrections handled above
+                    latitude=Location['latitude'],
+                    longitude=Location['longitude'],
+                    elevation=Location['altitude'],
+                    pressure=np.asarray(Pressure,dtype=float),
+                    temperature=np.asarray(Temperature,dtype=float),
+                    slope=SurfTilt,
+                    azm_rotation=SurfAz-180, #SPA measures the surface azimuth from South
+                    function=Function,
+                    **options)
+
+    DFOut=pd.DataFrame(spa_out,index=Time,columns=outputs)
     
     DFOut['SunEl']=90-DFOut.zenith
     
-
-    return DFOut['azimuth180'],DFOut['SunEl'],DFOut['zenith']
+    return DFOut['azimuth180'],DFOut['SunEl'],DFOut['zenith'],DFOut[outputs[2:]]
 
 
 
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+import pvl_tools
+import spa_numpy
+from pvl_solarpositioncache import location_field
+
+
+DAY=24*3600*10**9 #nanoseconds
+NAT=np.iinfo(np.int64).min
+
+
+def pvl_sunrisesunset(Time,Location,delta_t=67):
+  '''
+  Sunrise, solar transit and sunset for each day of a time index
+
+  Uses the sunrise/transit/sunset (RTS) part of the NREL SPA, vectorized over
+  the distinct local calendar days in Time, so one year of one-minute data
+  costs 365 evaluations. Sunrise and sunset are the times when the top of the
+  sun is at the horizon with standard refraction (true elevation of the sun
+  centre -0.8333 degrees).
+
+  Parameters
+  ----------
+
+  Time : Dataframe.index
+
+      A pandas datatime object. Timezone-aware indexes are handled in their
+      own timezone (including daylight saving time), naive indexes are taken
+      to be in the standard time of Location.TZ.
+
+  Location : struct
+
+      Standard location structure, containing:
+
+      *Location.latitude* - scalar latitude in decimal degrees (positive is
+                            northern hemisphere)
+      *Location.longitude* - scalar longitude in decimal degrees (positive is
+                            east of prime meridian)
+      *Location.TZ* - timezone in hours from UTC, used for naive indexes
+      *Location.altitude* - optional altitude in meters
+
+  delta_t : float (optional, default 67)
+
+      Difference between terrestrial time and UT, in seconds
+
+  Returns
+  -------
+
+  SunTimes : DataFrame
+
+      One row per local calendar day in Time, indexed by the midnight which
+      starts the day (in the timezone of Time), with columns:
+
+      *sunrise*, *transit*, *sunset* - local times, NaT if the sun does not
+      rise or set that day
+
+      *polarday* - True if the sun stays above the horizon all day
+
+  Notes
+  -----
+
+  The SPA starts each day at 0h UT, so the C code may report the sunset of
+  the previous evening where it is close to midnight UT. Here each day starts
+  at local midnight instead. Close to the polar circles, on the days when the
+  sun only just rises or sets, the RTS interpolation can be off by several
+  minutes.
+
+  References
+  ----------
+
+  I. Reda and A. Andreas, Solar position algorithm for solar radiation
+  applications. Solar Energy, vol. 76, no. 5, pp. 577-589, 2004.
+
+  See Also
+  --------
+  pvl_spa
+  DayMask
+  '''
+
+  Vars=locals()
+  Expect={'Time':'',
+          'Location':'',
+          'delta_t':('num','x>=-8000','x<=8000')
+          }
+  var=pvl_tools.Parse(Vars,Expect)
+
+  latitude=location_field(Location,'latitude')
+  longitude=location_field(Location,'longitude')
+
+  #local midnights of each day, and their UTC epochs
+  local=local_time(Time)
+  days=pd.DatetimeIndex(np.unique(local.normalize().asi8))
+  if Time.tz is None:
+    start=days.asi8 - np.int64(location_field(Location,'TZ')*3.6e12)
+  else:
+    #UTC offset of the previous noon. Where the clocks go forward at
+    #midnight, this is the first instant of the day; where they go back at
+    #midnight, the day starts when they read midnight again.
+    noon=days - pd.Timedelta(hours=12)
+    start=days.asi8 - (noon.asi8 - noon.tz_localize(Time.tz).asi8)
+    start=start + np.maximum(days.asi8 - local_time(from_epoch(start,Time.tz)).asi8,0)
+
+  #The SPA finds the events of the day starting at jd0, normally 0h UT. Start
+  #it at local midnight instead, so that each event is that of the solar day
+  #whose transit falls in the local day.
+  has_rts,fractions=spa_numpy.rts_day_fractions(spa_numpy.julian_day_from_epoch(start),
+                                                latitude,longitude,delta_t)
+  #Naive times are local wall-clock times. Aware ones are built from the UTC
+  #epochs, which never fall on nonexistent or ambiguous wall-clock times.
+  base=days.asi8 if Time.tz is None else start
+  SunTimes={}
+  for name,fraction in zip(('transit','sunrise','sunset'),fractions):
+    SunTimes[name]=np.where(has_rts,base + (fraction*DAY).astype(np.int64),NAT)
+
+  #no sunrise or sunset: polar day if the sun is up at noon
+  norts=~has_rts
+  polarday=np.zeros(len(days),dtype=bool)
+  if norts.any():
+    zenith=np.empty(np.count_nonzero(norts))
+    spa_numpy.spa_calc_array(epoch=start[norts] + DAY//2,latitude=latitude,longitude=longitude,
+                             elevation=location_field(Location,'altitude'),zenith=zenith,delta_t=delta_t)
+    polarday[norts]=zenith<90
+
+  if Time.tz is not None:
+    days=from_epoch(start,Time.tz)
+    for name in SunTimes:
+      SunTimes[name]=from_epoch(SunTimes[name],Time.tz)
+  SunTimes=pd.DataFrame(dict((name,pd.DatetimeIndex(SunTimes[name])) for name in SunTimes),index=days)
+  SunTimes['polarday']=polarday
+
+  return SunTimes[['sunrise','transit','sunset','polarday']]
+
+
+
+def from_epoch(epoch,tz):
+  '''
+  DatetimeIndex in tz of UTC epochs (ns)
+  '''
+  return pd.DatetimeIndex(epoch).tz_localize('UTC').tz_convert(tz)
+
+
+def local_time(Time):
+  '''
+  Local wall-clock times of Time as a naive DatetimeIndex
+  '''
+  if Time.tz is None:
+    return Time
+  return Time.tz_localize(None)
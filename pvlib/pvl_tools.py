@@ -7,8 +7,10 @@ pvl_logger = logging.getLogger('pvlib')
 import pdb
 import ast
 import re
+import operator
 
 import numpy as np 
+import pandas as pd
 
 
 class repack():   #repack a dict as a struct
@@ -74,6 +76,19 @@ class Parse():		#parse complex logic
 
     This function will raise a descriptive exception if a variable fails any input requrements 
 
+    Inputs are never modified. Numeric inputs given as numpy arrays or pandas
+    Series are passed through without copying; other numeric inputs (scalars,
+    lists, DataFrames, Index objects) are viewed as arrays with np.asarray.
+    Functions which need to clamp or replace input values do so in
+    temporaries (see :py:func:`masked_replace`), so callers do not need to
+    make defensive copies.
+
+    When trusted inputs are enabled (see :py:class:`trusted_inputs`), no
+    checks are made: inputs are only unpacked and any default values filled in.
+
+    The Expect dict is compiled into a :py:class:`ParseSpec` the first time it
+    is seen, and the compiled form is reused on every later call with an
+    identical Expect dict (see :py:func:`compile_expect`).
 
     '''
     def __init__(self, dct, Expect):
@@ -87,126 +102,415 @@ class Parse():		#parse complex logic
             kwargs.update(kwargs['kwargs'])
             del kwargs['kwargs']
 
-        #Check all inputs are defined
-        try:
-            for arg in kwargs:
+        spec=compile_expect(Expect)
+        if _trusted:
+            return spec.apply_trusted(kwargs)
+        return spec.apply(kwargs)
 
-                    Expect[arg]
-        except:
-            raise Exception('WARNING: Unknown variable " '+arg+' " ')
+
+
+#Regular expressions used to interpret the constraint strings of an Expect dict
+reg=re.compile('[a-z][== <= >= < >][== <= >= < >]?-?[0-9]+')
+reglogical=re.compile('.[== <= >= < >].')
+regdefault=re.compile('default=')
+regsyst=re.compile('.__.')
+
+
+
+class Constraint():
+    '''
+    Vectorized checker for a single logical constraint (eg. 'x>=0')
+
+    Parameters
+    ----------
+
+    expression : string
+        Logical expression in the form 'x[== <= >= < >]value', as matched from
+        an Expect dict
+
+    Returns
+    -------
+
+    self : callable
+        Evaluates the constraint on a scalar or array using a NumPy comparison.
+        Expressions that do not fit the simple form are evaluated as
+        'lambda x:expression', compiled once.
+    '''
+
+    operators={'==':operator.eq,
+               '<=':operator.le,
+               '>=':operator.ge,
+               '<':operator.lt,
+               '>':operator.gt}
+
+    regop=re.compile('^x(==|<=|>=|<|>)(-?[0-9]+)$')
+
+    def __init__(self,expression):
+        self.expression=expression
+        match=re.match(self.regop,expression)
+        if match:
+            self.op=self.operators[match.group(1)]
+            self.value=int(match.group(2))
+        else:
+            self.op=None
+            self.fcn=eval('lambda x:'+expression)
+
+    def __call__(self,x):
+        if self.op is None:
+            return self.fcn(x)
+        return self.op(x,self.value)
+
+
+
+class ParseSpec():
+    '''
+    Compiled form of an Expect dict, used by :py:class:`Parse`
+
+    All regex matching of the constraint strings is done once, when the spec
+    is built. Applying the spec to a set of inputs only performs the lookups,
+    numeric recasting and NumPy comparisons.
+
+    Parameters
+    ----------
+
+    Expect : dict
+        Parsing logic for input variables, see :py:class:`Parse`
+
+    Returns
+    -------
+
+    self : ParseSpec
+        Compiled spec. Call `apply(kwargs)` to validate a dict of inputs.
+    '''
+
+    def __init__(self,Expect):
+        self.Expect=Expect
+        self.required=[]    #inputs which must be present, in checking order
+        self.dfarg=None     #main dataframe
+        self.matelements=[] #columns which must exist in the main dataframe
+        self.numeric=set()
+        self.choices={}     #valid values of string inputs
+        self.rules=[]       #defaults and logical tests, in evaluation order
+
+        for arg in Expect:
+            spec=Expect[arg]
+            if 'df' in spec:
+                self.dfarg=arg
+                self.required.append(arg)
+            if not(('matelement' in spec) or ('optional' in spec) 
+                    or ('default' in spec)):
+                self.required.append(arg)
+            if 'matelement' in spec:
+                self.matelements.append(arg)
+            if 'num' in spec:
+                self.numeric.add(arg)
+            if 'str' in spec and (not('open' in spec) or not( 'o' in spec)):
+                self.choices[arg]=spec[1]
+
+        for arg in Expect:
+            for string in Expect[arg]:
+                if not isinstance(string,basestring): ##Python 2.x dependancy
+                    continue
+                #Remove any potential of running system commands through eval
+                if len(re.findall(regsyst,string))>0:
+                    self.rules.append(('raise',arg,"DANGER: System Command entered as constraint ' "+ string+ "' "))
+
+                #Set default value for a variable if defined
+                elif len(re.findall(regdefault,string))>0:
+                    try: 
+                        self.rules.append(('default',arg,float(string[8:]))) #numeric defualt
+                    except:
+                        self.rules.append(('default',arg,string[8:])) #string default
+
+                #Excecute proper logical operations if syntax matches regex
+                elif len(re.findall(reg,string))>0:
+                    if ('matelement' in Expect[arg]):
+                        mode='matelement'
+                    elif ('optional' in Expect[arg]):
+                        mode='optional'
+                    else:
+                        mode='num'
+                    self.rules.append(('logical',arg,Constraint(re.findall(reg,string)[0]),mode))
+
+                #Check if any string logicals are bypassed due to poor formatting
+                elif len(re.findall(reglogical,string))>0:
+                    self.rules.append(('raise',arg,"WARNING: Logical constraint ' "+string+" ' is unused. Check syntax"))
+
+    def apply_trusted(self,kwargs):
+        '''
+        Fill in default values without validating any inputs
+
+        Parameters
+        ----------
+
+        kwargs : dict
+            Input variables
+
+        Returns
+        -------
+
+        kwargs : dict
+            Input variables, passed through unchanged, with any missing
+            default values filled in
+        '''
+
+        for rule in self.rules:
+            if rule[0]=='default' and not(rule[1] in kwargs):
+                if isinstance(rule[2],float):
+                    kwargs[rule[1]]=np.array(rule[2])
+                else:
+                    kwargs[rule[1]]=rule[2]
+
+        return kwargs
+
+    def apply(self,kwargs):
+        '''
+        Validate a flat dict of inputs against the compiled spec
+
+        Parameters
+        ----------
+
+        kwargs : dict
+            Input variables
+
+        Returns
+        -------
+
+        kwargs : dict
+            Input variables with numeric inputs recast as arrays and any
+            default values filled in
+        '''
+
+        #Check all inputs are defined
+        for arg in kwargs:
+            if not(arg in self.Expect):
+                raise Exception('WARNING: Unknown variable " '+arg+' " ')
 
         #Check that all inputs exist
-        try: 
-            for arg in Expect:
-                if 'df' in Expect[arg]:
-                    df=kwargs[arg]  #locate main dataframe 
-                if not(('matelement' in Expect[arg]) or ('optional' in Expect[arg]) 
-                        or ('default' in Expect[arg])):
-                    kwargs[arg]
-        except:
-            raise Exception('WARNING: " '+arg+' " was not input')	
+        for arg in self.required:
+            if not(arg in kwargs):
+                raise Exception('WARNING: " '+arg+' " was not input')	
+        if self.dfarg is not None:
+            df=kwargs[self.dfarg]  #locate main dataframe 
 
-    
         #Check dataframe entries
-        try:
-            for arg in Expect:
-                if 'matelement' in Expect[arg]:
-                    df[arg]
+        for arg in self.matelements:
+            try:
+                df[arg]
+            except:
+                raise Exception('WARNING: " '+arg+' " in main dataframe does not exist')			
 
-        except:
-            raise Exception('WARNING: " '+arg+' " in main dataframe does not exist')			
         # Assert numeric for all numeric fields
-    
         try:
             for arg in kwargs:
                 #add any exceptions to numeric checks (eg. string input fields)
-                if not('num' in Expect[arg]):
+                if not(arg in self.numeric):
                     continue
-                # Check if the value is an np.array
-                if not isinstance(kwargs[arg],np.ndarray):
-                    kwargs[arg]=np.array(kwargs[arg])
-                    #print('WARNING: Numeric variable '+ arg +' not input as a numpy array. Recasting as array')
-                kwargs[arg].astype(float)
+                # Arrays and Series are used as-is, anything else is viewed as an array
+                if not isinstance(kwargs[arg],(np.ndarray,pd.Series)):
+                    kwargs[arg]=np.asarray(kwargs[arg])
+                # Only non-numeric dtypes need the (copying) cast to check their values
+                if not(kwargs[arg].dtype.kind in 'biuf'):
+                    np.asarray(kwargs[arg]).astype(float)
         except:
             raise Exception('Error: Non-numeric value in numeric input field: '+arg)
 
         #Check any string inputs. 
-        #pdb.set_trace()
-        #print 'DEVWARNING: Fix string index dependancy'
         for arg in kwargs:
-            if 'str' in Expect[arg]:
-                if (not('open' in Expect[arg]) or not( 'o' in Expect[arg])) and not(kwargs[arg] in Expect[arg][1]):
-                    raise Exception('Error: String in input field '+ arg+' is not valid')
-
+            if (arg in self.choices) and not(kwargs[arg] in self.choices[arg]):
+                raise Exception('Error: String in input field '+ arg+' is not valid')
+
+        #Apply defaults and logical constraints in the order they were specified
+        for rule in self.rules:
+            kind=rule[0]
+            arg=rule[1]
+            if kind=='raise':
+                raise Exception(rule[2])
+
+            elif kind=='default':
+                if not(arg in kwargs):
+                    if isinstance(rule[2],float):
+                        kwargs[arg]=np.array(rule[2])
+                    else:
+                        kwargs[arg]=rule[2]
+
+            elif kind=='logical':
+                test=rule[2]
+                mode=rule[3]
+                if mode=='matelement':
+                    if not(test(df[arg]).any()):
+                        raise Exception('Error: Numeric input "'+arg+' " fails on logical test " '+ test.expression+'"')	
+                    continue
+                if mode=='optional':
+                    if not(arg in kwargs): #check if the optional value exists 
+                        pvl_logger.warning('Optional value "'+arg+'" not input'"")
+                        continue
+                    label='optional input'
+                else:
+                    label='Numeric input'
+                try:    
+                    values=np.asarray(kwargs[arg]) #plain array, a boolean Series key would be aligned on the index
+                    if not(test(values[~np.isnan(values)]).all()): #ignore NAN entries
+                        raise Exception('Error: '+label+' "'+arg+' " fails on logical test " '+ test.expression+'"')
+                except:
+                    if not(test(kwargs[arg])): 
+                        raise Exception('Error: '+label+' "'+arg+' " fails on logical test " '+ test.expression+'"')
 
-        #Check logical functions
-        #pdb.set_trace()
-        reg=re.compile('[a-z][== <= >= < >][== <= >= < >]?-?[0-9]+')
-        reglogical=re.compile('.[== <= >= < >].')
-        regdefault=re.compile('default=')
-        regsyst=re.compile('.__.')
-        for arg in Expect:
-            for string in Expect[arg]:
-            
-                if isinstance(string,basestring): ##Python 2.x dependancy
-                    #Remove any potential of running system commands through eval
-                    if np.shape(re.findall(regsyst,string))[0]>0:		
-                        raise Exception("DANGER: System Command entered as constraint ' "+ string+ "' ")	
-                
-                    #Set default value for a variable if defined
-                    elif np.shape(re.findall(regdefault,string))[0]>0:
-                    
-                        try: 
-                            kwargs[arg]
-                        except:
-                            try: 
-                                kwargs[arg]=np.array(float(string[8:])) #numeric defualt
-                            except:
-                                kwargs[arg]=(string[8:]) #string default
-
-                    #Excecute proper logical operations if syntax matches regex
-                    elif np.shape(re.findall(reg,string))[0]>0:
-
-                        lambdastring='lambda x:'+re.findall(reg,string)[0]
-
-                        #check df elements
-                        if ('matelement' in Expect[arg]):
-                            if not(eval(lambdastring)(df[arg]).any()):
-                                raise Exception('Error: Numeric input "'+arg+' " fails on logical test " '+ re.findall(reg,string)[0]+'"')	
-                        elif ('optional' in Expect[arg]):
-                            #pdb.set_trace()
-                            try: #check if the optional value exists 
-                                kwargs[arg]
-                            except:
-                                pvl_logger.warning('Optional value "'+arg+'" not input'"")
-                                continue
-                            try:    
-                                if not(eval(lambdastring)(kwargs[arg][~np.isnan(kwargs[arg])]).all()): #ignore NAN entries
-                                    raise Exception('Error: optional input "'+arg+' " fails on logical test " '+ re.findall(reg,string)[0]+'"')
-                            except:
-                                if not(eval(lambdastring)(kwargs[arg])):
-                                    raise Exception('Error: optional input "'+arg+' " fails on logical test " '+ re.findall(reg,string)[0]+'"')
-                            
-
-                        #check all other contraints
-
-                        else:
-                            try:    
-                                if not(eval(lambdastring)(kwargs[arg][~np.isnan(kwargs[arg])]).all()): #ignore NAN entries
-                                    raise Exception('Error: Numeric input "'+arg+' " fails on logical test " '+ re.findall(reg,string)[0]+'"')
-                            except:
-                                if not(eval(lambdastring)(kwargs[arg])): 
-                                    raise Exception('Error: Numeric input "'+arg+' " fails on logical test " '+ re.findall(reg,string)[0]+'"')
-
-                    #Check if any string logicals are bypassed due to poor formatting
-                        
-                    elif np.shape(re.findall(reglogical,string))[0]>0:		
-                        raise Exception("WARNING: Logical constraint ' "+string+" ' is unused. Check syntax")
-                
         return kwargs
 
 
 
+#Library-wide trusted input flag, see trusted_inputs
+_trusted=False
+
+def set_trusted_inputs(flag=True):
+    '''
+    Turn trusted input mode on or off for all pvlib_python functions
+
+    In trusted input mode :py:class:`Parse` skips all input validation
+    (presence and type checks, numeric recasting and logical constraints) and
+    only unpacks the inputs and fills in default values. Use this only when
+    inputs have already been cleaned, as invalid inputs will then produce
+    incorrect results or errors from deep inside the models.
+
+    Parameters
+    ----------
+
+    flag : bool (optional, default=True)
+        True to skip input validation, False to restore it
+
+    Returns
+    -------
+
+    previous : bool
+        The previous setting
+
+    See Also
+    --------
+    trusted_inputs
+    '''
+
+    global _trusted
+    previous=_trusted
+    _trusted=bool(flag)
+    return previous
+
+
+
+class trusted_inputs():
+    '''
+    Context manager which skips input validation inside a `with` block
+
+    Parameters
+    ----------
+
+    flag : bool (optional, default=True)
+        Trusted input setting to use inside the block. The previous setting
+        is restored on exit.
+
+    Examples
+    --------
+
+    >>> with pvl_tools.trusted_inputs():
+    ...     AOI=pvl_getaoi(SurfTilt=30,SurfAz=0,SunZen=TMY.SunZen,SunAz=TMY.SunAz)
+
+    See Also
+    --------
+    set_trusted_inputs
+    '''
+
+    def __init__(self,flag=True):
+        self.flag=flag
+
+    def __enter__(self):
+        self.previous=set_trusted_inputs(self.flag)
+        return self
+
+    def __exit__(self,*exc_info):
+        set_trusted_inputs(self.previous)
+        return False
+
+
+
+#Compiled specs, keyed on the contents of the Expect dict
+_spec_cache={}
+
+def compile_expect(Expect):
+    '''
+    Return the compiled :py:class:`ParseSpec` for an Expect dict
+
+    Specs are cached on the contents of the Expect dict, so the regex and
+    eval work of compiling a function's input logic is done only the first
+    time that function is called.
+
+    Parameters
+    ----------
+
+    Expect : dict
+        Parsing logic for input variables, see :py:class:`Parse`
+
+    Returns
+    -------
+
+    spec : ParseSpec
+        Compiled spec for Expect
+    '''
+
+    try:
+        key=tuple(sorted(Expect.items()))
+        spec=_spec_cache.get(key)
+    except TypeError: #unhashable constraint, compile without caching
+        return ParseSpec(Expect)
+
+    if spec is None:
+        spec=ParseSpec(Expect)
+        _spec_cache[key]=spec
+
+    return spec
+
+
+
+def masked_replace(x,mask,value,out=None):
+    '''
+    Replace the elements of an array where a mask is True, without modifying the input
+
+    Parameters
+    ----------
+
+    x : float, array or Series
+            Input values
+
+    mask : bool, array or Series
+            Elements of x to replace
+
+    value : float, array or Series
+            Replacement value(s). Arrays and Series are matched to x by position
+
+    Other Parameters
+    ----------------
+
+    out : array (optional)
+            Preallocated output array of the same shape as x. May be x itself
+            to replace values in place.
+
+    Returns
+    -------
+
+    result : array or Series
+            Copy of x (or out) with the masked elements replaced. A Series is
+            returned, with the index of x, if x is a Series.
+    '''
+
+    result=np.where(mask,value,x)
+    if out is not None:
+        out[...]=result
+        return out
+    if isinstance(x,pd.Series):
+        return pd.Series(result,index=x.index,name=x.name)
+    return result
+
+
+
 def cosd(angle):
     """
     Cosine with angle input in degrees
@@ -35,4 +35,10 @@ cdef extern from "spa.h":
 		double sunrise    
 		double sunset   
 
-	int spa_calculate(spa_data *spa)
+	cdef enum:
+		SPA_ZA
+		SPA_ZA_INC
+		SPA_ZA_RTS
+		SPA_ALL
+
+	int spa_calculate(spa_data *spa) nogil
@@ -1,6 +1,20 @@
+cimport cython
 cimport cspa_py
+from libc.math cimport NAN
+import numpy as np
 
-def spa_calc(year,month,day,hour,minute,second,timezone,latitude,longitude,elevation):
+cdef long long NAT = -9223372036854775807 - 1   # pandas NaT as int64
+
+# Output levels for the SPA "function" input
+SPA_ZA     = cspa_py.SPA_ZA       # zenith and azimuth
+SPA_ZA_INC = cspa_py.SPA_ZA_INC   # zenith, azimuth and surface incidence angle
+SPA_ZA_RTS = cspa_py.SPA_ZA_RTS   # zenith, azimuth and sunrise/transit/sunset
+SPA_ALL    = cspa_py.SPA_ALL      # all of the above
+
+
+def spa_calc(year,month,day,hour,minute,second,timezone,latitude,longitude,elevation,
+		pressure=820,temperature=11,slope=30,azm_rotation=-10,atmos_refract=0.5667,
+		delta_t=67,delta_ut1=0,function=SPA_ZA):
 	cdef cspa_py.spa_data spa
 
 	spa.year          = year
@@ -10,20 +24,211 @@ def spa_calc(year,month,day,hour,minute,second,timezone,latitude,longitude,eleva
 	spa.minute        = minute
 	spa.second        = second
 	spa.timezone      = timezone
-	spa.delta_ut1     = 0
-	spa.delta_t       = 67
+	spa.delta_ut1     = delta_ut1
+	spa.delta_t       = delta_t
 	spa.longitude     = longitude
 	spa.latitude      = latitude
 	spa.elevation     = elevation
-	spa.pressure      = 820
-	spa.temperature   = 11
-	spa.slope         = 30
-	spa.azm_rotation  = -10
-	spa.atmos_refract = 0.5667
+	spa.pressure      = pressure
+	spa.temperature   = temperature
+	spa.slope         = slope
+	spa.azm_rotation  = azm_rotation
+	spa.atmos_refract = atmos_refract
+	spa.function      = function
 
 	err=cspa_py.spa_calculate(&spa)
 
 	return spa
+
+@cython.cdivision(True)
+cdef inline void _civil_from_epoch(long long ns, cspa_py.spa_data *spa) nogil:
+	# Split nanoseconds since 1970-01-01 into (proleptic Gregorian) date and
+	# time fields, dropping the fraction of a second
+	cdef long long secs = ns / 1000000000
+	cdef long long days, rem, z, era, doe, yoe, doy, mp
+	if ns % 1000000000 < 0:
+		secs -= 1
+	days = secs / 86400
+	rem = secs % 86400
+	if rem < 0:
+		rem += 86400
+		days -= 1
+	z = days + 719468
+	era = (z if z >= 0 else z - 146096) / 146097
+	doe = z - era * 146097
+	yoe = (doe - doe / 1460 + doe / 36524 - doe / 146096) / 365
+	doy = doe - (365 * yoe + yoe / 4 - yoe / 100)
+	mp = (5 * doy + 2) / 153
+	spa.day = <int>(doy - (153 * mp + 2) / 5 + 1)
+	spa.month = <int>(mp + 3 if mp < 10 else mp - 9)
+	spa.year = <int>(yoe + era * 400 + (1 if spa.month <= 2 else 0))
+	spa.hour = <int>(rem / 3600)
+	spa.minute = <int>((rem % 3600) / 60)
+	spa.second = <int>(rem % 60)
+
+
+cdef enum:
+	OUT_ZENITH, OUT_AZIMUTH, OUT_AZIMUTH180, OUT_INCIDENCE,
+	OUT_SUNTRANSIT, OUT_SUNRISE, OUT_SUNSET, OUT_COUNT
+
+OUTPUTS = ('zenith', 'azimuth', 'azimuth180', 'incidence', 'suntransit', 'sunrise', 'sunset')
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int _spa_loop(cspa_py.spa_data *spa, bint use_epoch, long long[:] epoch,
+		int[:] year, int[:] month, int[:] day, int[:] hour, int[:] minute, int[:] second,
+		const double[:] pressure, const double[:] temperature,
+		double *out[OUT_COUNT], Py_ssize_t n) nogil:
+	cdef Py_ssize_t i
+	cdef int failed = 0
+	cdef int k
+	cdef bint ok
+	cdef double values[OUT_COUNT]
+
+	for i in range(n):
+		spa.pressure    = pressure[i]
+		spa.temperature = temperature[i]
+		if use_epoch:
+			if epoch[i] == NAT:
+				ok = 0
+			else:
+				_civil_from_epoch(epoch[i], spa)
+				ok = cspa_py.spa_calculate(spa) == 0
+		else:
+			spa.year   = year[i]
+			spa.month  = month[i]
+			spa.day    = day[i]
+			spa.hour   = hour[i]
+			spa.minute = minute[i]
+			spa.second = second[i]
+			ok = cspa_py.spa_calculate(spa) == 0
+
+		if not ok:
+			failed += 1
+		values[OUT_ZENITH]     = spa.zenith
+		values[OUT_AZIMUTH]    = spa.azimuth
+		values[OUT_AZIMUTH180] = spa.azimuth180
+		values[OUT_INCIDENCE]  = spa.incidence
+		values[OUT_SUNTRANSIT] = spa.suntransit
+		values[OUT_SUNRISE]    = spa.sunrise
+		values[OUT_SUNSET]     = spa.sunset
+		for k in range(OUT_COUNT):
+			if out[k] != NULL:
+				out[k][i] = values[k] if ok else NAN
+
+	return failed
+
+
+def spa_calc_array(year=None,month=None,day=None,hour=None,minute=None,second=None,
+		timezone=0,latitude=0,longitude=0,elevation=0,
+		zenith=None,azimuth=None,azimuth180=None,incidence=None,epoch=None,
+		pressure=820,temperature=11,slope=30,azm_rotation=-10,
+		atmos_refract=0.5667,delta_t=67,delta_ut1=0,
+		suntransit=None,sunrise=None,sunset=None,function=None):
+	'''
+	Batch version of spa_calc for arrays of timestamps
+
+	The time is given either as int32 arrays of date and time fields
+	(year, month, day, hour, minute, second) or as an int64 array of
+	nanoseconds since 1970-01-01 (epoch, e.g. DatetimeIndex.asi8, in which
+	case the fraction of a second is dropped). The loop over timestamps runs
+	in C without the GIL. pressure and temperature may be scalars or arrays
+	of the same length as the time input.
+
+	Only the outputs which are passed in are written: zenith, azimuth,
+	azimuth180, incidence, suntransit, sunrise and sunset are preallocated
+	contiguous float64 arrays of the same length as the time input. function selects
+	the SPA output level (SPA_ZA, SPA_ZA_INC, SPA_ZA_RTS or SPA_ALL); by
+	default it is the cheapest level which covers the requested outputs.
+	Rows which the SPA rejects (and NaT epochs) are set to NaN.
+
+	Returns the number of rejected rows.
+	'''
+	cdef cspa_py.spa_data spa
+	cdef long long[:] epoch_v = None
+	cdef int[:] year_v = None
+	cdef int[:] month_v = None
+	cdef int[:] day_v = None
+	cdef int[:] hour_v = None
+	cdef int[:] minute_v = None
+	cdef int[:] second_v = None
+	cdef const double[:] pressure_v
+	cdef const double[:] temperature_v
+	cdef double[::1] out_v
+	cdef double *out[OUT_COUNT]
+	cdef Py_ssize_t n
+	cdef int failed
+	cdef int k
+
+	if epoch is not None:
+		epoch_v = epoch
+		n = epoch_v.shape[0]
+	else:
+		year_v, month_v, day_v = year, month, day
+		hour_v, minute_v, second_v = hour, minute, second
+		n = year_v.shape[0]
+		for field in (month_v, day_v, hour_v, minute_v, second_v):
+			if field.shape[0] != n:
+				raise Exception('Time component arrays must have the same length')
+
+	outputs = (zenith, azimuth, azimuth180, incidence, suntransit, sunrise, sunset)
+	function = spa_function(function, incidence is not None,
+		suntransit is not None or sunrise is not None or sunset is not None)
+
+	keep = []
+	for k in range(OUT_COUNT):
+		out[k] = NULL
+		if outputs[k] is not None:
+			out_v = outputs[k]
+			if out_v.shape[0] != n:
+				raise Exception('Output arrays must have the same length as the time input')
+			if out_v.shape[0] > 0:
+				out[k] = &out_v[0]
+			keep.append(out_v)
+
+	pressure_v = np.broadcast_to(np.asarray(pressure, dtype=np.float64), (n,))
+	temperature_v = np.broadcast_to(np.asarray(temperature, dtype=np.float64), (n,))
+
+	spa.timezone      = timezone
+	spa.delta_ut1     = delta_ut1
+	spa.delta_t       = delta_t
+	spa.longitude     = longitude
+	spa.latitude      = latitude
+	spa.elevation     = elevation
+	spa.slope         = slope
+	spa.azm_rotation  = azm_rotation
+	spa.atmos_refract = atmos_refract
+	spa.function      = function
+
+	with nogil:
+		failed = _spa_loop(&spa, epoch_v is not None, epoch_v,
+			year_v, month_v, day_v, hour_v, minute_v, second_v,
+			pressure_v, temperature_v, out, n)
+
+	return failed
+
+
+def spa_function(function, want_incidence, want_rts):
+	'''
+	SPA output level for the requested outputs: the cheapest one if function
+	is None, otherwise function after checking that it covers them
+	'''
+	if function is None:
+		if want_incidence and want_rts:
+			return SPA_ALL
+		if want_incidence:
+			return SPA_ZA_INC
+		if want_rts:
+			return SPA_ZA_RTS
+		return SPA_ZA
+	if function not in (SPA_ZA, SPA_ZA_INC, SPA_ZA_RTS, SPA_ALL):
+		raise Exception('function must be one of SPA_ZA, SPA_ZA_INC, SPA_ZA_RTS or SPA_ALL')
+	if want_incidence and function not in (SPA_ZA_INC, SPA_ALL):
+		raise Exception('incidence requires function SPA_ZA_INC or SPA_ALL')
+	if want_rts and function not in (SPA_ZA_RTS, SPA_ALL):
+		raise Exception('suntransit, sunrise and sunset require function SPA_ZA_RTS or SPA_ALL')
+	return function
 	
 
 #spa.year          = 2004
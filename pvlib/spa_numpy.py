@@ -0,0 +1,813 @@
+'''
+spa_numpy
+=========
+
+Vectorized NumPy port of the NREL Solar Position Algorithm (SPA) in
+spa_c_files/spa.c. Every step (Julian dates, Earth periodic terms, nutation,
+aberration, sidereal time and the topocentric parallax and refraction
+corrections) works on whole arrays of timestamps at once, looping only over
+the periodic term tables.
+
+spa_calc_array has the same signature as the compiled spa_py.spa_calc_array,
+so pvl_spa can use either one. This module is used when the Cython extension
+has not been built.
+
+References
+----------
+
+I. Reda and A. Andreas, Solar position algorithm for solar radiation
+applications. Solar Energy, vol. 76, no. 5, pp. 577-589, 2004.
+
+NREL SPA code: http://rredc.nrel.gov/solar/codesandalgorithms/spa/
+
+'''
+
+import numpy as np
+
+SUN_RADIUS=0.26667
+
+NAT=np.iinfo(np.int64).min  #pandas NaT as int64
+
+#Output levels for the SPA "function" input, as in spa.h
+SPA_ZA=0      #zenith and azimuth
+SPA_ZA_INC=1  #zenith, azimuth and surface incidence angle
+SPA_ZA_RTS=2  #zenith, azimuth and sunrise/transit/sunset
+SPA_ALL=3     #all of the above
+
+#Periodic term tables copied from spa.c, as [A,B,C] (Earth) or
+#[X0..X4] / [psi A,psi B,eps C,eps D] (nutation) rows
+
+L_TERMS=[
+    [
+        [175347046.0,0,0],
+        [3341656.0,4.6692568,6283.07585],
+        [34894.0,4.6261,12566.1517],
+        [3497.0,2.7441,5753.3849],
+        [3418.0,2.8289,3.5231],
+        [3136.0,3.6277,77713.7715],
+        [2676.0,4.4181,7860.4194],
+        [2343.0,6.1352,3930.2097],
+        [1324.0,0.7425,11506.7698],
+        [1273.0,2.0371,529.691],
+        [1199.0,1.1096,1577.3435],
+        [990,5.233,5884.927],
+        [902,2.045,26.298],
+        [857,3.508,398.149],
+        [780,1.179,5223.694],
+        [753,2.533,5507.553],
+        [505,4.583,18849.228],
+        [492,4.205,775.523],
+        [357,2.92,0.067],
+        [317,5.849,11790.629],
+        [284,1.899,796.298],
+        [271,0.315,10977.079],
+        [243,0.345,5486.778],
+        [206,4.806,2544.314],
+        [205,1.869,5573.143],
+        [202,2.458,6069.777],
+        [156,0.833,213.299],
+        [132,3.411,2942.463],
+        [126,1.083,20.775],
+        [115,0.645,0.98],
+        [103,0.636,4694.003],
+        [102,0.976,15720.839],
+        [102,4.267,7.114],
+        [99,6.21,2146.17],
+        [98,0.68,155.42],
+        [86,5.98,161000.69],
+        [85,1.3,6275.96],
+        [85,3.67,71430.7],
+        [80,1.81,17260.15],
+        [79,3.04,12036.46],
+        [75,1.76,5088.63],
+        [74,3.5,3154.69],
+        [74,4.68,801.82],
+        [70,0.83,9437.76],
+        [62,3.98,8827.39],
+        [61,1.82,7084.9],
+        [57,2.78,6286.6],
+        [56,4.39,14143.5],
+        [56,3.47,6279.55],
+        [52,0.19,12139.55],
+        [52,1.33,1748.02],
+        [51,0.28,5856.48],
+        [49,0.49,1194.45],
+        [41,5.37,8429.24],
+        [41,2.4,19651.05],
+        [39,6.17,10447.39],
+        [37,6.04,10213.29],
+        [37,2.57,1059.38],
+        [36,1.71,2352.87],
+        [36,1.78,6812.77],
+        [33,0.59,17789.85],
+        [30,0.44,83996.85],
+        [30,2.74,1349.87],
+        [25,3.16,4690.48],
+    ],
+    [
+        [628331966747.0,0,0],
+        [206059.0,2.678235,6283.07585],
+        [4303.0,2.6351,12566.1517],
+        [425.0,1.59,3.523],
+        [119.0,5.796,26.298],
+        [109.0,2.966,1577.344],
+        [93,2.59,18849.23],
+        [72,1.14,529.69],
+        [68,1.87,398.15],
+        [67,4.41,5507.55],
+        [59,2.89,5223.69],
+        [56,2.17,155.42],
+        [45,0.4,796.3],
+        [36,0.47,775.52],
+        [29,2.65,7.11],
+        [21,5.34,0.98],
+        [19,1.85,5486.78],
+        [19,4.97,213.3],
+        [17,2.99,6275.96],
+        [16,0.03,2544.31],
+        [16,1.43,2146.17],
+        [15,1.21,10977.08],
+        [12,2.83,1748.02],
+        [12,3.26,5088.63],
+        [12,5.27,1194.45],
+        [12,2.08,4694],
+        [11,0.77,553.57],
+        [10,1.3,6286.6],
+        [10,4.24,1349.87],
+        [9,2.7,242.73],
+        [9,5.64,951.72],
+        [8,5.3,2352.87],
+        [6,2.65,9437.76],
+        [6,4.67,4690.48],
+    ],
+    [
+        [52919.0,0,0],
+        [8720.0,1.0721,6283.0758],
+        [309.0,0.867,12566.152],
+        [27,0.05,3.52],
+        [16,5.19,26.3],
+        [16,3.68,155.42],
+        [10,0.76,18849.23],
+        [9,2.06,77713.77],
+        [7,0.83,775.52],
+        [5,4.66,1577.34],
+        [4,1.03,7.11],
+        [4,3.44,5573.14],
+        [3,5.14,796.3],
+        [3,6.05,5507.55],
+        [3,1.19,242.73],
+        [3,6.12,529.69],
+        [3,0.31,398.15],
+        [3,2.28,553.57],
+        [2,4.38,5223.69],
+        [2,3.75,0.98],
+    ],
+    [
+        [289.0,5.844,6283.076],
+        [35,0,0],
+        [17,5.49,12566.15],
+        [3,5.2,155.42],
+        [1,4.72,3.52],
+        [1,5.3,18849.23],
+        [1,5.97,242.73],
+    ],
+    [
+        [114.0,3.142,0],
+        [8,4.13,6283.08],
+        [1,3.84,12566.15],
+    ],
+    [
+        [1,3.14,0],
+    ],
+    ]
+
+B_TERMS=[
+    [
+        [280.0,3.199,84334.662],
+        [102.0,5.422,5507.553],
+        [80,3.88,5223.69],
+        [44,3.7,2352.87],
+        [32,4,1577.34],
+    ],
+    [
+        [9,3.9,5507.55],
+        [6,1.73,5223.69],
+    ],
+    ]
+
+R_TERMS=[
+    [
+        [100013989.0,0,0],
+        [1670700.0,3.0984635,6283.07585],
+        [13956.0,3.05525,12566.1517],
+        [3084.0,5.1985,77713.7715],
+        [1628.0,1.1739,5753.3849],
+        [1576.0,2.8469,7860.4194],
+        [925.0,5.453,11506.77],
+        [542.0,4.564,3930.21],
+        [472.0,3.661,5884.927],
+        [346.0,0.964,5507.553],
+        [329.0,5.9,5223.694],
+        [307.0,0.299,5573.143],
+        [243.0,4.273,11790.629],
+        [212.0,5.847,1577.344],
+        [186.0,5.022,10977.079],
+        [175.0,3.012,18849.228],
+        [110.0,5.055,5486.778],
+        [98,0.89,6069.78],
+        [86,5.69,15720.84],
+        [86,1.27,161000.69],
+        [65,0.27,17260.15],
+        [63,0.92,529.69],
+        [57,2.01,83996.85],
+        [56,5.24,71430.7],
+        [49,3.25,2544.31],
+        [47,2.58,775.52],
+        [45,5.54,9437.76],
+        [43,6.01,6275.96],
+        [39,5.36,4694],
+        [38,2.39,8827.39],
+        [37,0.83,19651.05],
+        [37,4.9,12139.55],
+        [36,1.67,12036.46],
+        [35,1.84,2942.46],
+        [33,0.24,7084.9],
+        [32,0.18,5088.63],
+        [32,1.78,398.15],
+        [28,1.21,6286.6],
+        [28,1.9,6279.55],
+        [26,4.59,10447.39],
+    ],
+    [
+        [103019.0,1.10749,6283.07585],
+        [1721.0,1.0644,12566.1517],
+        [702.0,3.142,0],
+        [32,1.02,18849.23],
+        [31,2.84,5507.55],
+        [25,1.32,5223.69],
+        [18,1.42,1577.34],
+        [10,5.91,10977.08],
+        [9,1.42,6275.96],
+        [9,0.27,5486.78],
+    ],
+    [
+        [4359.0,5.7846,6283.0758],
+        [124.0,5.579,12566.152],
+        [12,3.14,0],
+        [9,3.63,77713.77],
+        [6,1.87,5573.14],
+        [3,5.47,18849.23],
+    ],
+    [
+        [145.0,4.273,6283.076],
+        [7,3.92,12566.15],
+    ],
+    [
+        [4,2.56,6283.08],
+    ],
+    ]
+
+Y_TERMS=[
+    [0,0,0,0,1],
+    [-2,0,0,2,2],
+    [0,0,0,2,2],
+    [0,0,0,0,2],
+    [0,1,0,0,0],
+    [0,0,1,0,0],
+    [-2,1,0,2,2],
+    [0,0,0,2,1],
+    [0,0,1,2,2],
+    [-2,-1,0,2,2],
+    [-2,0,1,0,0],
+    [-2,0,0,2,1],
+    [0,0,-1,2,2],
+    [2,0,0,0,0],
+    [0,0,1,0,1],
+    [2,0,-1,2,2],
+    [0,0,-1,0,1],
+    [0,0,1,2,1],
+    [-2,0,2,0,0],
+    [0,0,-2,2,1],
+    [2,0,0,2,2],
+    [0,0,2,2,2],
+    [0,0,2,0,0],
+    [-2,0,1,2,2],
+    [0,0,0,2,0],
+    [-2,0,0,2,0],
+    [0,0,-1,2,1],
+    [0,2,0,0,0],
+    [2,0,-1,0,1],
+    [-2,2,0,2,2],
+    [0,1,0,0,1],
+    [-2,0,1,0,1],
+    [0,-1,0,0,1],
+    [0,0,2,-2,0],
+    [2,0,-1,2,1],
+    [2,0,1,2,2],
+    [0,1,0,2,2],
+    [-2,1,1,0,0],
+    [0,-1,0,2,2],
+    [2,0,0,2,1],
+    [2,0,1,0,0],
+    [-2,0,2,2,2],
+    [-2,0,1,2,1],
+    [2,0,-2,0,1],
+    [2,0,0,0,1],
+    [0,-1,1,0,0],
+    [-2,-1,0,2,1],
+    [-2,0,0,0,1],
+    [0,0,2,2,1],
+    [-2,0,2,0,1],
+    [-2,1,0,2,1],
+    [0,0,1,-2,0],
+    [-1,0,1,0,0],
+    [-2,1,0,0,0],
+    [1,0,0,0,0],
+    [0,0,1,2,0],
+    [0,0,-2,2,2],
+    [-1,-1,1,0,0],
+    [0,1,1,0,0],
+    [0,-1,1,2,2],
+    [2,-1,-1,2,2],
+    [0,0,3,2,2],
+    [2,-1,0,2,2],
+    ]
+
+PE_TERMS=[
+    [-171996,-174.2,92025,8.9],
+    [-13187,-1.6,5736,-3.1],
+    [-2274,-0.2,977,-0.5],
+    [2062,0.2,-895,0.5],
+    [1426,-3.4,54,-0.1],
+    [712,0.1,-7,0],
+    [-517,1.2,224,-0.6],
+    [-386,-0.4,200,0],
+    [-301,0,129,-0.1],
+    [217,-0.5,-95,0.3],
+    [-158,0,0,0],
+    [129,0.1,-70,0],
+    [123,0,-53,0],
+    [63,0,0,0],
+    [63,0.1,-33,0],
+    [-59,0,26,0],
+    [-58,-0.1,32,0],
+    [-51,0,27,0],
+    [48,0,0,0],
+    [46,0,-24,0],
+    [-38,0,16,0],
+    [-31,0,13,0],
+    [29,0,0,0],
+    [29,0,-12,0],
+    [26,0,0,0],
+    [-22,0,0,0],
+    [21,0,-10,0],
+    [17,-0.1,0,0],
+    [16,0,-8,0],
+    [-16,0.1,7,0],
+    [-15,0,9,0],
+    [-13,0,7,0],
+    [-12,0,6,0],
+    [11,0,0,0],
+    [-10,0,5,0],
+    [-8,0,3,0],
+    [7,0,-3,0],
+    [-7,0,0,0],
+    [-7,0,3,0],
+    [-7,0,3,0],
+    [6,0,0,0],
+    [6,0,-3,0],
+    [6,0,-3,0],
+    [-6,0,3,0],
+    [-6,0,3,0],
+    [5,0,0,0],
+    [-5,0,3,0],
+    [-5,0,3,0],
+    [-5,0,3,0],
+    [4,0,0,0],
+    [4,0,0,0],
+    [4,0,0,0],
+    [-4,0,0,0],
+    [-4,0,0,0],
+    [-4,0,0,0],
+    [3,0,0,0],
+    [-3,0,0,0],
+    [-3,0,0,0],
+    [-3,0,0,0],
+    [-3,0,0,0],
+    [-3,0,0,0],
+    [-3,0,0,0],
+    [-3,0,0,0],
+    ]
+
+
+def limit_degrees(degrees):
+    degrees=degrees/360.0
+    return 360.0*(degrees-np.floor(degrees))
+
+
+def limit_degrees180pm(degrees):
+    limited=limit_degrees(degrees)
+    return np.where(limited>180.0,limited-360.0,limited)
+
+
+def limit_degrees180(degrees):
+    degrees=degrees/180.0
+    return 180.0*(degrees-np.floor(degrees))
+
+
+def limit_zero2one(value):
+    return value-np.floor(value)
+
+
+def limit_minutes(minutes):
+    return np.where(minutes < -20.0,minutes + 1440.0,np.where(minutes > 20.0,minutes - 1440.0,minutes))
+
+
+def julian_day(year,month,day,hour,minute,second,dut1=0,tz=0):
+    '''
+    Julian day from arrays of local date and time fields
+    '''
+    year=np.asarray(year,dtype=float)
+    month=np.asarray(month,dtype=float)
+    day_decimal=day + (hour - tz + (minute + (second + dut1)/60.0)/60.0)/24.0
+
+    early=month<3
+    month=np.where(early,month+12,month)
+    year=np.where(early,year-1,year)
+
+    jd=np.trunc(365.25*(year+4716.0)) + np.trunc(30.6001*(month+1)) + day_decimal - 1524.5
+
+    a=np.trunc(year/100)
+    return np.where(jd>2299160.0,jd + (2 - a + np.trunc(a/4)),jd)
+
+
+def julian_day_from_epoch(epoch,dut1=0):
+    '''
+    Julian day from int64 nanoseconds since 1970-01-01 UTC
+    '''
+    return 2440587.5 + (np.asarray(epoch,dtype=float)/1e9 + dut1)/86400.0
+
+
+def earth_values(groups,jme):
+    #sum(A*cos(B+C*jme)) for each group, combined as a polynomial in jme
+    total=0
+    for i in range(len(groups)-1,-1,-1):
+        terms=groups[i]
+        term_sum=0
+        for A,B,C in terms:
+            term_sum=term_sum + A*np.cos(B+C*jme)
+        total=total*jme + term_sum
+    return total/1.0e8
+
+
+def nutation_longitude_and_obliquity(jce):
+    x=[np.polyval([1.0/189474.0, -0.0019142, 445267.11148, 297.85036],jce),
+       np.polyval([-1.0/300000.0, -0.0001603, 35999.05034, 357.52772],jce),
+       np.polyval([1.0/56250.0, 0.0086972, 477198.867398, 134.96298],jce),
+       np.polyval([1.0/327270.0, -0.0036825, 483202.017538, 93.27191],jce),
+       np.polyval([1.0/450000.0, 0.0020708, -1934.136261, 125.04452],jce)]
+
+    sum_psi=0
+    sum_epsilon=0
+    for Y,PE in zip(Y_TERMS,PE_TERMS):
+        xy_term_sum=0
+        for xj,yj in zip(x,Y):
+            if yj!=0:
+                xy_term_sum=xy_term_sum + xj*yj
+        xy_term_sum=np.radians(xy_term_sum)
+        sum_psi=sum_psi + (PE[0] + jce*PE[1])*np.sin(xy_term_sum)
+        sum_epsilon=sum_epsilon + (PE[2] + jce*PE[3])*np.cos(xy_term_sum)
+
+    return sum_psi/36000000.0, sum_epsilon/36000000.0
+
+
+def geocentric_sun(jd,delta_t=67):
+    '''
+    Geocentric sun right ascension and declination
+
+    Parameters
+    ----------
+
+    jd : float or array
+        Julian day (UT)
+
+    delta_t : float
+        Difference between terrestrial time and UT, in seconds
+
+    Returns
+    -------
+
+    geo : dict
+        Intermediate SPA values, named as in the spa_data struct: jc, jce, jme,
+        l, b, r, theta, beta, del_psi, del_epsilon, epsilon, lamda, nu, alpha
+        and delta (all angles in degrees)
+    '''
+    jc=(jd-2451545.0)/36525.0
+    jde=jd+delta_t/86400.0
+    jce=(jde - 2451545.0)/36525.0
+    jme=jce/10.0
+
+    l=limit_degrees(np.degrees(earth_values(L_TERMS,jme)))
+    b=np.degrees(earth_values(B_TERMS,jme))
+    r=earth_values(R_TERMS,jme)
+
+    theta=l + 180.0
+    theta=np.where(theta>=360.0,theta-360.0,theta)
+    beta=-b
+
+    del_psi,del_epsilon=nutation_longitude_and_obliquity(jce)
+
+    u=jme/10.0
+    epsilon0=np.polyval([2.45, 5.79, 27.87, 7.12, -39.05, -249.67, -51.38, 1999.25,
+                         -1.55, -4680.93, 84381.448],u)
+    epsilon=del_epsilon + epsilon0/3600.0
+
+    del_tau=-20.4898 / (3600.0*r)
+    lamda=theta + del_psi + del_tau
+    nu=greenwich_mean_sidereal_time(jd,jc) + del_psi*np.cos(np.radians(epsilon))
+
+    lamda_rad=np.radians(lamda)
+    epsilon_rad=np.radians(epsilon)
+    beta_rad=np.radians(beta)
+    alpha=limit_degrees(np.degrees(np.arctan2(np.sin(lamda_rad)*np.cos(epsilon_rad) -
+                        np.tan(beta_rad)*np.sin(epsilon_rad), np.cos(lamda_rad))))
+    delta=np.degrees(np.arcsin(np.sin(beta_rad)*np.cos(epsilon_rad) +
+                     np.cos(beta_rad)*np.sin(epsilon_rad)*np.sin(lamda_rad)))
+
+    return {'jc':jc,'jce':jce,'jme':jme,'l':l,'b':b,'r':r,'theta':theta,'beta':beta,
+            'del_psi':del_psi,'del_epsilon':del_epsilon,'epsilon':epsilon,
+            'lamda':lamda,'nu':nu,'alpha':alpha,'delta':delta}
+
+
+def greenwich_mean_sidereal_time(jd,jc):
+    return limit_degrees(280.46061837 + 360.98564736629 * (jd - 2451545.0) +
+                         jc*jc*(0.000387933 - jc/38710000.0))
+
+
+def sun_mean_longitude(jme):
+    return limit_degrees(280.4664567 + jme*(360007.6982779 + jme*(0.03032028 +
+                         jme*(1/49931.0 + jme*(-1/15300.0 + jme*(-1/2000000.0))))))
+
+
+def equation_of_time(geo):
+    '''
+    Equation of time in minutes from the output of geocentric_sun
+    '''
+    return limit_minutes(4.0*(sun_mean_longitude(geo['jme']) - 0.0057183 - geo['alpha'] +
+                              geo['del_psi']*np.cos(np.radians(geo['epsilon']))))
+
+
+def topocentric_sun(geo,latitude,longitude,elevation,pressure=820,temperature=11,
+                    atmos_refract=0.5667):
+    '''
+    Topocentric zenith and azimuth from the output of geocentric_sun
+
+    Returns
+    -------
+
+    zenith, azimuth180 : arrays
+        Topocentric zenith (refraction corrected) and azimuth measured from
+        south (-180 to 180, add 180 for azimuth from north), in degrees
+    '''
+    h=limit_degrees(geo['nu'] + longitude - geo['alpha'])
+    xi=8.794 / (3600.0 * geo['r'])
+
+    lat_rad=np.radians(latitude)
+    xi_rad=np.radians(xi)
+    h_rad=np.radians(h)
+    delta_rad=np.radians(geo['delta'])
+    u=np.arctan(0.99664719 * np.tan(lat_rad))
+    y=0.99664719 * np.sin(u) + elevation*np.sin(lat_rad)/6378140.0
+    x=np.cos(u) + elevation*np.cos(lat_rad)/6378140.0
+
+    denom=np.cos(delta_rad) - x*np.sin(xi_rad)*np.cos(h_rad)
+    delta_alpha_rad=np.arctan2(- x*np.sin(xi_rad)*np.sin(h_rad),denom)
+    delta_prime_rad=np.arctan2((np.sin(delta_rad) - y*np.sin(xi_rad))*np.cos(delta_alpha_rad),denom)
+
+    h_prime_rad=h_rad - delta_alpha_rad
+
+    e0=np.degrees(np.arcsin(np.sin(lat_rad)*np.sin(delta_prime_rad) +
+                  np.cos(lat_rad)*np.cos(delta_prime_rad)*np.cos(h_prime_rad)))
+
+    del_e=atmospheric_refraction_correction(pressure,temperature,atmos_refract,e0)
+
+    zenith=90.0 - (e0 + del_e)
+    azimuth180=np.degrees(np.arctan2(np.sin(h_prime_rad),
+                          np.cos(h_prime_rad)*np.sin(lat_rad) - np.tan(delta_prime_rad)*np.cos(lat_rad)))
+
+    return zenith, azimuth180
+
+
+def atmospheric_refraction_correction(pressure,temperature,atmos_refract,e0):
+    '''
+    SPA refraction correction in degrees for the topocentric elevation e0
+    without refraction (zero below the horizon)
+    '''
+    return np.where(e0 >= -1*(SUN_RADIUS + atmos_refract),
+                    (pressure / 1010.0) * (283.0 / (273.0 + temperature)) *
+                    1.02 / (60.0 * np.tan(np.radians(e0 + 10.3/(e0 + 5.11)))),0)
+
+
+def incidence_angle(zenith,azimuth180,azm_rotation,slope):
+    zenith_rad=np.radians(zenith)
+    slope_rad=np.radians(slope)
+    return np.degrees(np.arccos(np.cos(zenith_rad)*np.cos(slope_rad) +
+                      np.sin(slope_rad)*np.sin(zenith_rad)*np.cos(np.radians(azimuth180 - azm_rotation))))
+
+
+def rts_alpha_delta_prime(ad,n):
+    a=ad[1] - ad[0]
+    b=ad[2] - ad[1]
+    a=np.where(abs(a)>=2.0,limit_zero2one(a),a)
+    b=np.where(abs(b)>=2.0,limit_zero2one(b),b)
+    return ad[1] + n * (a + b + (b-a)*n)/2.0
+
+
+def sun_rise_transit_set(jd0,latitude,longitude,delta_t=67,atmos_refract=0.5667,timezone=0):
+    '''
+    Sun transit, sunrise and sunset of the SPA for the days starting at jd0
+
+    Parameters
+    ----------
+
+    jd0 : float or array
+        Julian day at 0h UT of each day
+
+    Returns
+    -------
+
+    suntransit, sunrise, sunset : arrays
+        Local time in fractional hours (timezone hours ahead of UT), or
+        -99999 where the sun does not rise or set that day
+    '''
+    has_rts,fractions=rts_day_fractions(jd0,latitude,longitude,delta_t,atmos_refract,wrap=True)
+    return tuple(np.where(has_rts,24.0*limit_zero2one(dayfrac + timezone/24.0),-99999)
+                 for dayfrac in fractions)
+
+
+def rts_day_fractions(jd0,latitude,longitude,delta_t=67,atmos_refract=0.5667,wrap=False):
+    '''
+    Transit, sunrise and sunset as fractions of the UT day starting at jd0
+
+    The SPA wraps the first estimates of sunrise and sunset into the UT day,
+    so near 0h UT it may find the event of the previous day, or none. With
+    wrap=False they are taken on either side of the transit instead, which
+    may put them outside [0, 1) but always on the right day.
+
+    Returns
+    -------
+
+    has_rts : boolean array
+        False where the sun does not rise or set that day
+
+    fractions : tuple of arrays
+        Transit, sunrise and sunset
+    '''
+    h0_prime=-1*(SUN_RADIUS + atmos_refract)
+    nu=geocentric_sun(jd0,delta_t)['nu']
+
+    alpha=[]
+    delta=[]
+    for day in (-1,0,1):
+        geo=geocentric_sun(jd0+day,0)
+        alpha.append(geo['alpha'])
+        delta.append(geo['delta'])
+
+    lat_rad=np.radians(latitude)
+    m_transit=(alpha[1] - longitude - nu) / 360.0
+    argument=((np.sin(np.radians(h0_prime)) - np.sin(lat_rad)*np.sin(np.radians(delta[1]))) /
+              (np.cos(lat_rad)*np.cos(np.radians(delta[1]))))
+    has_rts=abs(argument)<=1
+    h0=limit_degrees180(np.degrees(np.arccos(np.clip(argument,-1,1))))
+
+    #transit, rise and set
+    m_rts=[limit_zero2one(m_transit),limit_zero2one(m_transit) - h0/360.0,
+           limit_zero2one(m_transit) + h0/360.0]
+    if wrap:
+        m_rts=[limit_zero2one(m) for m in m_rts]
+    h_rts=[]
+    delta_prime=[]
+    h_prime=[]
+    for m in m_rts:
+        n=m + delta_t/86400.0
+        delta_prime.append(rts_alpha_delta_prime(delta,n))
+        h_prime.append(limit_degrees180pm(nu + 360.985647*m + longitude - rts_alpha_delta_prime(alpha,n)))
+        delta_prime_rad=np.radians(delta_prime[-1])
+        h_rts.append(np.degrees(np.arcsin(np.sin(lat_rad)*np.sin(delta_prime_rad) +
+                     np.cos(lat_rad)*np.cos(delta_prime_rad)*np.cos(np.radians(h_prime[-1])))))
+
+    suntransit=m_rts[0] - h_prime[0] / 360.0
+    sunrise,sunset=[m_rts[i] + (h_rts[i] - h0_prime) /
+                    (360.0*np.cos(np.radians(delta_prime[i]))*np.cos(lat_rad)*np.sin(np.radians(h_prime[i])))
+                    for i in (1,2)]
+
+    return has_rts, (suntransit, sunrise, sunset)
+
+
+def spa_function(function,want_incidence,want_rts):
+    '''
+    SPA output level for the requested outputs: the cheapest one if function
+    is None, otherwise function after checking that it covers them
+    '''
+    if function is None:
+        if want_incidence and want_rts:
+            return SPA_ALL
+        if want_incidence:
+            return SPA_ZA_INC
+        if want_rts:
+            return SPA_ZA_RTS
+        return SPA_ZA
+    if not(function in (SPA_ZA,SPA_ZA_INC,SPA_ZA_RTS,SPA_ALL)):
+        raise Exception('function must be one of SPA_ZA, SPA_ZA_INC, SPA_ZA_RTS or SPA_ALL')
+    if want_incidence and not(function in (SPA_ZA_INC,SPA_ALL)):
+        raise Exception('incidence requires function SPA_ZA_INC or SPA_ALL')
+    if want_rts and not(function in (SPA_ZA_RTS,SPA_ALL)):
+        raise Exception('suntransit, sunrise and sunset require function SPA_ZA_RTS or SPA_ALL')
+    return function
+
+
+def spa_calc_array(year=None,month=None,day=None,hour=None,minute=None,second=None,
+        timezone=0,latitude=0,longitude=0,elevation=0,
+        zenith=None,azimuth=None,azimuth180=None,incidence=None,epoch=None,
+        pressure=820,temperature=11,slope=30,azm_rotation=-10,
+        atmos_refract=0.5667,delta_t=67,delta_ut1=0,
+        suntransit=None,sunrise=None,sunset=None,function=None,table=None):
+    '''
+    Batch SPA on arrays of timestamps, same interface as
+    spa_py.spa_calc_array
+
+    The time is given either as arrays of date and time fields (year, month,
+    day, hour, minute, second) or as int64 nanoseconds since 1970-01-01
+    (epoch, e.g. DatetimeIndex.asi8). pressure and temperature may be scalars
+    or arrays of the same length as the time input.
+
+    Only the outputs which are passed in (zenith, azimuth, azimuth180,
+    incidence, suntransit, sunrise, sunset; preallocated float arrays of the
+    same length as the time input) are computed and written. function
+    selects the SPA output level (SPA_ZA, SPA_ZA_INC, SPA_ZA_RTS or SPA_ALL);
+    by default it is the cheapest level which covers the requested outputs.
+    Rows which fail the SPA input checks (and NaT epochs) are set to NaN.
+    Sunrise/transit/sunset are computed once per distinct day.
+
+    If table (a GeocentricTable) is given, the geocentric sun position is
+    interpolated from it instead of calculated.
+
+    Returns the number of rejected rows.
+    '''
+    if epoch is not None:
+        epoch=np.asarray(epoch,dtype=np.int64)
+        valid=epoch!=NAT
+        jd=julian_day_from_epoch(np.where(valid,epoch,0),delta_ut1)
+        jd0=np.floor(jd - delta_ut1/86400.0 - 0.5) + 0.5
+        jd=jd - timezone/24.0
+    else:
+        fields=[np.asarray(f) for f in (year,month,day,hour,minute,second)]
+        if any(f.shape!=fields[0].shape for f in fields):
+            raise Exception('Time component arrays must have the same length')
+        year,month,day,hour,minute,second=fields
+        valid=((year>=-2000) & (year<=6000) & (month>=1) & (month<=12) &
+               (day>=1) & (day<=31) & (hour>=0) & (hour<=24) &
+               (minute>=0) & (minute<=59) & (second>=0) & (second<=59) &
+               ~((hour==24) & ((minute>0) | (second>0))))
+        jd=julian_day(year,month,day,hour,minute,second,delta_ut1,timezone)
+        jd0=julian_day(year,month,day,0,0,0)
+
+    for out in (zenith,azimuth,azimuth180,incidence,suntransit,sunrise,sunset):
+        if out is not None and len(out)!=len(jd):
+            raise Exception('Output arrays must have the same length as the time input')
+
+    want_rts=not(suntransit is None and sunrise is None and sunset is None)
+    function=spa_function(function,incidence is not None,want_rts)
+
+    pressure=np.asarray(pressure,dtype=float)
+    temperature=np.asarray(temperature,dtype=float)
+    valid=(valid & (pressure>=0) & (pressure<=5000) &
+           (temperature>-273) & (temperature<=6000))
+    if ((delta_ut1<=-1) or (delta_ut1>=1) or (abs(delta_t)>8000) or (abs(timezone)>18) or
+        (abs(longitude)>180) or (abs(latitude)>90) or (abs(atmos_refract)>5) or
+        (elevation<-6500000) or
+        (function in (SPA_ZA_INC,SPA_ALL) and ((abs(slope)>360) or (abs(azm_rotation)>360)))):
+        valid=np.zeros(len(jd),dtype=bool)
+
+    if table is None:
+        geo=geocentric_sun(jd,delta_t)
+    else:
+        geo=table.geocentric(np.where(valid,jd,table.start + 2*table.step - delta_t/86400.0),delta_t)
+    zen,az180=topocentric_sun(geo,latitude,longitude,elevation,pressure,temperature,atmos_refract)
+
+    if zenith is not None:
+        zenith[...]=np.where(valid,zen,np.nan)
+    if azimuth is not None:
+        azimuth[...]=np.where(valid,az180 + 180.0,np.nan)
+    if azimuth180 is not None:
+        azimuth180[...]=np.where(valid,az180,np.nan)
+    if incidence is not None:
+        incidence[...]=np.where(valid,incidence_angle(zen,az180,azm_rotation,slope),np.nan)
+    if want_rts:
+        days,inverse=np.unique(jd0,return_inverse=True)
+        rts=sun_rise_transit_set(days,latitude,longitude,delta_t,atmos_refract,timezone)
+        for out,value in zip((suntransit,sunrise,sunset),rts):
+            if out is not None:
+                out[...]=np.where(valid,value[inverse],np.nan)
+
+    return int(len(jd)-np.count_nonzero(valid))
@@ -74,7 +74,7 @@ TMY['SunAz'],TMY['SunEl'],TMY['ApparentSunEl'],TMY['SolarTime'], TMY['SunZen']=p
 #Using NRELS SPA Calculations
 import pvl_spa
 reload (pvl_spa)
-TMY['SunAz_spa'],TMY['SunEl_spa'],TMY['SunZen_spa']=pvl_spa.pvl_spa(Time=TMY.index,Location=meta)
+TMY['SunAz_spa'],TMY['SunEl_spa'],TMY['SunZen_spa'],__=pvl_spa.pvl_spa(Time=TMY.index,Location=meta)
 
 
 
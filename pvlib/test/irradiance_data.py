@@ -0,0 +1,24 @@
+'''
+Daytime irradiance and sun position of the 703165TY.csv TMY file, shared by
+the transposition tests
+'''
+from .. import pvl_ephemeris
+from .. import pvl_extraradiation
+from .. import pvl_relativeairmass
+from .. import tmy
+
+_data={}
+
+def tmy_irradiance(n=None):
+	'''
+	SunZen, SunAz, DHI, DNI, GHI, HExtra and AM of the first n daytime hours
+	(SunZen < 90) of 703165TY.csv, as Series
+	'''
+	if 'TMY' not in _data:
+		TMY,meta=tmy.readtmy3(filename='703165TY.csv')
+		TMY['SunAz'],TMY['SunEl'],TMY['ApparentSunEl'],TMY['SolarTime'],TMY['SunZen']=pvl_ephemeris(Time=TMY.index,Location=meta)
+		TMY['HExtra']=pvl_extraradiation(doy=TMY.index.dayofyear)
+		TMY['AM']=pvl_relativeairmass(z=TMY.SunZen)
+		_data['TMY']=TMY[TMY.SunZen<90]
+	TMY=_data['TMY'][:n]
+	return tuple(TMY[name].copy() for name in ('SunZen','SunAz','DHI','DNI','GHI','HExtra','AM'))
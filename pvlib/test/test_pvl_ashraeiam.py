@@ -12,6 +12,24 @@ def test_proper():
 	#IAM=pvl_ashraeiam.pvl_ashraeiam(.05,40)	
 	#assert(np.size(IAM)==90)
 
+def test_tabulated():
+	theta=np.linspace(-95,95,3801)
+	IAM=pvl_ashraeiam(.05,theta)
+	Table=pvl_ashraeiam(.05,theta,Tabulate=True)
+	assert(np.max(np.abs(Table-IAM)[np.abs(theta)<=80])<1e-7)
+	assert(np.max(np.abs(Table-IAM))<3e-4)
+	assert(np.all(Table[np.abs(theta)>90]==0))
+
+def test_tabulated_series():
+	theta=pd.Series([0.,45,100],index=[3,4,5])
+	IAM=pvl_ashraeiam(.05,theta,Tabulate=True)
+	assert(IAM.index.equals(theta.index))
+	assert(IAM[3]==1 and IAM[5]==0)
+
+@raises(Exception)
+def test_tabulated_vector_parameter():
+	pvl_ashraeiam(np.array([.05,.1]),np.array([10,20]),Tabulate=True)
+
 
 def main():
     unittest.main()
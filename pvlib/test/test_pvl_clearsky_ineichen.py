@@ -0,0 +1,53 @@
+from nose.tools import *
+import numpy as np
+import pandas as pd
+from .. import pvl_clearsky_ineichen
+from .. import pvl_extraradiation
+from .. import pvl_relativeairmass
+from .. import pvl_absoluteairmass
+from .. import pvl_alt2pres
+from .. import pvl_tools
+from ..pvl_solargeometry import SolarGeometry
+
+Location=pvl_tools.repack({'latitude':35.05,'longitude':-106.54,'altitude':1619,'TZ':-7})
+Time=pd.date_range('20130101',periods=24*30,freq='H')
+ApparentZenith=pd.Series(np.linspace(0,89,len(Time)),index=Time)
+
+def test_altitude_correction():
+	GHI,DNI,DHI,BncI=pvl_clearsky_ineichen(Time,Location,LinkeTurbidity=3,ApparentZenith=ApparentZenith)
+	assert(np.all(np.isfinite(BncI)))
+	assert(1000<GHI[0]<1300)
+	assert(900<DNI[0]<1100)
+	assert(np.all(DHI>=0))
+
+def test_precomputed_inputs():
+	GHI,DNI,DHI,BncI=pvl_clearsky_ineichen(Time,Location,LinkeTurbidity=3,ApparentZenith=ApparentZenith)
+	HExtra=pd.Series(pvl_extraradiation(Time.dayofyear),index=Time)
+	AM=pvl_absoluteairmass(pvl_relativeairmass(ApparentZenith,model='kastenyoung1989'),pvl_alt2pres(Location.altitude))
+	Sun=SolarGeometry(ApparentZenith)
+	GHI2,DNI2,DHI2,BncI2=pvl_clearsky_ineichen(Time,Location,LinkeTurbidity=3,ApparentZenith=Sun,
+	                                           HExtra=HExtra,AMabsolute=AM)
+	assert(np.allclose(GHI,GHI2))
+	assert(np.allclose(DNI,DNI2))
+	assert(np.allclose(DHI,DHI2))
+	assert(np.allclose(BncI,BncI2))
+
+def test_precomputed_hextra_is_used():
+	GHI,DNI,DHI,BncI=pvl_clearsky_ineichen(Time,Location,LinkeTurbidity=3,ApparentZenith=ApparentZenith,HExtra=1000)
+	GHI2,DNI2,DHI2,BncI2=pvl_clearsky_ineichen(Time,Location,LinkeTurbidity=3,ApparentZenith=ApparentZenith,HExtra=2000)
+	assert(np.allclose(2*GHI,GHI2))
+	assert(np.allclose(2*BncI,BncI2))
+
+def test_scalar_inputs():
+	GHI,DNI,DHI,BncI=pvl_clearsky_ineichen(Time,Location,LinkeTurbidity=3.,ApparentZenith=30.,
+	                                       HExtra=1367.,AMabsolute=1.2)
+	assert(np.ndim(GHI)==0)
+	assert(0<GHI<1367)
+	assert(0<DNI<=BncI)
+	assert(DHI>=0)
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
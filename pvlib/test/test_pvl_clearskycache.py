@@ -0,0 +1,87 @@
+from nose.tools import *
+import numpy as np
+import pandas as pd
+import shutil
+import tempfile
+from .. import ClearSkyCache
+from .. import pvl_clearsky_ineichen
+from .. import pvl_clearsky_haurwitz
+from .. import pvl_ephemeris
+from .. import pvl_alt2pres
+from .. import pvl_tools
+
+Location={'latitude':35.05,'longitude':-106.54,'altitude':1619,'TZ':-7}
+
+def expected(Time):
+	__,__,ApparentSunEl,__,__=pvl_ephemeris(Time,Location,pvl_alt2pres(Location['altitude']))
+	return pvl_clearsky_ineichen(Time,pvl_tools.repack(Location),LinkeTurbidity=3,ApparentZenith=90-ApparentSunEl)
+
+def test_window():
+	Time=pd.date_range('20130610 06:00',periods=48,freq='H')
+	cache=ClearSkyCache()
+	result=cache.clearsky(Time,Location,LinkeTurbidity=3)
+	assert(len(result)==4)
+	for cached,value in zip(result,expected(Time)):
+		assert(cached.index.equals(Time))
+		assert(np.allclose(cached,value))
+	assert(result[0].name=='ClearSkyGHI')
+
+def test_reuse_and_years():
+	cache=ClearSkyCache()
+	cache.clearsky(pd.date_range('20130301',periods=10,freq='H'),Location,LinkeTurbidity=3)
+	cache.clearsky(pd.date_range('20130901',periods=10,freq='H'),Location,LinkeTurbidity=3)
+	assert(cache.misses==1 and cache.hits==1)
+
+	Time=pd.date_range('20131231 20:00',periods=8,freq='H')
+	GHI,DNI,DHI,BncI=cache.clearsky(Time,Location,LinkeTurbidity=3)
+	assert(cache.misses==2 and cache.hits==2)
+	assert(np.allclose(GHI,expected(Time)[0]))
+
+	#other turbidity, step and site are other profiles
+	cache.clearsky(Time,Location,LinkeTurbidity=4)
+	cache.clearsky(Time,Location,LinkeTurbidity=3,Step='30min')
+	cache.clearsky(Time,dict(Location,latitude=36),LinkeTurbidity=3)
+	assert(cache.misses==8)
+
+def test_timezone():
+	Time=pd.date_range('20130610 06:00',periods=24,freq='15min',tz='America/Denver')
+	cache=ClearSkyCache()
+	GHI,DNI,DHI,BncI=cache.clearsky(Time,Location,LinkeTurbidity=3)
+	assert(GHI.index.equals(Time))
+	assert(np.allclose(GHI,expected(Time)[0]))
+
+def test_haurwitz():
+	Time=pd.date_range('20130610',periods=24,freq='H')
+	cache=ClearSkyCache()
+	GHI=cache.clearsky(Time,Location,Model='haurwitz')
+	__,__,ApparentSunEl,__,__=pvl_ephemeris(Time,Location,pvl_alt2pres(Location['altitude']))
+	assert(isinstance(GHI,pd.Series))
+	assert(np.allclose(GHI,pvl_clearsky_haurwitz(90-ApparentSunEl)))
+
+def test_disk_tier():
+	directory=tempfile.mkdtemp()
+	try:
+		Time=pd.date_range('20130610',periods=24,freq='H')
+		first=ClearSkyCache(directory=directory).clearsky(Time,Location,LinkeTurbidity=3)
+		cache=ClearSkyCache(directory=directory)
+		second=cache.clearsky(Time,Location,LinkeTurbidity=3)
+		assert(cache.disk_hits==1 and cache.misses==0)
+		assert(np.allclose(first[1],second[1]))
+	finally:
+		shutil.rmtree(directory)
+
+@raises(Exception)
+def test_off_grid():
+	Time=pd.date_range('20130610 00:30',periods=24,freq='H')
+	ClearSkyCache().clearsky(Time,Location,LinkeTurbidity=3,Step='1H')
+
+@raises(Exception)
+def test_no_step():
+	Time=pd.DatetimeIndex(['20130610 00:00','20130610 02:00'])
+	ClearSkyCache().clearsky(Time,Location,LinkeTurbidity=3)
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
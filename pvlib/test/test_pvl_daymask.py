@@ -0,0 +1,66 @@
+from nose.tools import *
+import numpy as np
+import pandas as pd
+from .. import DayMask
+from .. import SolarGeometry
+from .. import pvl_spa
+from .. import pvl_perez
+
+Location={'latitude':35.05,'longitude':-106.54,'altitude':1619,'TZ':-7}
+
+def test_pack_scatter_round_trip():
+	Time=pd.date_range('20130101',periods=6,freq='H')
+	mask=DayMask(pd.Series([False,True,True,False,True,False],index=Time))
+	assert(len(mask)==3)
+	values=pd.Series(np.arange(6.),index=Time)
+	frame=pd.DataFrame({'a':np.arange(6.),'b':-np.arange(6.)},index=Time)
+	pvalues,pframe,parray,scalar=mask.pack(values,frame,np.arange(6.),2.)
+	assert(list(pvalues.index)==list(mask.day_index))
+	assert(np.array_equal(parray,[1,2,4]))
+	assert(scalar==2.)
+	full=mask.scatter(pvalues,fill=0)
+	assert(np.array_equal(full,[0,1,2,0,4,0]))
+	assert(full.index.equals(Time))
+	fframe=mask.scatter(pframe)
+	assert(np.array_equal(fframe.b.values[mask.mask],[-1,-2,-4]))
+	assert(fframe.a.isnull().sum()==3)
+	out1,out2=mask.scatter((parray,parray*2),fill=-1)
+	assert(np.array_equal(out2,[-1,2,4,-1,8,-1]))
+
+@raises(Exception)
+def test_wrong_length():
+	DayMask(np.ones(3,dtype=bool),pd.date_range('20130101',periods=6,freq='H'))
+
+def test_suntimes_match_zenith():
+	Time=pd.date_range('20130101',periods=8760,freq='H')
+	SunAz,SunEl,Zenith,__=pvl_spa(Time,Location)
+	fromzenith=DayMask.from_zenith(Zenith)
+	fromsuntimes=DayMask.from_suntimes(Time,Location)
+	#sunrise and sunset are defined for the sun's upper limb at the standard
+	#refraction, so they only add rows where the sun is just below the horizon
+	assert(np.all(fromsuntimes.mask[fromzenith.mask]))
+	extra=fromsuntimes.mask & ~fromzenith.mask
+	assert(np.all(SunEl[extra]>-1))
+
+def test_packed_model_chain():
+	Time=pd.date_range('20130601',periods=72,freq='H')
+	SunAz,SunEl,Zenith,__=pvl_spa(Time,Location)
+	Sun=SolarGeometry(Zenith,SunAz+180)
+	DNI=pd.Series(800.,index=Time)
+	DHI=pd.Series(100.,index=Time)
+	HExtra=pd.Series(1367.,index=Time)
+	AM=1/np.cos(np.radians(np.minimum(Zenith,89)))
+	full=pvl_perez(30,180,DHI,DNI,HExtra,Sun,None,AM)
+
+	mask=DayMask.from_zenith(Sun)
+	pSun,pDHI,pDNI,pHExtra,pAM=mask.pack(Sun,DHI,DNI,HExtra,AM)
+	assert(isinstance(pSun,SolarGeometry))
+	packed=mask.scatter(pvl_perez(30,180,pDHI,pDNI,pHExtra,pSun,None,pAM),fill=0)
+	assert(np.allclose(packed[mask.mask],full[mask.mask]))
+	assert(np.all(packed[~mask.mask]==0))
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,50 @@
-
 from nose.tools import *
 import numpy as np
 import pandas as pd 
 from .. import pvl_disc
+from ..pvl_disc import disc
 
 def test_proper():
-	assert(1)
-	
+	Time=pd.date_range('20130601 06:00',periods=5,freq='H')
+	GHI=pd.Series([0.,200,500,800,900],index=Time)
+	SunZen=pd.Series([95.,70,50,30,20],index=Time)
+	DFOut=pvl_disc(GHI,SunZen,Time)
+	assert(list(DFOut.columns)==['DNI_gen_DISC','Kt_gen_DISC','AM','Ztemp'])
+	assert(DFOut.index.equals(Time))
+	assert(DFOut['DNI_gen_DISC'][0]==0)
+	assert(np.all(np.isfinite(DFOut['DNI_gen_DISC'])))
+	assert(np.all(DFOut['DNI_gen_DISC']>=0))
+	assert(DFOut['DNI_gen_DISC'][4]>DFOut['DNI_gen_DISC'][1])
+
+def test_low_clearness():
+	#Kt <= 0.6 uses the second set of regression coefficients
+	DFOut=pvl_disc(pd.Series([300.]),pd.Series([30.]),pd.DatetimeIndex(['2013-06-01 12:00']))
+	assert(DFOut['Kt_gen_DISC'][0]<0.6)
+	assert(0<DFOut['DNI_gen_DISC'][0]<500)
+
+def test_pressure():
+	Time=pd.date_range('20130601 06:00',periods=3,freq='H')
+	GHI=pd.Series([400.,700,900],index=Time)
+	SunZen=pd.Series([60.,40,20],index=Time)
+	Sea=pvl_disc(GHI,SunZen,Time)
+	High=pvl_disc(GHI,SunZen,Time,pressure=pd.Series([80000.,80000,70000],index=Time))
+	assert(np.allclose(High['AM']/Sea['AM'],[80000/101325.,80000/101325.,70000/101325.]))
+	assert(np.all(High['DNI_gen_DISC']!=Sea['DNI_gen_DISC']))
+
+def test_kernel():
+	DNI,Kt,AM,Ztemp=disc(np.array([0.,500,600]),np.array([30.,30,88]),152,101325)
+	assert(DNI[0]==0 and DNI[2]==0)
+	assert(Ztemp[2]==87)
+	#Missing data stays missing
+	DNI,Kt,AM,Ztemp=disc(np.array([np.nan,600,700,700]),np.array([30.,np.nan,30,88]),152,
+	                     np.array([101325.,101325,101325,np.nan]))
+	assert(np.all(np.isnan(DNI[[0,1,3]])))
+	assert(DNI[2]>0)
+	DFOut=pvl_disc(pd.Series([500.]),pd.Series([30.]),pd.DatetimeIndex(['2013-06-01 12:00']))
+	assert(abs(DFOut['DNI_gen_DISC'][0]-DNI[1])<1e-9)
 
 def main():
     unittest.main()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
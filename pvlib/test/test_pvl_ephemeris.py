@@ -9,12 +9,27 @@ import os
 from .. import pvl_ephemeris
 from .. import tmy
 from .. import pvl_makelocationstruct
+from ..pvl_ephemeris import refraction, eccentric_anomaly
 
 def test_inputs():
 	TMY,meta=tmy.readtmy3(filename='703165TY.csv')
 
 	DFout=pvl_ephemeris(Time=TMY.index,Location=meta)
 	assert(1)
+def test_refraction_branches():
+	Elevation=np.array([-2,-0.8,0,3,30,89])
+	Refract=refraction(Elevation)
+	assert(Refract[0]==0 and Refract[-1]==0)
+	assert(np.allclose(Refract[1],-20.774/np.tan(np.radians(-0.8))))
+	assert(np.allclose(Refract[2],1735))
+	TanEl=np.tan(np.radians(30))
+	assert(np.allclose(Refract[4],58.1/TanEl-0.07/TanEl**3+8.6e-05/TanEl**5))
+
+def test_eccentric_anomaly():
+	MeanAnom=np.linspace(0,360,50)
+	E=eccentric_anomaly(MeanAnom,0.0167)
+	assert(np.allclose(E,MeanAnom+np.degrees(0.0167)*np.sin(np.radians(E)),atol=1e-8))
+
 def main():
     unittest.main()
 
@@ -0,0 +1,59 @@
+from nose.tools import *
+import numpy as np
+import pandas as pd
+import os
+import shutil
+import tempfile
+from .. import GeocentricTable
+from .. import pvl_spa
+from .. import pvl_multisitespa
+from .. import SPA_ZA_INC
+from .. import spa_numpy
+
+Location={'latitude':35.05,'longitude':-106.54,'altitude':1619,'TZ':-7}
+
+def setup():
+	global directory, table
+	directory=tempfile.mkdtemp()
+	table=GeocentricTable.build(os.path.join(directory,'geo'),2012,2014)
+
+def teardown():
+	shutil.rmtree(directory)
+
+def test_matches_spa():
+	Time=pd.date_range('20121231 20:00',periods=8000,freq='97T',tz='US/Mountain')
+	Pressure=np.linspace(700,1000,len(Time))
+	SunAz,SunEl,Zenith,__=pvl_spa(Time,Location,Pressure=Pressure)
+	TSunAz,TSunEl,TZenith,__=pvl_spa(Time,Location,Pressure=Pressure,Table=table)
+	assert(np.allclose(Zenith,TZenith,rtol=0,atol=1e-8))
+	assert(np.allclose(SunAz,TSunAz,rtol=0,atol=1e-6))
+
+def test_incidence():
+	Time=pd.date_range('20130101',periods=100,freq='H')
+	full=pvl_spa(Time,Location,Function=SPA_ZA_INC)[3]
+	interpolated=pvl_spa(Time,Location,Function=SPA_ZA_INC,Table=table)[3]
+	assert(np.allclose(full.incidence,interpolated.incidence,rtol=0,atol=1e-6))
+
+def test_equation_of_time():
+	jd=np.linspace(table.start+1,table.end-1,1000)
+	geo=spa_numpy.geocentric_sun(jd)
+	assert(np.allclose(table.geocentric(jd)['eot'],spa_numpy.equation_of_time(geo),rtol=0,atol=1e-8))
+
+def test_reopen_and_multisite():
+	reopened=GeocentricTable(os.path.join(directory,'geo'))
+	assert(reopened.start==table.start and reopened.step==table.step)
+	assert(isinstance(reopened.data,np.memmap))
+	Time=pd.date_range('20130601',periods=48,freq='H')
+	full=pvl_multisitespa(Time,[35.05,-33.9],[-106.54,151.2])[2]
+	interpolated=pvl_multisitespa(Time,[35.05,-33.9],[-106.54,151.2],Table=reopened)[2]
+	assert(np.allclose(full,interpolated,rtol=0,atol=1e-8))
+
+@raises(Exception)
+def test_out_of_range():
+	pvl_spa(pd.date_range('20150301',periods=10,freq='H'),Location,Table=table)
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
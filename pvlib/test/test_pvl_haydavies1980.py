@@ -6,6 +6,7 @@ from .. import pvl_ephemeris
 from .. import pvl_extraradiation 
 from .. import pvl_relativeairmass 
 from .. import pvl_haydavies1980 
+from .. import pvl_skydiffuse
 from .. import tmy
 import os
 def test():
@@ -32,6 +33,10 @@ def test():
 
 	assert(np.size(TMY['In_Plane_SkyDiffuse'])==np.size(TMY['SunZen']))
 
+	expected=pvl_skydiffuse(meta['SurfTilt'],meta['SurfAz'],TMY.DHI,TMY.SunZen,TMY.SunAz,
+	                        DNI=TMY.DNI,HExtra=TMY.HExtra,Model='haydavies')
+	assert(np.allclose(TMY['In_Plane_SkyDiffuse'],expected.iloc[0]))
+
 def test_scalar():
 	
 	SurfTilt=30
@@ -0,0 +1,59 @@
+from nose.tools import *
+import numpy as np
+import pandas as pd
+from .. import pvl_interpsolarposition
+from .. import pvl_spa
+from .. import pvl_ephemeris
+
+def make_data(freq='T',tz=None):
+	Time=pd.date_range('20130620',periods=2*1440,freq=freq,tz=tz)
+	Location={'latitude':35.05,'longitude':-106.54,'altitude':1619,'TZ':-7}
+	return Time,Location
+
+def angle(zenith1,azimuth1,zenith2,azimuth2):
+	zenith1,azimuth1,zenith2,azimuth2=[np.radians(np.asarray(x)) for x in (zenith1,azimuth1,zenith2,azimuth2)]
+	cosangle=np.cos(zenith1)*np.cos(zenith2)+np.sin(zenith1)*np.sin(zenith2)*np.cos(azimuth1-azimuth2)
+	return np.degrees(np.arccos(np.clip(cosangle,-1,1)))
+
+def test_spa():
+	Time,Location=make_data()
+	Pressure=np.linspace(800,840,len(Time))
+	SunAz,SunEl,Zenith,__=pvl_interpsolarposition(Time,Location,MaxError=0.001,Pressure=Pressure)
+	ExactAz,ExactEl,ExactZenith,__=pvl_spa(Time,Location,Pressure=Pressure)
+	assert(SunAz.index.equals(Time))
+	#Away from the step of the refraction correction below the horizon
+	true=pvl_spa(Time,Location,Pressure=0)[1]
+	away=abs(true+0.8334)>0.01
+	assert(np.max(angle(Zenith,SunAz,ExactZenith,ExactAz)[away])<0.001)
+
+def test_ephemeris():
+	Time,Location=make_data(tz='US/Mountain')
+	Interp=pvl_interpsolarposition(Time,Location,Algorithm='ephemeris',MaxError=0.001)
+	Exact=pvl_ephemeris(Time,Location)
+	assert(len(Interp)==len(Exact))
+	assert(np.max(angle(90-Interp[1],Interp[0],90-Exact[1],Exact[0]))<0.001)
+	assert(np.allclose(Interp[3],Exact[3]))
+
+def test_sparse_timestamps():
+	#Hourly data: calculated directly
+	Time,Location=make_data(freq='H')
+	Interp=pvl_interpsolarposition(Time,Location)
+	Exact=pvl_spa(Time,Location)
+	for a,b in zip(Interp,Exact):
+		assert(np.allclose(a,b))
+
+@raises(Exception)
+def test_kwargs():
+	Time,Location=make_data()
+	pvl_interpsolarposition(Time,Location,Algorithm='ephemeris',Pressure=820)
+
+@raises(Exception)
+def test_maxerror():
+	Time,Location=make_data()
+	pvl_interpsolarposition(Time,Location,MaxError=0)
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
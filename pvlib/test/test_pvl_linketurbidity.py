@@ -0,0 +1,147 @@
+from nose.tools import *
+import numpy as np
+import pandas as pd
+import importlib
+import os
+import shutil
+import tempfile
+import scipy.io
+from .. import pvl_linketurbidity
+from ..pvl_linketurbidity import linke_turbidity_table, monthly_linke_turbidity
+from .. import convert_linke_turbidity
+from .. import pvl_clearsky_ineichen
+from .. import pvl_tools
+
+#the module, to point the shared climatology at a synthetic one (the package
+#attribute pvl_linketurbidity is the function)
+linke=importlib.import_module('pvlib.pvl_linketurbidity')
+
+Location=pvl_tools.repack({'latitude':35.05,'longitude':-106.54,'altitude':1619,'TZ':-7})
+
+def setup():
+	global directory, default_file
+	directory=tempfile.mkdtemp()
+	#Small synthetic climatology: 20*TL = 40 + month + 12*((row + column) % 5)
+	rows,columns,months=np.meshgrid(np.arange(19),np.arange(37),np.arange(12),indexing='ij')
+	data=(40 + months + 12*((rows + columns) % 5)).astype(np.uint8)
+	scipy.io.savemat(os.path.join(directory,'LinkeTurbidities.mat'),{'LinkeTurbidity':data})
+	default_file=linke.LINKE_TURBIDITY_FILE
+	linke.LINKE_TURBIDITY_FILE=os.path.join(directory,'LinkeTurbidities.npy')
+	linke._table=None
+
+def teardown():
+	linke.LINKE_TURBIDITY_FILE=default_file
+	linke._table=None
+	shutil.rmtree(directory)
+
+def expected(row,column):
+	return (40 + np.arange(12) + 12*((row + column) % 5))/20.0
+
+def test_convert_and_lookup():
+	filename=os.path.join(directory,'converted.npy')
+	convert_linke_turbidity(os.path.join(directory,'LinkeTurbidities.mat'),filename)
+	table=linke_turbidity_table(filename)
+	assert(isinstance(table,np.memmap))
+	assert(table.dtype==np.uint8 and table.shape==(19,37,12))
+	assert(np.allclose(monthly_linke_turbidity(90,-180,table),expected(0,0)))
+	assert(np.allclose(monthly_linke_turbidity(-90,180,table),expected(18,36)))
+	TL=monthly_linke_turbidity([35.05,-33.9],[-106.54,151.2],table)
+	assert(TL.shape==(2,12))
+	assert(np.allclose(TL[0],expected(5,7)))
+	assert(np.allclose(TL[1],expected(12,33)))
+
+def test_shared_table():
+	#converted from the .mat file on first use, then reused
+	assert(linke_turbidity_table() is linke_turbidity_table())
+	assert(os.path.exists(linke.LINKE_TURBIDITY_FILE))
+
+def read_only_table(workdir):
+	#shared table with LINKE_TURBIDITY_FILE in a directory which cannot be
+	#written, and LinkeTurbidities.mat in the working directory workdir
+	shutil.copy(os.path.join(directory,'LinkeTurbidities.mat'),workdir)
+	cwd,shared=os.getcwd(),linke.LINKE_TURBIDITY_FILE
+	try:
+		os.chdir(workdir)
+		linke.LINKE_TURBIDITY_FILE=os.path.join(directory,'missing','LinkeTurbidities.npy')
+		linke._table=None
+		return linke_turbidity_table()
+	finally:
+		os.chdir(cwd)
+		linke.LINKE_TURBIDITY_FILE=shared
+		linke._table=None
+
+def test_read_only_install():
+	#converted next to the .mat instead
+	workdir=os.path.join(directory,'work')
+	os.mkdir(workdir)
+	table=read_only_table(workdir)
+	assert(isinstance(table,np.memmap))
+	assert(np.allclose(monthly_linke_turbidity(35.05,-106.54,table),expected(5,7)))
+	assert(os.path.isfile(os.path.join(workdir,'LinkeTurbidities.npy')))
+
+def test_read_only_working_directory():
+	#nowhere to write the .npy: the .mat is read into memory
+	workdir=os.path.join(directory,'readonly')
+	os.makedirs(os.path.join(workdir,'LinkeTurbidities.npy'))
+	table=read_only_table(workdir)
+	assert(not(isinstance(table,np.memmap)))
+	assert(not(table.flags.writeable))
+	assert(np.allclose(monthly_linke_turbidity(35.05,-106.54,table),expected(5,7)))
+	assert(sorted(os.listdir(workdir))==['LinkeTurbidities.mat','LinkeTurbidities.npy'])
+
+def test_ineichen_default_turbidity():
+	Time=pd.date_range('20130101',periods=24*365,freq='H')
+	ApparentZenith=pd.Series(np.linspace(0,89,len(Time)),index=Time)
+	GHI,DNI,DHI,BncI=pvl_clearsky_ineichen(Time,Location,ApparentZenith=ApparentZenith)
+	TL=pd.Series(expected(5,7)[Time.month-1],index=Time)
+	GHI_TL,DNI_TL,DHI_TL,BncI_TL=pvl_clearsky_ineichen(Time,Location,LinkeTurbidity=TL,ApparentZenith=ApparentZenith)
+	assert(np.allclose(GHI,GHI_TL))
+	assert(np.allclose(BncI,BncI_TL))
+
+def test_multisite_monthly():
+	Time=pd.date_range('20130101',periods=365,freq='D')
+	Latitude=pd.Series([35.05,-33.9,90],index=['abq','syd','pole'])
+	Longitude=[-106.54,151.2,-180]
+	TL=pvl_linketurbidity(Time,Latitude,Longitude,Interpolate=False)
+	assert(TL.shape==(365,3))
+	assert(list(TL.columns)==['abq','syd','pole'])
+	assert(np.allclose(TL['abq'],expected(5,7)[Time.month-1]))
+	assert(np.allclose(TL['syd'],expected(12,33)[Time.month-1]))
+	assert(np.allclose(TL['pole'],expected(0,0)[Time.month-1]))
+
+def test_interpolation():
+	Time=pd.date_range('20120101',periods=366*24,freq='H')
+	TL=pvl_linketurbidity(Time,[35.05,-33.9],[-106.54,151.2])
+	assert(TL.shape==(len(Time),2))
+	monthly=expected(5,7)
+	#monthly values in the middle of the months (leap year)
+	assert(np.allclose(TL.loc['20120116 12:00',0],monthly[0]))
+	assert(np.allclose(TL.loc['20120215 12:00',0],monthly[1]))
+	assert(np.allclose(TL.loc['20120716 12:00',0],monthly[6]))
+	#linear in between, and across the new year
+	assert(np.allclose(TL.loc['20120201 00:00',0],monthly[0] + (monthly[1]-monthly[0])*15.5/30))
+	assert(np.allclose(TL.loc['20120101 00:00',0],monthly[11] + (monthly[0]-monthly[11])*15.5/31))
+	assert(np.allclose(TL.loc['20121231 23:00',0],monthly[11] + (monthly[0]-monthly[11])*15.5/31 - (monthly[0]-monthly[11])/(24*31.0)))
+	assert(np.all(np.abs(np.diff(TL[1]))<0.01))
+
+def test_interpolation_timezone():
+	Time=pd.date_range('20130716 12:00',periods=3,freq='H',tz='America/Denver')
+	TL=pvl_linketurbidity(Time,35.05,-106.54)
+	assert(np.allclose(TL[0][0],expected(5,7)[6]))
+
+def test_interpolation_midnight_dst():
+	#Sao Paulo clocks went from 2013-10-20 00:00 to 01:00
+	Time=pd.date_range('20131019 12:00',periods=48,freq='H',tz='America/Sao_Paulo')
+	TL=pvl_linketurbidity(Time,-23.55,-46.63)
+	local=pvl_linketurbidity(Time.tz_localize(None),-23.55,-46.63)
+	assert(np.allclose(TL,local))
+
+@raises(Exception)
+def test_bad_latitude():
+	monthly_linke_turbidity(95,0)
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+from nose.tools import *
+import numpy as np
+import pandas as pd
+from .. import pvl_multisitespa
+from .. import pvl_spa
+
+Sites=pd.DataFrame({'latitude':[35.05,-33.9,69.6,89.9],
+                    'longitude':[-106.54,151.2,19.,-180.],
+                    'altitude':[1619.,0.,10.,3000.]},index=['abq','syd','tro','np'])
+
+def check_sites(Time,TZ=-7,**kwargs):
+	SunAz,SunEl,Zenith=pvl_multisitespa(Time,Sites.latitude,Sites.longitude,Sites.altitude,TZ=TZ,**kwargs)
+	assert(SunAz.shape==(len(Time),len(Sites)))
+	assert(list(Zenith.columns)==list(Sites.index))
+	for name,site in Sites.iterrows():
+		Location={'latitude':site.latitude,'longitude':site.longitude,'altitude':site.altitude,'TZ':TZ}
+		Az,El,Zen,__=pvl_spa(Time,Location,**kwargs)
+		assert(np.allclose(SunAz[name],Az,atol=1e-8))
+		assert(np.allclose(SunEl[name],El,atol=1e-8))
+		assert(np.allclose(Zenith[name],Zen,atol=1e-8))
+
+def test_matches_pvl_spa():
+	check_sites(pd.date_range('20130101',periods=8760,freq='H'))
+
+def test_positive_timezone():
+	check_sites(pd.date_range('20130621',periods=48,freq='H'),TZ=1)
+	check_sites(pd.date_range('20130621',periods=48,freq='H'),TZ=9.5)
+
+def test_timezone_aware():
+	check_sites(pd.date_range('20130601',periods=1000,freq='7T',tz='US/Mountain'))
+
+def test_vector_pressure():
+	Time=pd.date_range('20130301',periods=48,freq='H')
+	check_sites(Time,Pressure=np.linspace(700,1000,48),Temperature=np.linspace(-10,30,48))
+
+def test_site_pressure():
+	Time=pd.date_range('20130301',periods=48,freq='H')
+	Pressure=np.array([[820.,1010.]])
+	SunAz,SunEl,Zenith=pvl_multisitespa(Time,[35.05,35.05],[-106.54,-106.54],Pressure=Pressure)
+	low,__,__=pvl_multisitespa(Time,35.05,-106.54,Pressure=820)
+	assert(np.allclose(SunAz[0],low[0]))
+	assert(np.all(SunEl[1]>=SunEl[0]))
+
+@raises(Exception)
+def test_bad_latitude():
+	pvl_multisitespa(pd.date_range('20130101',periods=3,freq='H'),[30,95],[0,0])
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+from nose.tools import *
+import numpy as np
+from .. import pvl_perez
+from ..pvl_perez import perez_skydiffuse, GetPerezCoefficients
+from .. import pvl_tools
+from ..pvl_solargeometry import SolarGeometry, SurfaceGeometry
+from .irradiance_data import tmy_irradiance
+
+def make_data():
+	SunZen,SunAz,DHI,DNI,GHI,HExtra,AM=tmy_irradiance()
+	return SunZen,SunAz,DHI,DNI,HExtra,AM
+
+def test_kernel_value():
+	#zenith 0: clearness (100+100)/100 = 2 is in the fifth bin
+	F1c,F2c=GetPerezCoefficients('allsitescomposite1990')
+	F1=F1c[4,0] + F1c[4,1]*0.1
+	F2=F2c[4,0] + F2c[4,1]*0.1
+	expected=100*(0.5*(1-F1)*1.5 + F1*0.5 + F2*pvl_tools.sind(60))
+	result=perez_skydiffuse(100.,100.,1000.,1.,0.,1.,0.5,0.5,pvl_tools.sind(60))
+	assert(np.allclose(result,expected))
+
+def test_wrapper_matches_kernel():
+	SunZen,SunAz,DHI,DNI,HExtra,AM=make_data()
+	SkyDiffuse=pvl_perez(30,180,DHI,DNI,HExtra,SunZen,SunAz,AM)
+	keep=DHI>0
+	assert(SkyDiffuse.index.equals(DHI.index[keep]))
+	Sun=SolarGeometry(SunZen,SunAz)
+	Surface=SurfaceGeometry(30,180)
+	full=perez_skydiffuse(DHI.values,DNI.values,HExtra.values,AM.values,SunZen.values,
+	                            np.asarray(Sun.cos_zenith),np.asarray(Surface.cos_aoi(Sun)),Surface.cos_tilt,Surface.sin_tilt)
+	assert(np.all(full[~keep.values]==0))
+	assert(np.allclose(SkyDiffuse['In_Plane_SkyDiffuse'],full[keep.values]))
+
+def test_orientations():
+	SunZen,SunAz,DHI,DNI,HExtra,AM=make_data()
+	Sun=SolarGeometry(SunZen.values[:,np.newaxis],SunAz.values[:,np.newaxis])
+	Surface=SurfaceGeometry(np.array([[10,30,60]]),np.array([[90,180,270]]))
+	column=lambda values: values.values[:,np.newaxis]
+	out=np.empty((len(DHI),3))
+	result=perez_skydiffuse(column(DHI),column(DNI),column(HExtra),column(AM),column(SunZen),Sun.cos_zenith,
+	                              Surface.cos_aoi(Sun),Surface.cos_tilt,Surface.sin_tilt,out=out)
+	assert(result is out)
+	for j,(tilt,azimuth) in enumerate(((10,90),(30,180),(60,270))):
+		SkyDiffuse=pvl_perez(tilt,azimuth,DHI,DNI,HExtra,SunZen,SunAz,AM)
+		assert(np.allclose(SkyDiffuse['In_Plane_SkyDiffuse'],out[DHI.values>0,j]))
+
+def test_unsorted_index():
+	SunZen,SunAz,DHI,DNI,HExtra,AM=make_data()
+	order=np.random.RandomState(1).permutation(len(DHI))
+	shuffled=[value.iloc[order] for value in (DHI,DNI,HExtra,SunZen,SunAz,AM)]
+	SkyDiffuse=pvl_perez(30,180,shuffled[0],shuffled[1],shuffled[2],shuffled[3],shuffled[4],shuffled[5])
+	expected=pvl_perez(30,180,DHI,DNI,HExtra,SunZen,SunAz,AM)
+	assert(np.allclose(SkyDiffuse['In_Plane_SkyDiffuse'].reindex(expected.index),expected['In_Plane_SkyDiffuse']))
+
+def test_models():
+	SunZen,SunAz,DHI,DNI,HExtra,AM=make_data()
+	default=pvl_perez(30,180,DHI,DNI,HExtra,SunZen,SunAz,AM)
+	alias=pvl_perez(30,180,DHI,DNI,HExtra,SunZen,SunAz,AM,modelt='1990')
+	assert(np.allclose(default,alias))
+	composite=pvl_perez(30,180,DHI,DNI,HExtra,SunZen,SunAz,AM,modelt='allsitescomposite1988')
+	assert(np.all(np.isfinite(composite)))
+
+@raises(Exception)
+def test_unknown_model():
+	GetPerezCoefficients('bogus')
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
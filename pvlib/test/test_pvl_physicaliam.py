@@ -12,6 +12,26 @@ def test_proper():
 	#IAM=pvl_ashraeiam.pvl_ashraeiam(.05,40)	
 	#assert(np.size(IAM)==90)
 
+def test_tabulated():
+	theta=np.linspace(-95,95,3801)
+	IAM=pvl_physicaliam(4,0.002,1.526,theta)
+	Table=pvl_physicaliam(4,0.002,1.526,theta,Tabulate=True)
+	assert(np.max(np.abs(Table-IAM))<2e-7)
+	assert(np.all(Table[np.abs(theta)>90]==0))
+
+def test_tabulated_frame():
+	theta=pd.DataFrame(np.array([[0.,30],[60,89]]),index=[5,6],columns=['a','b'])
+	IAM=pvl_physicaliam(4,0.002,1.526,theta,Tabulate=True)
+	assert(IAM.index.equals(theta.index) and IAM.columns.equals(theta.columns))
+	assert(IAM['a'][5]==1)
+
+def test_tabulated_scalar():
+	assert(abs(pvl_physicaliam(4,0.002,1.526,40,Tabulate=True)-pvl_physicaliam(4,0.002,1.526,40))<1e-7)
+
+@raises(Exception)
+def test_tabulated_vector_parameters():
+	pvl_physicaliam(np.array([4,5]),0.002,1.526,np.array([10,20]),Tabulate=True)
+
 
 def main():
     unittest.main()
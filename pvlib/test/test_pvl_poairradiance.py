@@ -0,0 +1,57 @@
+from nose.tools import *
+import numpy as np
+import pandas as pd
+from .. import pvl_poairradiance
+from .. import pvl_getaoi
+from .. import pvl_perez
+from .. import pvl_isotropicsky
+from .. import pvl_grounddiffuse
+from .. import pvl_globalinplane
+from ..pvl_poairradiance import CHUNK
+from ..pvl_solargeometry import SolarGeometry
+from .irradiance_data import tmy_irradiance
+
+def test_matches_chain():
+	SunZen,SunAz,DHI,DNI,GHI,HExtra,AM=tmy_irradiance()
+	POA=pvl_poairradiance(30,180,DNI,DHI,GHI,SunZen,SunAz,0.2,HExtra=HExtra,AM=AM)
+	assert(list(POA.columns)==['AOI','Eb','In_Plane_SkyDiffuse','GR','E','Ediff'])
+	assert(POA.index.equals(DHI.index))
+
+	AOI=pvl_getaoi(30,180,SunZen,SunAz)['AOI']
+	SkyDiffuse=pvl_perez(30,180,DHI,DNI,HExtra,SunZen,SunAz,AM)['In_Plane_SkyDiffuse'].reindex(DHI.index).fillna(0)
+	GR=pvl_grounddiffuse(30,GHI,0.2)['GR']
+	E,Eb,Ediff=pvl_globalinplane(30,180,AOI,DNI,SkyDiffuse,GR)
+	assert(np.allclose(POA['AOI'],AOI))
+	assert(np.allclose(POA['In_Plane_SkyDiffuse'],SkyDiffuse))
+	assert(np.allclose(POA['GR'],GR))
+	assert(np.allclose(POA['Ediff'],Ediff))
+	front=AOI<90
+	assert(np.allclose(POA['Eb'][front],Eb[front]))
+	assert(np.allclose(POA['E'][front],E[front]))
+	assert(np.all(POA['Eb'][~front]==0))
+
+def test_chunks_and_out():
+	#repeat the TMY hours past one block of CHUNK rows
+	repeat=CHUNK//len(tmy_irradiance()[0]) + 1
+	SunZen,SunAz,DHI,DNI,GHI,HExtra,AM=[pd.Series(np.tile(value.values,repeat)) for value in tmy_irradiance()]
+	Sun=SolarGeometry(SunZen,SunAz)
+	Tilt=pd.Series(np.linspace(0,60,len(DHI)))
+	out=np.empty((6,len(DHI)))
+	POA=pvl_poairradiance(Tilt,180,DNI,DHI,GHI,Sun,None,0.2,Model='isotropic',out=out)
+	assert(len(POA)>CHUNK)
+	assert(np.shares_memory(POA.values,out))
+	assert(np.allclose(POA['AOI'],pvl_getaoi(Tilt,180,SunZen,SunAz)['AOI']))
+	assert(np.allclose(POA['In_Plane_SkyDiffuse'],pvl_isotropicsky(Tilt,DHI)))
+	assert(np.allclose(POA['GR'],pvl_grounddiffuse(Tilt,GHI,0.2)['GR']))
+	assert(np.allclose(POA['E'],POA['Eb'] + POA['In_Plane_SkyDiffuse'] + POA['GR']))
+
+@raises(Exception)
+def test_bad_out():
+	SunZen,SunAz,DHI,DNI,GHI,HExtra,AM=tmy_irradiance()
+	pvl_poairradiance(30,180,DNI,DHI,GHI,SunZen,SunAz,0.2,Model='isotropic',out=np.empty((5,len(DHI))))
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
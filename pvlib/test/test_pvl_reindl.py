@@ -6,6 +6,7 @@ from .. import pvl_ephemeris
 from .. import pvl_extraradiation 
 from .. import pvl_relativeairmass 
 from .. import pvl_reindl1990 
+from .. import pvl_skydiffuse
 from .. import tmy
 import os
 def test():
@@ -33,9 +34,22 @@ def test():
 
 	assert(np.size(TMY['In_Plane_SkyDiffuse'])==np.size(TMY['SunZen']))
 
+	expected=pvl_skydiffuse(meta['SurfTilt'],meta['SurfAz'],TMY.DHI,TMY.SunZen,TMY.SunAz,
+	                        DNI=TMY.DNI,GHI=TMY.GHI,HExtra=TMY.HExtra,Model='reindl')
+	assert(np.allclose(TMY['In_Plane_SkyDiffuse'],expected.iloc[0]))
+
 def test_scalar():
 	
-	assert(False)
+	diff=pvl_reindl1990(SurfTilt=30,
+	                    SurfAz=0,
+	                    DHI=500,
+	                    DNI=400,
+	                    GHI=800,
+	                    HExtra=1340,
+	                    SunZen=30,
+	                    SunAz=0)
+
+	assert(np.isfinite(diff) and diff>0)
 
 def main():
     unittest.main()
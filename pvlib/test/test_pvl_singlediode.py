@@ -6,6 +6,7 @@ import sys
 import os
 sys.path.append(os.path.abspath('../'))
 from .. import pvl_singlediode 
+from ..pvl_singlediode import I_from_V, open_circuit_voltage, max_power_point, lambertw_exp
 from .. import pvl_ephemeris 
 from .. import pvl_extraradiation 
 from .. import pvl_relativeairmass 
@@ -88,6 +89,65 @@ def test_proper_scalar():
 	pmp=pvl_singlediode(Module=module,IL=IL,I0=I0,Rs=Rs,Rsh=Rsh,nNsVth=nNsVth)
 	assert(True==True)
 
+def test_per_row_convergence():
+	#each curve is solved to the same tolerance, whatever the other rows
+	IL=pd.Series([5.056,2.5,0.5,0.01])
+	I0=pd.Series([1.006e-10,5e-10,2e-9,1e-11])
+	Rsh=pd.Series([837.51,1500.,8000.,4e5])
+	nNsVth=pd.Series([2.3674,2.5,2.6,2.2])
+	module=pvl_tools.repack({'V_oc_ref':58.3})
+	All=pvl_singlediode(Module=module,IL=IL,I0=I0,Rs=1.004,Rsh=Rsh,nNsVth=nNsVth)
+	for i in range(len(IL)):
+		One=pvl_singlediode(Module=module,IL=IL[i],I0=I0[i],Rs=1.004,Rsh=Rsh[i],nNsVth=nNsVth[i])
+		assert(abs(One['Pmp']-All['Pmp'][i])<1e-9)
+		assert(abs(One['Voc']-All['Voc'][i])<1e-9)
+
+def test_max_power_point():
+	IL,I0,Rs,Rsh,nNsVth=5.056,1.006e-10,1.004,837.51,2.3674
+	Result=pvl_singlediode(Module=pvl_tools.repack({'V_oc_ref':58.3}),IL=IL,I0=I0,Rs=Rs,Rsh=Rsh,nNsVth=nNsVth)
+	assert(abs(I_from_V(Rsh,Rs,nNsVth,Result['Voc'],I0,IL))<1e-6)
+	V=np.linspace(0,Result['Voc'],100001)
+	P=V*I_from_V(Rsh,Rs,nNsVth,V,I0,IL)
+	assert(0<=Result['Pmp']-np.max(P)<1e-6)
+	assert(abs(Result['Pmp']-Result['Vmp']*Result['Imp'])<1e-9)
+	assert(abs(Result['Vmp']-V[np.argmax(P)])<1e-3)
+
+def test_missing_rows():
+	#rows with a NaN input (eg. missing weather data) give NaN, whatever the memory held
+	IL=np.tile([5.056,np.nan],500)
+	I0,Rs,Rsh,nNsVth=[np.full(1000,value) for value in (1.006e-10,1.004,837.51,2.3674)]
+	Voc=open_circuit_voltage(IL,I0,Rsh,nNsVth)
+	for value in max_power_point(IL,I0,Rs,Rsh,nNsVth,Voc):
+		assert(np.all(np.isnan(value[1::2])))
+		assert(np.all(np.isfinite(value[::2])))
+	Result=pvl_singlediode(Module=pvl_tools.repack({'V_oc_ref':58.3}),IL=pd.Series(IL),I0=I0,Rs=Rs,Rsh=pd.Series(Rsh),nNsVth=nNsVth)
+	for name in ['Imp','Vmp','Pmp']:
+		assert(np.all(np.isnan(Result[name][1::2])))
+
+def test_lambertw_exp():
+	from scipy.special import lambertw
+	x=np.linspace(-700,690,100001)
+	W=lambertw_exp(x)
+	assert(W.dtype==np.float64)
+	assert(np.max(np.abs(W-lambertw(np.exp(x)).real)/np.maximum(W,1e-300))<1e-13)
+	#beyond the range of exp: W(exp(x)) solves w + log(w) = x
+	x=np.array([710.,1e4,1e10])
+	W=lambertw_exp(x)
+	assert(np.allclose(W+np.log(W),x,rtol=1e-14))
+	assert(lambertw_exp(-np.inf)==0)
+
+def test_overflow():
+	#(V+Rs*IL)/nNsVth is above 709, where exp overflows in the argument of W
+	IL,I0,Rs,Rsh,nNsVth=80.,1e-9,0.5,1000.,0.05
+	Result=pvl_singlediode(Module=pvl_tools.repack({'V_oc_ref':1.2}),IL=IL,I0=I0,Rs=Rs,Rsh=Rsh,nNsVth=nNsVth)
+	for name in ['Isc','Voc','Imp','Vmp','Pmp','Ix','Ixx']:
+		assert(np.isfinite(Result[name]))
+	V=np.linspace(0,Result['Voc'],11)
+	I=I_from_V(Rsh,Rs,nNsVth,V,I0,IL)
+	Vd=V+I*Rs
+	assert(np.allclose(IL-I0*(np.exp(Vd/nNsVth)-1)-Vd/Rsh,I,atol=1e-9))
+	assert(abs(I[-1])<1e-9)
+
 def test_multiple_I_V_Points():
 	assert (False)
 
@@ -0,0 +1,62 @@
+from nose.tools import *
+import numpy as np
+from .. import pvl_skydiffuse
+from .. import pvl_perez
+from .. import pvl_klucher1979
+from .. import pvl_isotropicsky
+from .. import pvl_tools
+from ..pvl_solargeometry import SolarGeometry, SurfaceGeometry
+from .irradiance_data import tmy_irradiance
+
+Tilts=np.array([0,10,30,60,90])
+Azimuths=np.array([180,90,180,270,135])
+
+def test_shape():
+	SunZen,SunAz,DHI,DNI,GHI,HExtra,AM=tmy_irradiance()
+	SkyDiffuse=pvl_skydiffuse(Tilts,Azimuths,DHI,SunZen,SunAz,DNI=DNI,HExtra=HExtra,AM=AM)
+	assert(SkyDiffuse.shape==(5,len(DHI)))
+	assert(SkyDiffuse.columns.equals(DHI.index))
+	assert(list(SkyDiffuse.index.get_level_values('SurfTilt'))==list(Tilts))
+
+def test_perez():
+	SunZen,SunAz,DHI,DNI,GHI,HExtra,AM=tmy_irradiance()
+	SkyDiffuse=pvl_skydiffuse(Tilts,Azimuths,DHI,SunZen,SunAz,DNI=DNI,HExtra=HExtra,AM=AM)
+	for i,(tilt,azimuth) in enumerate(zip(Tilts,Azimuths)):
+		expected=pvl_perez(tilt,azimuth,DHI,DNI,HExtra,SunZen,SunAz,AM)['In_Plane_SkyDiffuse']
+		assert(np.allclose(SkyDiffuse.iloc[i][expected.index],expected))
+		assert(np.all(SkyDiffuse.iloc[i][DHI==0]==0))
+
+def test_isotropic_and_klucher():
+	SunZen,SunAz,DHI,DNI,GHI,HExtra,AM=tmy_irradiance()
+	Sun=SolarGeometry(SunZen,SunAz)
+	isotropic=pvl_skydiffuse(Tilts,Azimuths,DHI,Sun,Model='isotropic')
+	klucher=pvl_skydiffuse(Tilts,Azimuths,DHI,Sun,GHI=GHI,Model='klucher')
+	for i,(tilt,azimuth) in enumerate(zip(Tilts,Azimuths)):
+		assert(np.allclose(isotropic.iloc[i],pvl_isotropicsky(tilt,DHI)))
+		assert(np.allclose(klucher.iloc[i],pvl_klucher1979(tilt,azimuth,DHI,GHI,SunZen,SunAz)))
+
+def test_haydavies_and_reindl():
+	SunZen,SunAz,DHI,DNI,GHI,HExtra,AM=tmy_irradiance()
+	haydavies=pvl_skydiffuse(Tilts,Azimuths,DHI,SunZen,SunAz,DNI=DNI,HExtra=HExtra,Model='haydavies')
+	reindl=pvl_skydiffuse(Tilts,Azimuths,DHI,SunZen,SunAz,DNI=DNI,GHI=GHI,HExtra=HExtra,Model='reindl')
+	for i,(tilt,azimuth) in enumerate(zip(Tilts,Azimuths)):
+		Surface=SurfaceGeometry(tilt,azimuth)
+		Sun=SolarGeometry(SunZen,SunAz)
+		AI=DNI/HExtra
+		RB=np.maximum(Surface.cos_aoi(Sun),0)/np.maximum(Sun.cos_zenith,0.01745)
+		expected=DHI*(AI*RB + (1-AI)*0.5*(1+Surface.cos_tilt))
+		assert(np.allclose(haydavies.iloc[i],expected))
+		F=np.sqrt(np.maximum(DNI*Sun.cos_zenith,0)/np.maximum(GHI,1e-06))
+		expected=DHI*(AI*RB + (1-AI)*0.5*(1+Surface.cos_tilt)*(1+F*pvl_tools.sind(tilt/2.0)**3))
+		assert(np.allclose(reindl.iloc[i],expected))
+
+@raises(Exception)
+def test_missing_input():
+	SunZen,SunAz,DHI,DNI,GHI,HExtra,AM=tmy_irradiance()
+	pvl_skydiffuse(Tilts,Azimuths,DHI,SunZen,SunAz,DNI=DNI,HExtra=HExtra)
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+from nose.tools import *
+import numpy as np
+from .. import pvl_skydiffusemodels
+from .. import pvl_isotropicsky
+from .. import pvl_kingdiffuse
+from .. import pvl_klucher1979
+from .. import pvl_haydavies1980
+from .. import pvl_reindl1990
+from .. import pvl_perez
+from ..pvl_solargeometry import SolarGeometry
+from .irradiance_data import tmy_irradiance
+
+def test_all_models():
+	SunZen,SunAz,DHI,DNI,GHI,HExtra,AM=tmy_irradiance()
+	SkyDiffuse=pvl_skydiffusemodels(30,150,DHI,SunZen,SunAz,DNI=DNI,GHI=GHI,HExtra=HExtra,AM=AM)
+	assert(list(SkyDiffuse.columns)==['isotropic','king','klucher','haydavies','reindl','perez'])
+	assert(SkyDiffuse.index.equals(DHI.index))
+	assert(np.allclose(SkyDiffuse['isotropic'],pvl_isotropicsky(30,DHI)))
+	assert(np.allclose(SkyDiffuse['king'],pvl_kingdiffuse(30,DHI,GHI,SunZen)))
+	assert(np.allclose(SkyDiffuse['klucher'],pvl_klucher1979(30,150,DHI,GHI,SunZen,SunAz)))
+	assert(np.allclose(SkyDiffuse['haydavies'],pvl_haydavies1980(30,150,DHI,DNI,HExtra,SunZen,SunAz)))
+	assert(np.allclose(SkyDiffuse['reindl'],pvl_reindl1990(30,150,DHI,DNI,GHI,HExtra,SunZen,SunAz)))
+	perez=pvl_perez(30,150,DHI,DNI,HExtra,SunZen,SunAz,AM)['In_Plane_SkyDiffuse']
+	assert(np.allclose(SkyDiffuse['perez'][perez.index],perez))
+
+def test_selected_models():
+	SunZen,SunAz,DHI,DNI,GHI,HExtra,AM=tmy_irradiance()
+	Sun=SolarGeometry(SunZen,SunAz)
+	SkyDiffuse=pvl_skydiffusemodels(30,150,DHI,Sun,GHI=GHI,Models=['klucher','isotropic'])
+	assert(list(SkyDiffuse.columns)==['klucher','isotropic'])
+	assert(np.allclose(SkyDiffuse['isotropic'],pvl_isotropicsky(30,DHI)))
+
+@raises(Exception)
+def test_missing_input():
+	SunZen,SunAz,DHI,DNI,GHI,HExtra,AM=tmy_irradiance()
+	pvl_skydiffusemodels(30,150,DHI,SunZen,SunAz,GHI=GHI,Models=['isotropic','haydavies'])
+
+@raises(Exception)
+def test_unknown_model():
+	SunZen,SunAz,DHI,DNI,GHI,HExtra,AM=tmy_irradiance()
+	pvl_skydiffusemodels(30,150,DHI,SunZen,SunAz,Models=['bogus'])
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+from nose.tools import *
+import numpy as np
+import pandas as pd
+from .. import pvl_getaoi
+from .. import pvl_perez
+from .. import pvl_klucher1979
+from .. import pvl_clearsky_haurwitz
+from .. import SolarGeometry, SurfaceGeometry
+
+def make_data():
+	index=pd.date_range('20130101',periods=6,freq='H')
+	SunZen=pd.Series([20.,35.,50.,65.,80.,89.],index=index)
+	SunAz=pd.Series([100.,130.,160.,190.,220.,250.],index=index)
+	DHI=pd.Series([50.,80.,120.,90.,60.,10.],index=index)
+	DNI=pd.Series([800.,700.,500.,400.,200.,20.],index=index)
+	GHI=DHI+DNI*np.cos(np.radians(SunZen))
+	return SunZen,SunAz,DHI,DNI,GHI
+
+def test_getaoi_matches_angles():
+	SunZen,SunAz,DHI,DNI,GHI=make_data()
+	AOI=pvl_getaoi(SurfTilt=30,SurfAz=180,SunZen=SunZen,SunAz=SunAz)
+	AOI_geom=pvl_getaoi(SurfTilt=SurfaceGeometry(30,180),SurfAz=None,SunZen=SolarGeometry(SunZen,SunAz),SunAz=None)
+	assert(np.allclose(AOI.AOI,AOI_geom.AOI))
+
+def test_shared_terms_reused():
+	SunZen,SunAz,DHI,DNI,GHI=make_data()
+	Sun=SolarGeometry(SunZen,SunAz)
+	Surface=SurfaceGeometry(30,180)
+	COSTT=Surface.cos_aoi(Sun)
+	assert(Surface.cos_aoi(Sun) is COSTT)
+	assert(Sun.cos_zenith is Sun.cos_zenith)
+
+	AM=1/np.cos(np.radians(SunZen))
+	raw=pvl_perez(30,180,DHI,DNI,pd.Series(1367.,index=SunZen.index),SunZen,SunAz,AM)
+	geom=pvl_perez(Surface,None,DHI,DNI,pd.Series(1367.,index=SunZen.index),Sun,None,AM)
+	assert(np.allclose(raw,geom))
+	assert(Surface.cos_aoi(Sun) is COSTT)
+
+	raw=pvl_klucher1979(30,180,DHI,GHI,SunZen,SunAz)
+	geom=pvl_klucher1979(Surface,None,DHI,GHI,Sun,None)
+	assert(np.allclose(raw,geom))
+
+def test_haurwitz_geometry():
+	SunZen,SunAz,DHI,DNI,GHI=make_data()
+	assert(np.allclose(pvl_clearsky_haurwitz(SunZen),pvl_clearsky_haurwitz(SolarGeometry(SunZen))))
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+from nose.tools import *
+import numpy as np
+import pandas as pd
+import shutil
+import tempfile
+from .. import pvl_ephemeris
+from .. import pvl_spa
+from .. import SolarPositionCache
+from .. import SPA_ZA_RTS
+
+def make_data():
+	Time=pd.date_range('20130101',periods=48,freq='H')
+	Location={'latitude':35.05,'longitude':-106.54,'altitude':1619,'TZ':-7}
+	return Time,Location
+
+def test_memory_hit():
+	Time,Location=make_data()
+	cache=SolarPositionCache()
+	first=cache.solarposition(Time,Location,Algorithm='ephemeris')
+	second=cache.solarposition(Time,Location,Algorithm='ephemeris')
+	assert(cache.misses==1 and cache.hits==1)
+	#The hit returns the values computed on the miss
+	assert(len(first)==len(second))
+	for a,b in zip(first,second):
+		assert(np.array_equal(a,b))
+
+	expected=pvl_ephemeris(Time,Location)
+	assert(len(second)==len(expected))
+	for cached,value in zip(second,expected):
+		assert(np.allclose(cached,value))
+		assert(cached.name==value.name)
+		assert(cached.index.equals(Time))
+
+def test_key():
+	Time,Location=make_data()
+	cache=SolarPositionCache()
+	key=cache.key(Time,Location,'spa')
+	assert(key==cache.key(Time.copy(),dict(Location),'spa'))
+	assert(key!=cache.key(Time,dict(Location,latitude=35.06),'spa'))
+	assert(key!=cache.key(Time,Location,'ephemeris'))
+	assert(key!=cache.key(Time+pd.Timedelta('1min'),Location,'spa'))
+	assert(key!=cache.key(Time,Location,'spa',Pressure=np.full(48,900.)))
+
+def test_spa_outputs():
+	Time,Location=make_data()
+	cache=SolarPositionCache()
+	result=cache.solarposition(Time,Location,Algorithm='spa',Function=SPA_ZA_RTS)
+	expected=pvl_spa(Time,Location,Function=SPA_ZA_RTS)
+	assert(isinstance(result[3],pd.DataFrame))
+	assert(list(result[3].columns)==list(expected[3].columns))
+	assert(np.allclose(result[3],expected[3]))
+
+def test_eviction():
+	Time,Location=make_data()
+	cache=SolarPositionCache(max_bytes=2*5*48*8)
+	for latitude in (30,31,32):
+		cache.solarposition(Time,dict(Location,latitude=latitude),Algorithm='ephemeris')
+	assert(cache.nbytes<=cache.max_bytes)
+	cache.solarposition(Time,dict(Location,latitude=32),Algorithm='ephemeris')
+	assert(cache.hits==1)
+	cache.solarposition(Time,dict(Location,latitude=30),Algorithm='ephemeris')
+	assert(cache.misses==4)
+
+def test_disk_tier():
+	Time,Location=make_data()
+	directory=tempfile.mkdtemp()
+	try:
+		first=SolarPositionCache(directory=directory).solarposition(Time,Location,Algorithm='ephemeris')
+		cache=SolarPositionCache(directory=directory)
+		second=cache.solarposition(Time,Location,Algorithm='ephemeris')
+		assert(cache.disk_hits==1 and cache.misses==0)
+		for a,b in zip(first,second):
+			assert(np.allclose(a,b))
+	finally:
+		shutil.rmtree(directory)
+
+@raises(Exception)
+def test_algorithm():
+	Time,Location=make_data()
+	SolarPositionCache().solarposition(Time,Location,Algorithm='sunpos')
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
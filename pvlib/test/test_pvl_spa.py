@@ -5,10 +5,16 @@ import pandas as pd
 from datetime import datetime
 import sys 
 import os 
+import shutil
+import tempfile
 
 from .. import pvl_spa
 from .. import tmy
 from .. import pvl_makelocationstruct
+from .. import spa_numpy
+from .. import SPA_ZA_RTS, SPA_ALL
+from ..pvl_spa import spa_py, load_spa_py
+from nose.plugins.skip import SkipTest
 
 def test_inputs():
 	TMY,meta=tmy.readtmy3(filename='703165TY.csv')
@@ -31,6 +37,121 @@ def test_physical():
 	assert( (((g[0]>14.3) & (g[0]<14.4)) & ((g[1]>39) & (g[1]<40)) & ((g[2]>50.1) & (g[2]<50.2) )).any) #Physical constraints from spatester.c
 	
 
+def test_function_and_weather():
+	TMY,meta=tmy.readtmy3(filename='703165TY.csv')
+	Time=TMY.index[:48]
+
+	SunAz,SunEl,Zenith,SPAOut=pvl_spa(Time=Time,Location=meta)
+	assert(len(Zenith)==48)
+	assert(len(SPAOut)==48 and len(SPAOut.columns)==0)
+
+	SunAz,SunEl,Zenith_weather,SPAOut=pvl_spa(Time=Time,Location=meta,
+		Pressure=TMY.Pressure[:48],Temperature=TMY.DryBulb[:48],Function=SPA_ALL)
+	assert(list(SPAOut.columns)==['incidence','suntransit','sunrise','sunset'])
+	#Only the refraction correction changes
+	day=SunEl>5
+	assert(day.any())
+	assert(np.all(abs(Zenith_weather[day]-Zenith[day])<0.1))
+	assert((Zenith_weather!=Zenith).any())
+
+	SunAz,SunEl,Zenith,SPAOut=pvl_spa(Time=Time,Location=meta,Function=SPA_ZA_RTS)
+	assert(list(SPAOut.columns)==['suntransit','sunrise','sunset'])
+
+def test_naive_timezone():
+	#06:00 at UTC+1 and UTC-7 is 05:00 and 13:00 UTC
+	Time=pd.date_range('20130621 06:00',periods=24,freq='H')
+	for TZ,tz in ((1,'Etc/GMT-1'),(-7,'Etc/GMT+7')):
+		location={'latitude':50.,'longitude':10.,'altitude':0,'TZ':TZ}
+		SunAz,SunEl,Zenith,__=pvl_spa(Time=Time,Location=location)
+		AwareAz,AwareEl,AwareZenith,__=pvl_spa(Time=Time.tz_localize(tz),Location=location)
+		assert(np.allclose(Zenith,AwareZenith))
+		assert(np.allclose(SunAz,AwareAz))
+
+def test_invalid_extension():
+	try:
+		import spa_py
+		raise SkipTest('spa_py extension on the python path')
+	except ImportError:
+		pass
+	directory=tempfile.mkdtemp()
+	try:
+		with open(os.path.join(directory,'spa_py.so'),'wb') as f:
+			f.write(b'not a shared library')
+		assert(load_spa_py(directory) is None)
+	finally:
+		shutil.rmtree(directory)
+
+def check_calc_array(spa):
+	#spatester.c reference values
+	kwargs={'timezone':-7.,'latitude':39.742476,'longitude':-105.1786,'elevation':1830.14,
+		'pressure':820,'temperature':11,'slope':30,'azm_rotation':-10,'delta_t':67}
+
+	field=lambda x: np.array([x,x],dtype=np.int32)
+	zenith=np.empty(2)
+	azimuth=np.empty(2)
+	incidence=np.empty(2)
+	failed=spa.spa_calc_array(field(2003),field(10),field(17),field(12),field(30),field(30),
+		zenith=zenith,azimuth=azimuth,incidence=incidence,**kwargs)
+	assert(failed==0)
+	assert(np.allclose(zenith,[50.111622,50.111622]))
+	assert(np.allclose(azimuth,[194.340241,194.340241]))
+	assert(np.allclose(incidence,[25.187000,25.187000]))
+
+	sunrise=np.empty(2)
+	sunset=np.empty(2)
+	spa.spa_calc_array(field(2003),field(10),field(17),field(12),field(30),field(30),
+		sunrise=sunrise,sunset=sunset,**kwargs)
+	assert(np.allclose(sunrise,6+12/60.+43/3600.,atol=1/3600.)) #06:12:43
+	assert(np.allclose(sunset,17+20/60.+19/3600.,atol=1/3600.)) #17:20:19
+
+	pressure=np.array([820.,-1.])
+	zenith=np.empty(2)
+	failed=spa.spa_calc_array(field(2003),field(10),field(17),field(12),field(30),field(30),
+		zenith=zenith,**dict(kwargs,pressure=pressure))
+	assert(failed==1)
+	assert(np.isnan(zenith[1]))
+
+	kwargs['timezone']=0
+	epoch=pd.DatetimeIndex(['2003-10-17 19:30:30',None]).asi8
+	zenith=np.empty(2)
+	failed=spa.spa_calc_array(epoch=epoch,zenith=zenith,**kwargs)
+	assert(failed==1)
+	assert(np.allclose(zenith[0],50.111622))
+	assert(np.isnan(zenith[1]))
+
+@raises(Exception)
+def check_function_mismatch(spa):
+	field=np.array([2003],dtype=np.int32)
+	spa.spa_calc_array(field,field,field,field,field,field,incidence=np.empty(1),function=spa.SPA_ZA)
+
+def test_calc_array_numpy():
+	check_function_mismatch(spa_numpy)
+	check_calc_array(spa_numpy)
+
+def test_calc_array_compiled():
+	if spa_py is None:
+		raise SkipTest('spa_py extension not built')
+	check_calc_array(spa_py)
+	check_function_mismatch(spa_py)
+
+	kwargs={'timezone':-7.,'latitude':39.742476,'longitude':-105.1786,'elevation':1830.14}
+	spa=spa_py.spa_calc(year=2003,month=10,day=17,hour=12,minute=30,second=30,**kwargs)
+	assert(np.allclose(spa['zenith'],50.111622))
+
+def test_numpy_matches_compiled():
+	if spa_py is None:
+		raise SkipTest('spa_py extension not built')
+	epoch=pd.date_range('19500101 00:00:17',periods=2000,freq='997T').asi8
+	out=[]
+	for spa in (spa_numpy,spa_py):
+		zenith=np.empty(len(epoch))
+		azimuth=np.empty(len(epoch))
+		spa.spa_calc_array(epoch=epoch,latitude=-33.9,longitude=18.4,elevation=20,
+			zenith=zenith,azimuth=azimuth)
+		out.append((zenith,azimuth))
+	assert(np.allclose(out[0][0],out[1][0],atol=1e-6))
+	assert(np.allclose(out[0][1],out[1][1],atol=1e-6))
+
 def main():
     unittest.main()
 
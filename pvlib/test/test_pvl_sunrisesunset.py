@@ -0,0 +1,71 @@
+from nose.tools import *
+import numpy as np
+import pandas as pd
+from .. import pvl_sunrisesunset
+from .. import pvl_spa
+
+def hours(stamps):
+	stamps=pd.DatetimeIndex(stamps)
+	return np.asarray(stamps.hour + stamps.minute/60. + (stamps.second + stamps.microsecond/1e6)/3600.)
+
+def test_spatester_values():
+	#Golden, CO on 17 October 2003, from spatester.c
+	Location={'latitude':39.742476,'longitude':-105.1786,'altitude':1830.14,'TZ':-7}
+	Time=pd.date_range('2003-10-17',periods=24,freq='H')
+	SunTimes=pvl_sunrisesunset(Time,Location)
+	assert(len(SunTimes)==1)
+	assert(np.allclose(hours(SunTimes.sunrise),6.212067,atol=1e-5))
+	assert(np.allclose(hours(SunTimes.transit),11.768045,atol=1e-5))
+	#spatester gives the sunset of 16 October, which is in the UT day of 17 October
+	assert(np.allclose(hours(SunTimes.sunset),17.31437,atol=1e-4))
+	assert(not(SunTimes.polarday.any()))
+
+def test_sun_is_at_horizon():
+	Location={'latitude':35.05,'longitude':-106.54,'altitude':0,'TZ':-7}
+	Time=pd.date_range('2013-01-01',periods=365,freq='D')
+	SunTimes=pvl_sunrisesunset(Time,Location)
+	assert(len(SunTimes)==365)
+	for name in ('sunrise','sunset'):
+		#without refraction the sun centre is 0.8333 degrees below the horizon
+		SunAz,SunEl,Zenith,__=pvl_spa(pd.DatetimeIndex(SunTimes[name]),Location,Pressure=0)
+		assert(np.allclose(SunEl,-0.8333,atol=0.01))
+
+def test_daylight_saving_time():
+	Location={'latitude':39.742476,'longitude':-105.1786,'altitude':1830.14,'TZ':-7}
+	naive=pvl_sunrisesunset(pd.date_range('2013-07-01',periods=24,freq='H'),Location)
+	aware=pvl_sunrisesunset(pd.date_range('2013-07-01',periods=24,freq='H',tz='US/Mountain'),Location)
+	assert(np.allclose(hours(aware.sunrise.dt.tz_localize(None)),hours(naive.sunrise)+1,atol=1e-3))
+	assert(aware.index[0]==pd.Timestamp('2013-07-01',tz='US/Mountain'))
+
+def test_daylight_saving_time_at_midnight():
+	#Sao Paulo clocks went from 2013-10-20 00:00 to 01:00, and back from
+	#2013-02-17 00:00 to 2013-02-16 23:00
+	Location={'latitude':-23.55,'longitude':-46.63,'altitude':760,'TZ':-3}
+	Time=pd.date_range('2013-01-01',periods=8760,freq='H',tz='America/Sao_Paulo')
+	SunTimes=pvl_sunrisesunset(Time,Location)
+	assert(len(SunTimes)==365)
+	assert(not(SunTimes.index.isnull().any()))
+	assert(not(SunTimes.sunrise.isnull().any()))
+	assert(SunTimes.index[292]==pd.Timestamp('2013-10-20 01:00',tz='America/Sao_Paulo'))
+	assert(SunTimes.index[47]==pd.Timestamp('2013-02-17 00:00',tz='America/Sao_Paulo'))
+	#the events are on their own local day, one hour later on the clock after
+	#the clocks went forward
+	for name in ('sunrise','transit','sunset'):
+		events=pd.DatetimeIndex(SunTimes[name])
+		assert(np.all(events.tz_localize(None).normalize()==SunTimes.index.tz_localize(None).normalize()))
+	sunrise=hours(pd.DatetimeIndex(SunTimes.sunrise).tz_localize(None))
+	assert(np.allclose(sunrise[292]-sunrise[291],1,atol=0.02))
+	assert(np.allclose(sunrise[47]-sunrise[46],-1,atol=0.02))
+
+def test_polar_day_and_night():
+	Location={'latitude':78.2,'longitude':15.6,'altitude':0,'TZ':1}
+	SunTimes=pvl_sunrisesunset(pd.DatetimeIndex(['2013-06-21 12:00','2013-12-21 12:00']),Location)
+	assert(SunTimes.sunrise.isnull().all())
+	assert(SunTimes.sunset.isnull().all())
+	assert(list(SunTimes.polarday)==[True,False])
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -314,6 +314,83 @@ def test_optional_value_optional_provided_logical_constraint():
 	var=pvl_tools.Parse(kwargs,Expect)
 	assert(1)	
 
+def test_compiled_spec_reused():
+	Expect={'AMRelative': ('num'),
+			'Pressure': ('num', 'x>0'),
+			'setting': ('str', ('yes', 'no')),
+			}
+	spec=pvl_tools.compile_expect(Expect)
+	assert(pvl_tools.compile_expect(dict(Expect)) is spec)
+
+	var=pvl_tools.Parse({'AMRelative': 5,'Pressure': np.array([5,8]),'setting': 'yes'},Expect)
+	assert(var.AMRelative==5)
+
+@raises(Exception)
+def test_compiled_spec_still_checks():
+	Expect={'AMRelative': ('num'),
+			'Pressure': ('num', 'x>0'),
+			'setting': ('str', ('yes', 'no')),
+			}
+	pvl_tools.Parse({'AMRelative': 5,'Pressure': np.array([5,8]),'setting': 'yes'},Expect)
+	pvl_tools.Parse({'AMRelative': 5,'Pressure': np.array([-5,8]),'setting': 'yes'},Expect)
+
+def test_trusted_inputs_skip_checks():
+	kwargs={'AMRelative': 5,
+			'Pressure': np.array([-5,8]),
+			'setting': 'start'
+			}
+	Expect={'AMRelative': ('num','default','default=100'),
+			'Pressure': ('num', 'x>0'),
+			'setting': ('str', ('yes', 'no')),
+			'other': ('num','default','default=2'),
+			}
+	with pvl_tools.trusted_inputs():
+		var=pvl_tools.Parse(kwargs,Expect)
+	assert(var.AMRelative==5)
+	assert(var.other==2)
+	assert(not pvl_tools._trusted)
+
+@raises(Exception)
+def test_trusted_inputs_restored():
+	pvl_tools.set_trusted_inputs(True)
+	pvl_tools.set_trusted_inputs(False)
+	kwargs={'AMRelative': 5,
+			'Pressure': np.array([-5,8]),
+			'setting': 'yes'
+			}
+	Expect={'AMRelative': ('num'),
+			'Pressure': ('num', 'x>0'),
+			'setting': ('str', ('yes', 'no')),
+			}
+	var=pvl_tools.Parse(kwargs,Expect)
+
+def test_numeric_inputs_not_copied():
+	series=pd.Series(np.array([5.,8.]))
+	array=np.array([5.,8.])
+	kwargs={'AMRelative': series,
+			'Pressure': array,
+			'setting': 'yes'
+			}
+	Expect={'AMRelative': ('num'),
+			'Pressure': ('num', 'x>0'),
+			'setting': ('str', ('yes', 'no')),
+			}
+	var=pvl_tools.Parse(kwargs,Expect)
+	assert(var.AMRelative is series)
+	assert(var.Pressure is array)
+
+def test_masked_replace():
+	GHI=pd.Series([-1.,0.,5.])
+	out=pvl_tools.masked_replace(GHI,GHI<1e-6,1e-6)
+	assert((GHI==[-1.,0.,5.]).all())
+	assert((out==[1e-6,1e-6,5.]).all())
+	assert(isinstance(out,pd.Series))
+
+	buf=np.empty(3)
+	out=pvl_tools.masked_replace(GHI.values,GHI.values<0,0,out=buf)
+	assert(out is buf)
+	assert((buf==[0.,0.,5.]).all())
+
 def test_logical_constriant_non_vector():
 	print "fix this"
 	assert (False)